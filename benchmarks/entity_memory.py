@@ -0,0 +1,116 @@
+# Memory benchmark of the entity classes
+#
+# Builds the given number of application instances, service bindings, service keys and users
+# from synthetic Controller payloads and compares the memory allocated by the compact slot-based
+# entities with the dict-backed layout used before (datetime objects, not interned strings).
+#
+# Usage: python benchmarks/entity_memory.py [count]
+
+import os
+import sys
+import json
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.utils import EpochDatetime
+from components.controller.application import ApplicationInstance
+from components.controller.service import ServiceBinding, ServiceKey
+from components.controller.controller import User
+
+
+EPOCH_MS = 1600000000000
+STATES = ['RUNNING', 'CRASHED', 'STOPPED']
+
+
+def metadata(guid, index):
+    return {'guid': guid, 'created_at': EPOCH_MS + index, 'updated_at': EPOCH_MS + index}
+
+
+def generate_payloads(count):
+    # The payloads pass through json to get distinct string objects as in real responses
+    payloads = {
+        'instances': [{'metadata': metadata(f'instance-{i}', i),
+                       'instanceEntity': {'droplet': f'droplet-{i % 100}',
+                                          'started_at': EPOCH_MS + i,
+                                          'state': STATES[i % 3],
+                                          'failure_reason': 'CRASHED' if i % 3 == 1 else None,
+                                          'pid': i,
+                                          'execution_user': 'sapxsa'}}
+                      for i in range(count)],
+        'bindings': [{'metadata': metadata(f'binding-{i}', i),
+                      'serviceBindingEntity': {'service_instance_guid': f'instance-{i}',
+                                               'app_guid': f'app-{i}',
+                                               'credentials': {'schema': f'SCHEMA_{i}',
+                                                               'tenant_name': 'H00'}}}
+                     for i in range(count)],
+        'keys': [{'metadata': metadata(f'key-{i}', i),
+                  'serviceKeyEntity': {'name': f'key-{i}'}}
+                 for i in range(count)],
+        'users': [{'metadata': metadata(f'user-{i}', i),
+                   'userEntity': {'uaaGuid': f'uaa-{i}', 'username': f'user-{i}',
+                                  'origin': 'idp', 'active': True, 'orphaned': False}}
+                  for i in range(count)],
+    }
+    return json.loads(json.dumps(payloads))
+
+
+def build_entities(payloads):
+    parent = SimpleNamespace(name='parent', guid='parent-guid')
+    return ([ApplicationInstance(parent, raw_data) for raw_data in payloads['instances']]
+            + [ServiceBinding(parent, raw_data) for raw_data in payloads['bindings']]
+            + [ServiceKey(parent, raw_data) for raw_data in payloads['keys']]
+            + [User(parent, raw_data) for raw_data in payloads['users']])
+
+
+class DictBackedEntity:
+    # pylint: disable=too-few-public-methods
+    pass
+
+
+def to_dict_backed(entity):
+    # Reproduces the layout of the entities before the slots were introduced
+    legacy_entity = DictBackedEntity()
+    entity_class = type(entity)
+    for name in entity_class.__slots__:
+        descriptor = next((value for key, value in vars(entity_class).items()
+                           if isinstance(value, EpochDatetime) and value.slot == name), None)
+        if descriptor:
+            public_name = next(key for key, value in vars(entity_class).items()
+                               if value is descriptor)
+            setattr(legacy_entity, public_name, getattr(entity, public_name))
+        else:
+            value = getattr(entity, name, None)
+            if isinstance(value, str):
+                value = value.encode('utf-8').decode('utf-8')
+            setattr(legacy_entity, name, value)
+    return legacy_entity
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    result = function(*args)
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before,
+                                                                         'filename'))
+    return result, allocated
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    payloads = generate_payloads(count)
+    entities, compact_size = measure(build_entities, payloads)
+    _, legacy_size = measure(lambda: [to_dict_backed(entity) for entity in entities])
+
+    print(f'Entities built:             {len(entities)}')
+    print(f'Dict-backed layout (before): {legacy_size / 1024 / 1024:8.2f} MiB')
+    print(f'Slot-based layout (after):   {compact_size / 1024 / 1024:8.2f} MiB')
+    print(f'Saved:                       {(1 - compact_size / legacy_size) * 100:8.1f} %')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Decoding benchmark of the JSON backends
+#
+# Decodes recorded response bodies with every installed JSON backend (see get_json_decoder)
+# and reports the time per decode and the throughput. The payloads are read from the given
+# files, e.g., bodies saved with curl, or from the response cache of the tool
+# (<output_dir>/response_cache.sqlite). Without arguments synthetic payloads shaped as
+# /v2/spaces/{guid}/content and /v2/users of a large landscape are decoded.
+#
+# Usage: python benchmarks/json_decode.py [file.json | response_cache.sqlite ...]
+
+import os
+import sys
+import json
+import sqlite3
+import timeit
+import functools
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.decoders import JSON_DECODERS
+
+
+EPOCH_MS = 1600000000000
+
+
+def metadata(guid, index):
+    return {'guid': guid, 'created_at': EPOCH_MS + index, 'updated_at': EPOCH_MS + index}
+
+
+def generate_payloads():
+    environment = [{'key': f'VARIABLE_{i}', 'value': json.dumps({'setting': i, 'enabled': True})}
+                   for i in range(20)]
+    space_content = {
+        'applications': [{'metadata': metadata(f'app-{i}', i),
+                          'applicationEntity': {'name': f'app-{i}', 'state': 'STARTED',
+                                                'memory': 1024, 'instances': 2,
+                                                'detected_buildpack': 'sap_java_buildpack',
+                                                'environment': environment}}
+                         for i in range(2000)],
+        'serviceInstances': [{'metadata': metadata(f'instance-{i}', i),
+                              'serviceInstanceEntity': {'name': f'instance-{i}',
+                                                        'service_plan_guid': 'plan-hdi',
+                                                        'parameters': {'database_id': 'H00'}}}
+                             for i in range(3000)],
+        'serviceBindings': [{'metadata': metadata(f'binding-{i}', i),
+                             'serviceBindingEntity': {'service_instance_guid': f'instance-{i}',
+                                                      'app_guid': f'app-{i % 2000}',
+                                                      'credentials': {'schema': f'SCHEMA_{i}',
+                                                                      'password': 'Secret_123'}}}
+                            for i in range(3000)]}
+    users = {'users': [{'metadata': metadata(f'user-{i}', i),
+                        'userEntity': {'uaaGuid': f'uaa-{i}', 'username': f'user-{i}',
+                                       'origin': 'idp', 'active': True, 'orphaned': False}}
+                       for i in range(20000)]}
+    return {'synthetic /v2/spaces/{guid}/content': json.dumps(space_content).encode('utf-8'),
+            'synthetic /v2/users': json.dumps(users).encode('utf-8')}
+
+
+def load_payloads(files):
+    payloads = {}
+    for file in files:
+        if file.endswith('.sqlite'):
+            with sqlite3.connect(file) as connection:
+                rows = connection.execute(('SELECT endpoint, path, response_body '
+                                           'FROM http_responses')).fetchall()
+            for endpoint, path, response_body in rows:
+                payloads[f'{endpoint}{path}'] = response_body.encode('utf-8')
+        else:
+            with open(file, 'rb') as payload_file:
+                payloads[file] = payload_file.read()
+    return payloads
+
+
+def main():
+    payloads = load_payloads(sys.argv[1:]) if len(sys.argv) > 1 else generate_payloads()
+    decoders = [decoder for decoder, available in JSON_DECODERS.values() if available()]
+    print(f'{"Payload":<60} {"KiB":>9} ' + ' '.join(f'{decoder.name + ", ms":>14}'
+                                                    for decoder in decoders))
+    totals = {decoder.name: 0 for decoder in decoders}
+    total_size = 0
+    for name, payload in sorted(payloads.items(), key=lambda item: -len(item[1])):
+        timings = []
+        for decoder in decoders:
+            runs, seconds = timeit.Timer(functools.partial(decoder.loads, payload)).autorange()
+            timings.append(seconds / runs)
+            totals[decoder.name] += seconds / runs
+        total_size += len(payload)
+        print(f'{name[-60:]:<60} {len(payload) / 1024:>9.1f} '
+              + ' '.join(f'{timing * 1000:>14.3f}' for timing in timings))
+    print()
+    for decoder in decoders:
+        print(f'{decoder.name:<10} {total_size / 1024 / 1024 / totals[decoder.name]:>8.1f} MiB/s, '
+              f'{totals["json"] / totals[decoder.name]:>5.2f}x of json')
+
+
+if __name__ == '__main__':
+    main()
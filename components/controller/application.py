@@ -1,39 +1,49 @@
 import logging
 import json
 import re
-from components.tools.utils import epoch_to_datetime # pylint: disable=import-error
+from components.tools.utils import epoch_to_datetime, intern_string, EpochDatetime, load_once # pylint: disable=import-error
 
 
 class Application:
     # pylint: disable=too-many-instance-attributes
+    __slots__ = ('space', 'controller', 'controller_session',
+                 '_instances', '_tasks', '_monitoring_data', '_routes', '_representation',
+                 'guid', '_created_at', '_updated_at',
+                 'name', 'detected_buildpack', 'state', 'memory', 'planned_instances_count',
+                 'service_bindings', 'count_bindings', 'logs',
+                 'mta_id', 'mta_version', 'mta_module_name', 'mta_module_dependencies',
+                 'mta_services', 'target_runtime', 'target_container', 'belongs_to_mta',
+                 'has_deployment_tasks', 'is_hdi_deployer',
+                 'running_instances_count', 'crashed_instances_count',
+                 'crashed_short_term_count', 'crashed_mid_term_count', 'crashed_long_term_count',
+                 'down', 'uptime', '_load_locks')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, space, raw_data):
         logging.debug(('Loading the application information '
-                       f'based on {raw_data} from space {space.name} / {space.guid}'))
+                       'based on %s from space %s / %s'), raw_data, space.name, space.guid)
 
         self.space = space
         self.controller = self.space.controller
         self.controller_session = self.controller.controller_session
 
-        self._instances = {}
-        self._tasks = {}
+        self._instances = None
+        self._tasks = None
         self._monitoring_data = {}
-        self._routes = {}
+        self._routes = None
         self._representation = None
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
 
         application_entity = raw_data.get('applicationEntity')
         self.name = application_entity.get('name')
-        self.detected_buildpack = application_entity.get('detected_buildpack')
-        self.state = application_entity.get('state')
+        self.detected_buildpack = intern_string(application_entity.get('detected_buildpack'))
+        self.state = intern_string(application_entity.get('state'))
         self.memory = application_entity.get('memory')
         self.planned_instances_count = application_entity.get('instances')
 
@@ -73,7 +83,7 @@ class Application:
         self.mta_services = json.loads(mta_services) if mta_services else None
 
         # Information about the application target runtime if it is provided
-        self.target_runtime = get_env_value_by_key(environment, 'TARGET_RUNTIME')
+        self.target_runtime = intern_string(get_env_value_by_key(environment, 'TARGET_RUNTIME'))
 
         # Information about the Database Schema. Usually it is provided for HDI deployers
         self.target_container = get_env_value_by_key(environment, 'TARGET_CONTAINER')
@@ -98,8 +108,8 @@ class Application:
         self.down = self.monitoring_data.get('down')
         self.uptime = self.monitoring_data.get('uptime')
 
-        logging.info((f'Loaded information about application {self.name} / {self.guid} '
-                      f'from space {self.space.name} / {self.space.guid}'))
+        logging.debug(('Loaded information about application %s / %s '
+                       'from space %s / %s'), self.name, self.guid, self.space.name, self.space.guid)
 
     #
     # Lazy load application instances
@@ -109,12 +119,13 @@ class Application:
         return self._instances
 
     @instances.getter
+    @load_once('_instances')
     def instances(self):
         controller_session = self.controller_session
-        if not self._instances:
+        if self._instances is None:
             try:
-                instances_info = controller_session.get(f'/v2/apps/{self.guid}/instances')
-                instances = instances_info.get('response_body').get('instances')
+                instances = list(controller_session.iter_items(
+                    f'/v2/apps/{self.guid}/instances', 'instances'))
             except Exception as e: # pylint: disable=invalid-name
                 logging.error(
                     f'Failed to fetch instances of application {self.name} / {self.guid}',
@@ -126,8 +137,8 @@ class Application:
                     instance_guid = instance.get('metadata').get('guid')
                     parsed_instances[instance_guid] = ApplicationInstance(self, instance)
                 self._instances = parsed_instances
-                logging.debug((f'Loaded the information about instances of application '
-                               f'{self.name} / {self.guid}'))
+                logging.debug(('Loaded the information about instances of application '
+                               '%s / %s'), self.name, self.guid)
         return self._instances
 
     @instances.setter
@@ -142,12 +153,12 @@ class Application:
         return self._tasks
 
     @tasks.getter
+    @load_once('_tasks')
     def tasks(self):
         controller_session = self.controller_session
-        if not self._tasks:
+        if self._tasks is None:
             try:
-                tasks_info = controller_session.get(f'/v2/apps/{self.guid}/tasks')
-                tasks = tasks_info.get('response_body').get('tasks')
+                tasks = list(controller_session.iter_items(f'/v2/apps/{self.guid}/tasks', 'tasks'))
             except Exception as e: # pylint: disable=invalid-name
                 logging.error(
                     f'Failed to fetch tasks of application {self.name} / {self.guid}',
@@ -160,7 +171,7 @@ class Application:
                     parsed_tasks[task_guid] = ApplicationTask(self, task)
                 self._tasks = parsed_tasks
                 logging.debug(('Loaded the information about tasks of application '
-                               f'{self.name} / {self.guid}'))
+                               '%s / %s'), self.name, self.guid)
         return self._tasks
 
     @tasks.setter
@@ -175,22 +186,21 @@ class Application:
         return self._monitoring_data
 
     @monitoring_data.getter
+    @load_once('_monitoring_data')
     def monitoring_data(self):
-        controller_session = self.controller_session
         if not self._monitoring_data:
-            try:
-                monitoring_data_info = controller_session.get(
-                                            f'/v2/monitoring/status/apps/{self.guid}')
-                monitoring_data = monitoring_data_info.get('response_body')
-            except Exception as e: # pylint: disable=invalid-name
-                logging.error(
-                    f'Failed to fetch the monitoring data of application {self.name} / {self.guid}',
-                    exc_info=e)
-                raise
-            else:
-                self._monitoring_data = monitoring_data
-                logging.debug(
-                    f'Loaded the monitoring data of application {self.name} / {self.guid}')
+            # The monitoring data is usually prefetched for the whole space by the MonitoringLoader
+            monitoring_data = self.controller.app_monitoring_data.get(self.guid)
+            if monitoring_data is None:
+                try:
+                    monitoring_data = self.controller.monitoring_loader.load_app(self.guid)
+                except Exception as e: # pylint: disable=invalid-name
+                    logging.error(('Failed to fetch the monitoring data '
+                                   f'of application {self.name} / {self.guid}'), exc_info=e)
+                    raise
+            self._monitoring_data = monitoring_data
+            logging.debug(
+                'Loaded the monitoring data of application %s / %s', self.name, self.guid)
         return self._monitoring_data
 
     @monitoring_data.setter
@@ -245,12 +255,13 @@ class Application:
         return self._routes
 
     @routes.getter
+    @load_once('_routes')
     def routes(self):
         controller_session = self.controller_session
-        if not self._routes:
+        if self._routes is None:
             try:
-                routes_info = controller_session.get(f'/v2/apps/{self.guid}/routes')
-                routes = routes_info.get('response_body').get('routes')
+                routes = list(controller_session.iter_items(
+                    f'/v2/apps/{self.guid}/routes', 'routes'))
             except Exception as e: # pylint: disable=invalid-name
                 logging.error(
                     f'Failed to load routes of application {self.name}', exc_info=e)
@@ -261,7 +272,7 @@ class Application:
                     route_guid = route.get('metadata').get('guid')
                     parsed_routes[route_guid] = ApplicationRoute(self, route)
                 self._routes = parsed_routes
-                logging.debug(f'Loaded routes of application {self.name} / {self.guid}')
+                logging.debug('Loaded routes of application %s / %s', self.name, self.guid)
         return self._routes
 
     @routes.setter
@@ -302,8 +313,32 @@ class Application:
                 'Long-Term Crashes Count']
 
 
+class ApplicationSummary:
+    # pylint: disable=too-few-public-methods
+    # The lightweight application information used by scans over many spaces.
+    # Contrary to Application it does not load bindings, tasks or instances
+    __slots__ = ('space', 'guid', 'name', 'state')
+
+    def __init__(self, space, raw_data):
+        self.space = space
+
+        metadata = raw_data.get('metadata')
+        self.guid = metadata.get('guid')
+
+        application_entity = raw_data.get('applicationEntity')
+        self.name = application_entity.get('name')
+        self.state = intern_string(application_entity.get('state'))
+
+
 class ApplicationInstance:
     # pylint: disable=too-many-instance-attributes
+    __slots__ = ('app', '_representation', 'guid', 'droplet',
+                 '_created_at', '_updated_at', '_started_at',
+                 'state', 'failure_reason', 'pid', 'execution_user')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
+    started_at = EpochDatetime('_started_at')
 
     def __init__(self, app, raw_data):
         self.app = app
@@ -313,22 +348,16 @@ class ApplicationInstance:
         instance_entity = raw_data.get('instanceEntity')
         self.guid = metadata.get('guid')
         self.droplet = instance_entity.get('droplet')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
-        self.started_at = (epoch_to_datetime(instance_entity.get('started_at'))
-                           if instance_entity.get('started_at')
-                           else None)
-        self.state = instance_entity.get('state')
-        self.failure_reason = instance_entity.get('failure_reason')
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
+        self.started_at = instance_entity.get('started_at')
+        self.state = intern_string(instance_entity.get('state'))
+        self.failure_reason = intern_string(instance_entity.get('failure_reason'))
         self.pid = instance_entity.get('pid')
-        self.execution_user = instance_entity.get('execution_user')
+        self.execution_user = intern_string(instance_entity.get('execution_user'))
 
-        logging.debug((f'Loaded the information about instance {self.guid} '
-                       f'of application {self.app.name} / {self.app.guid}'))
+        logging.debug(('Loaded the information about instance %s '
+                       'of application %s / %s'), self.guid, self.app.name, self.app.guid)
 
     #
     # Represent the application instance for the Collector
@@ -377,22 +406,23 @@ class ApplicationInstance:
 class ApplicationTask:
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-few-public-methods
+    __slots__ = ('app', 'guid', 'name', 'command', 'instance_guid',
+                 '_created_at', '_updated_at', 'state', 'task_result', 'is_deployment_task')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, app, raw_data):
         self.app = app
         metadata = raw_data.get('metadata')
         task_entity = raw_data.get('taskEntity')
         self.guid = metadata.get('guid')
-        self.name = task_entity.get('name')
-        self.command = task_entity.get('command')
+        self.name = intern_string(task_entity.get('name'))
+        self.command = intern_string(task_entity.get('command'))
         self.instance_guid = task_entity.get('instance_guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.state = task_entity.get('state')
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at') if metadata.get('created_at') else None
+        self.state = intern_string(task_entity.get('state'))
         self.task_result = task_entity.get('task_result')
 
         def recognized_as_deployment_task(name, start_command, environment_vars):
@@ -414,11 +444,14 @@ class ApplicationTask:
                                                                 task_entity.get(
                                                                     'environment_variables'))
 
-        logging.debug((f'Loaded the information about task {self.guid} '
-                       f'of application {self.app.name} / {self.app.guid}'))
+        logging.debug(('Loaded the information about task %s '
+                       'of application %s / %s'), self.guid, self.app.name, self.app.guid)
 
 
 class ApplicationLogs:
+    __slots__ = ('app', 'controller_session', '_complete_log', '_router_log',
+                 '_parsed_router_log', '_router_log_representation', '_load_locks')
+
     def __init__(self, app):
         self.app = app
         self.controller_session = self.app.controller_session
@@ -435,6 +468,7 @@ class ApplicationLogs:
         return self._router_log
 
     @router_log.getter
+    @load_once('_router_log')
     def router_log(self):
         controller_session = self.controller_session
         if not self._router_log:
@@ -454,7 +488,8 @@ class ApplicationLogs:
             else:
                 self._router_log = router_log
                 logging.debug(
-                    f'Loaded the router log (RTR) of application {self.app.name} / {self.app.guid}')
+                    'Loaded the router log (RTR) of application %s / %s',
+                              self.app.name, self.app.guid)
         return self._router_log
 
     @router_log.setter
@@ -469,6 +504,7 @@ class ApplicationLogs:
         return self._parsed_router_log
 
     @parsed_router_log.getter
+    @load_once('_parsed_router_log')
     def parsed_router_log(self):
         if not self._parsed_router_log:
             if self.router_log:
@@ -509,12 +545,12 @@ class ApplicationLogs:
                                                               else None)
                             parsed_router_log.append(parsed_entry)
                         else:
-                            logging.debug(f'Failed to parse the request string: {source_request}')
+                            logging.debug('Failed to parse the request string: %s', source_request)
                     else:
-                        logging.debug(f'Failed to parse the router log entry: {line}')
+                        logging.debug('Failed to parse the router log entry: %s', line)
                 self._parsed_router_log = parsed_router_log
                 logging.debug(('Parsed the router log (RTR) of application '
-                               f'{self.app.name} / {self.app.guid}'))
+                               '%s / %s'), self.app.name, self.app.guid)
             else:
                 self._parsed_router_log = []
         return self._parsed_router_log
@@ -560,6 +596,11 @@ class ApplicationLogs:
 class ApplicationRoute:
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-few-public-methods
+    __slots__ = ('app', 'guid', '_created_at', '_updated_at',
+                 'space_guid', 'uri', 'domain', 'port', 'type', 'orphaned')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, app, raw_data):
         self.app = app
@@ -568,19 +609,15 @@ class ApplicationRoute:
         instance_entity = raw_data.get('routeEntity')
 
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
 
         self.space_guid = instance_entity.get('space_guid')
         self.uri = instance_entity.get('uri')
-        self.domain = instance_entity.get('domain')
+        self.domain = intern_string(instance_entity.get('domain'))
         self.port = instance_entity.get('port')
-        self.type = instance_entity.get('type')
+        self.type = intern_string(instance_entity.get('type'))
         self.orphaned = instance_entity.get('orphaned')
 
-        logging.debug((f'Loaded the information about route {self.guid} / {self.uri} '
-                       f'of application {self.app.name} / {self.app.guid}'))
+        logging.debug(('Loaded the information about route %s / %s '
+                       'of application %s / %s'), self.guid, self.uri, self.app.name, self.app.guid)
@@ -0,0 +1,51 @@
+import logging
+from components.controller.service import ServiceBroker, Service, ServicePlan # pylint: disable=import-error
+
+
+class ServiceCatalog:
+    # Services, service plans and service brokers shared by all spaces of the Controller.
+    # The catalog is almost identical across the landscape, hence each entry is parsed
+    # once per run and the spaces reference the same objects, keyed by guid
+
+    def __init__(self):
+        self.service_brokers = {}
+        self.services = {}
+        self.service_plans = {}
+
+    @staticmethod
+    def lookup(catalog, raw_items, build):
+        # Returns the entries of the given items and the number of entries parsed
+        # for the first time. setdefault keeps the first entry if two threads parse the same guid
+        entries = {}
+        parsed_count = 0
+        for raw_data in raw_items:
+            guid = raw_data.get('metadata').get('guid')
+            entry = catalog.get(guid)
+            if entry is None:
+                entry = catalog.setdefault(guid, build(raw_data))
+                parsed_count = parsed_count + 1
+            entries[guid] = entry
+        return entries, parsed_count
+
+    def get_service_brokers(self, space, raw_items):
+        service_brokers, parsed_count = self.lookup(self.service_brokers, raw_items, ServiceBroker)
+        self.log_summary('service brokers', space, service_brokers, parsed_count)
+        return service_brokers
+
+    def get_services(self, space, raw_items):
+        services, parsed_count = self.lookup(self.services, raw_items,
+                                             lambda raw_data: Service(space, raw_data))
+        self.log_summary('services', space, services, parsed_count)
+        return services
+
+    def get_service_plans(self, space, raw_items):
+        service_plans, parsed_count = self.lookup(self.service_plans, raw_items,
+                                                  lambda raw_data: ServicePlan(space, raw_data))
+        self.log_summary('service plans', space, service_plans, parsed_count)
+        return service_plans
+
+    @staticmethod
+    def log_summary(kind, space, entries, parsed_count):
+        logging.info(('Loaded %s %s of space %s / %s, '
+                      '%s of them new to the service catalog'),
+                     len(entries), kind, space.name, space.guid, parsed_count)
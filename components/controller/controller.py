@@ -3,13 +3,40 @@ import time
 from components.controller.session import ControllerSession # pylint: disable=import-error
 from components.controller.database import Database # pylint: disable=import-error
 from components.controller.organization import Organization # pylint: disable=import-error
-from components.tools.utils import epoch_to_datetime # pylint: disable=import-error
+from components.controller.monitoring import MonitoringLoader # pylint: disable=import-error
+from components.controller.catalog import ServiceCatalog # pylint: disable=import-error
+from components.tools.utils import intern_string, EpochDatetime, load_once # pylint: disable=import-error
+from components.tools.ratelimit import RateLimiter # pylint: disable=import-error
+from components.tools.deadline import DeadlineExceeded # pylint: disable=import-error
+
+# Guid of no entity, used to probe the filters by a list of guids
+UNKNOWN_GUID = '00000000-0000-0000-0000-000000000000'
 
 
 class Controller:
     # pylint: disable=too-many-instance-attributes
 
     def __init__(self, api_endpoint, user, password, **kwargs):
+        # Number of parallel requests used by the bulk loaders
+        self.max_workers = kwargs.pop('max_workers', 8)
+        # Optional persistent cache of the HANA container metadata, see HanaMetadataCache
+        self.hana_metadata_cache = kwargs.pop('hana_metadata_cache', None)
+        self.memory_lean = kwargs.pop('memory_lean', False)
+        # Optional persistent cache of GET responses shared by the runs, see ResponseCache
+        self.response_cache = kwargs.pop('response_cache', None)
+        # The cached responses are kept per user, since the visible entities depend on the roles
+        self.response_cache_scope = user
+        # Connection pool, keep-alive and timeout settings applied to all sessions
+        self.session_config = kwargs.pop('session_config', {})
+        # Optional collector of the request metrics per endpoint, see RequestMetrics
+        self.request_metrics = kwargs.pop('request_metrics', None)
+        # Optional retries and hedging of the requests applied to all sessions, see TransportPolicy
+        self.transport_policy = kwargs.pop('transport_policy', None)
+        # Optional request rate limits per session, keyed by controller, uaa and hana_broker,
+        # and of the submission of service instance deletions, see RateLimiter
+        self.rate_limiters = kwargs.pop('rate_limiters', {})
+        # Optional adaptive limits of the in-flight requests per session, see ConcurrencyLimiter
+        self.concurrency_limiters = kwargs.pop('concurrency_limiters', {})
         try:
             self.controller_session, self.uaa_session = self.__set_controller_sessions(
                 api_endpoint,
@@ -19,11 +46,19 @@ class Controller:
 
             self.hana_broker_session = self.__set_hana_broker_session(self.controller_session)
 
-            self._databases = {}
-            self._orgs = {}
+            self._databases = None
+            self._orgs = None
             self._monitoring_config = {}
             self._app_monitoring_config = {}
-            self._users = {}
+            self._users = None
+            self._service_key_filter = None
+
+            # Monitoring data of applications shared by all spaces, keyed by application guid
+            self.app_monitoring_data = {}
+            self.monitoring_loader = MonitoringLoader(self, max_workers=self.max_workers)
+
+            # Services, service plans and service brokers shared by all spaces, keyed by guid
+            self.service_catalog = ServiceCatalog()
 
         except Exception as e: # pylint: disable=invalid-name
             logging.error('Failed to instantiate Controller', exc_info=e)
@@ -31,7 +66,8 @@ class Controller:
 
     def __set_controller_sessions(self, api_endpoint, user, password, **kwargs):
         try:
-            controller_session = ControllerSession(api_endpoint)
+            controller_session = ControllerSession(api_endpoint, **self.get_session_config('controller'))
+            self.configure_session(controller_session, 'controller')
             controller_info = controller_session.get('/v2/info', **kwargs)
             authorization_endpoint = controller_info.get('response_body').get(
                 'authorizationEndpoint')
@@ -40,7 +76,8 @@ class Controller:
             raise
         else:
             try:
-                uaa_session = ControllerSession(authorization_endpoint, **kwargs)
+                uaa_session = ControllerSession(authorization_endpoint, **kwargs,
+                                                **self.get_session_config('uaa'))
                 uaa_session.basic_auth = ('cf', '')
                 data = {'grant_type': 'password',
                         'username': user,
@@ -55,13 +92,13 @@ class Controller:
             else:
                 controller_session.bearer_auth = bearer_token
                 uaa_session.bearer_auth = bearer_token
-                logging.info(f'Authenticated the remote Controller sessions of user {user}')
+                self.configure_session(uaa_session, 'uaa')
+                logging.info('Authenticated the remote Controller sessions of user %s', user)
                 return controller_session, uaa_session
 
     def __set_hana_broker_session(self, controller_session):
         try:
-            brokers_info = controller_session.get('/v2/service_brokers')
-            brokers = brokers_info.get('response_body').get('serviceBrokers')
+            brokers = list(controller_session.iter_items('/v2/service_brokers', 'serviceBrokers'))
             if bool(brokers):
                 hana_broker = next(
                     filter(
@@ -87,11 +124,119 @@ class Controller:
                     'Failed to load HANA Broker credentials', exc_info=e)
                 raise
             else:
-                broker_session = ControllerSession(broker_endpoint)
+                broker_session = ControllerSession(broker_endpoint,
+                                                   **self.get_session_config('hana_broker'))
                 broker_session.basic_auth = (user, password)
+                self.configure_session(broker_session, 'hana_broker')
                 logging.info('Authenticated the remote HANA Broker session')
                 return broker_session
 
+    def get_session_config(self, name):
+        # The settings of the session, e.g., the timeouts, may be overridden per endpoint
+        session_config = {setting: value for setting, value in self.session_config.items()
+                          if setting != 'endpoints'}
+        session_config.update(self.session_config.get('endpoints', {}).get(name) or {})
+        return session_config
+
+    def configure_session(self, session, name):
+        session.request_metrics = self.request_metrics
+        session.rate_limiter = self.rate_limiters.get(name)
+        session.concurrency_limiter = self.concurrency_limiters.get(name)
+        session.transport_policy = self.transport_policy
+        if self.response_cache is not None:
+            session.response_cache = self.response_cache
+            session.response_cache_scope = self.response_cache_scope
+
+    @property
+    def sessions(self):
+        return {'Controller': self.controller_session,
+                'UAA': self.uaa_session,
+                'HANA Broker': self.hana_broker_session}
+
+    def log_request_statistics(self):
+        for name, session in self.sessions.items():
+            stats = session.single_flight_stats
+            logging.info(('%s session sent %s HTTP GET requests, '
+                          '%s identical in-flight requests were coalesced'),
+                         name, stats.get("sent"), stats.get("coalesced"))
+            for host, pool_stats in session.pool_stats.items():
+                logging.debug(('%s session connection pool %s served '
+                               '%s requests '
+                               'over %s connections'),
+                              name, host, pool_stats.get("requests"), pool_stats.get("connections"))
+            stats = session.pagination_stats
+            logging.debug('%s session loaded %s pages of lists, %s of them were prefetched',
+                          name, stats.get('pages'), stats.get('prefetched'))
+        if self.transport_policy is not None:
+            stats = self.transport_policy.stats
+            logging.info(('Retried %s requests, sent %s hedged HTTP GET requests, '
+                          '%s of them answered first'),
+                         stats.get('retried'), stats.get('hedged'), stats.get('hedges_won'))
+        for name, rate_limiter in self.rate_limiters.items():
+            stats = rate_limiter.stats
+            logging.info(('Rate limit %s delayed %s of %s requests '
+                          'by %.1f s in total'),
+                         name, stats.get('waited'), stats.get('acquired'), stats.get('wait_seconds'))
+        for name, concurrency_limiter in self.concurrency_limiters.items():
+            stats = concurrency_limiter.stats
+            logging.info(('Concurrency limit %s changed from %s to %s, '
+                          'ranged %s - %s with %s increases and %s decreases, '
+                          '%s requests waited for the limit'),
+                         name, stats.get('initial_limit'), int(concurrency_limiter.limit),
+                         stats.get('min_limit'), stats.get('max_limit'),
+                         stats.get('increases'), stats.get('decreases'), stats.get('waited'))
+        if self.response_cache is not None:
+            stats = self.response_cache.stats
+            logging.info(('Response cache served %s HTTP GET requests, '
+                          '%s requests missed it, '
+                          '%s responses were stored'),
+                         stats.get("hits"), stats.get("misses"), stats.get("stored"))
+
+    #
+    # Lazy probe of the filter of the service keys by a list of service instances
+    #
+    @property
+    def service_key_filter(self):
+        return self._service_key_filter
+
+    @service_key_filter.getter
+    @load_once('_service_key_filter')
+    def service_key_filter(self):
+        # Probed once per run: a filter by an unknown guid and the service instance of any key
+        # returns the key only if the whole list is applied, not just its first guid
+        if self._service_key_filter is None:
+            params = {'noServiceCredentials': 'true'}
+            try:
+                service_keys, _ = self.controller_session.get_page('/v2/service_keys',
+                                                                   'serviceKeys', False,
+                                                                   params=params)
+                service_key = next(iter(service_keys), None)
+                if service_key is None:
+                    # Without any service key every filter returns the right, empty lists
+                    supports_guid_list = True
+                else:
+                    service_key_guid = service_key.get('metadata').get('guid')
+                    instance_guid = service_key.get('serviceKeyEntity').get(
+                        'service_instance_guid')
+                    params['q'] = f'service_instance_guid IN {UNKNOWN_GUID},{instance_guid}'
+                    filtered_service_keys = list(self.controller_session.iter_items(
+                        '/v2/service_keys', 'serviceKeys', params=params))
+                    supports_guid_list = (
+                        any(filtered_service_key.get('metadata').get('guid') == service_key_guid
+                            for filtered_service_key in filtered_service_keys)
+                        and all((filtered_service_key.get('serviceKeyEntity') or {}).get(
+                            'service_instance_guid') == instance_guid
+                                for filtered_service_key in filtered_service_keys))
+            except DeadlineExceeded:
+                raise
+            except Exception as e: # pylint: disable=invalid-name
+                logging.warning('Failed to probe the filter of the service keys', exc_info=e)
+                supports_guid_list = False
+            logging.debug('Filter of the service keys by a list of service instances: %s',
+                          'supported' if supports_guid_list else 'not supported')
+            self._service_key_filter = {'supports_guid_list': supports_guid_list}
+        return self._service_key_filter
+
     #
     # Lazy load Controller databases
     #
@@ -100,28 +245,24 @@ class Controller:
         return self._databases
 
     @databases.getter
+    @load_once('_databases')
     def databases(self):
         hana_broker_session = self.hana_broker_session
-        if not self._databases:
+        if self._databases is None:
             try:
-                databases_info = hana_broker_session.get('/admin/databases')
-                databases = databases_info.get('response_body').get(
-                    'databases')
+                # Only the ids are kept from the streamed list
+                database_ids = [database.get('id') for database
+                                 in hana_broker_session.iter_items('/admin/databases', 'databases',
+                                                                 streamed=True)]
             except Exception as e: # pylint: disable=invalid-name
                 logging.error('Failed to fetch databases from HANA Broker',
                               exc_info=e)
                 raise
             else:
                 try:
-                    mappings_info = hana_broker_session.get('/admin/database_mappings')
-                    mappings = mappings_info.get('response_body').get('mappings')
-                except Exception as e: # pylint: disable=invalid-name
-                    logging.error('Failed to fetch databases mappings from HANA Broker',
-                                  exc_info=e)
-                    raise
-                else:
                     parsed_mappings = {}
-                    for mapping in mappings:
+                    for mapping in hana_broker_session.iter_items('/admin/database_mappings',
+                                                                  'mappings', streamed=True):
                         database_id = mapping.get('database_id')
                         if database_id not in parsed_mappings:
                             parsed_mappings[database_id] = []
@@ -129,10 +270,13 @@ class Controller:
                         space_guid = mapping.get('space_guid')
                         if bool(org_guid) | bool(space_guid):
                             parsed_mappings[database_id].append((org_guid, space_guid))
-
+                except Exception as e: # pylint: disable=invalid-name
+                    logging.error('Failed to fetch databases mappings from HANA Broker',
+                                  exc_info=e)
+                    raise
+                else:
                     parsed_databases = {}
-                    for database in databases:
-                        database_id = database.get('id')
+                    for database_id in database_ids:
                         try:
                             database_info = hana_broker_session.get(
                                 f'/admin/databases/{database_id}',
@@ -149,7 +293,8 @@ class Controller:
                                 database_id)
                             parsed_databases[database_id] = Database(self, database_metadata)
                     self._databases = parsed_databases
-                    logging.info('Loaded the information about databases from HANA Broker')
+                    logging.info('Loaded the information about %s databases from HANA Broker',
+                                 len(parsed_databases))
         return self._databases
 
     @databases.setter
@@ -164,23 +309,25 @@ class Controller:
         return self._orgs
 
     @orgs.getter
+    @load_once('_orgs')
     def orgs(self):
         controller_session = self.controller_session
-        if not self._orgs:
+        if self._orgs is None:
             try:
-                orgs_info = controller_session.get('/v2/organizations')
-                orgs = orgs_info.get('response_body').get('organizations')
+                # The organizations are built while the list is received
+                parsed_orgs = {}
+                for org in controller_session.iter_items('/v2/organizations', 'organizations',
+                                                           streamed=True):
+                    org_guid = org.get('metadata').get('guid')
+                    parsed_orgs[org_guid] = Organization(self, org)
             except Exception as e: # pylint: disable=invalid-name
                 logging.error('Failed to fetch organizations from Controller',
                               exc_info=e)
                 raise
             else:
-                parsed_orgs = {}
-                for org in orgs:
-                    org_guid = org.get('metadata').get('guid')
-                    parsed_orgs[org_guid] = Organization(self, org)
                 self._orgs = parsed_orgs
-                logging.info('Loaded the information about organizations from Controller')
+                logging.info('Loaded the information about %s organizations from Controller',
+                             len(parsed_orgs))
         return self._orgs
 
     @orgs.setter
@@ -195,6 +342,7 @@ class Controller:
         return self._app_monitoring_config
 
     @app_monitoring_config.getter
+    @load_once('_app_monitoring_config')
     def app_monitoring_config(self):
         controller_session = self.controller_session
         if not self._app_monitoring_config:
@@ -227,6 +375,7 @@ class Controller:
         return self._monitoring_config
 
     @monitoring_config.getter
+    @load_once('_monitoring_config')
     def monitoring_config(self):
         controller_session = self.controller_session
         if not self._monitoring_config:
@@ -255,22 +404,23 @@ class Controller:
         return self._users
 
     @users.getter
+    @load_once('_users')
     def users(self):
         controller_session = self.controller_session
-        if not self._users:
+        if self._users is None:
             try:
-                users_info = controller_session.get('/v2/users')
-                users = users_info.get('response_body').get('users')
+                # The users are built while the list is received
+                parsed_users = {}
+                for user in controller_session.iter_items('/v2/users', 'users', streamed=True):
+                    user_guid = user.get('metadata').get('guid')
+                    parsed_users[user_guid] = User(self, user)
             except Exception as e:  # pylint: disable=invalid-name
                 logging.error('Failed to fetch users from Controller', exc_info=e)
                 raise
             else:
-                parsed_users = {}
-                for user in users:
-                    user_guid = user.get('metadata').get('guid')
-                    parsed_users[user_guid] = User(self, user)
                 self._users = parsed_users
-                logging.info('Loaded the information about users from Controller')
+                logging.info('Loaded the information about %s users from Controller',
+                             len(parsed_users))
         return self._users
 
     @users.setter
@@ -308,14 +458,14 @@ class Controller:
                     if response.get('responses'):
                         last_state = response.get('responses').pop()
                         status = last_state.get('jobEntity').get('status')
-                        logging.debug((f'Identified status {status} '
-                                       f'of job guid: {job_guid} based on {response}'))
+                        logging.debug(('Identified status %s '
+                                       'of job guid: %s based on %s'), status, job_guid, response)
 
                     # Check if the single result is returned and use it
                     elif response.get('jobEntity'):
                         status = response.get('jobEntity').get('status')
-                        logging.debug((f'Identified status {status} '
-                                       f'of job guid: {job_guid} based on {response}'))
+                        logging.debug(('Identified status %s '
+                                       'of job guid: %s based on %s'), status, job_guid, response)
 
                     else:
                         raise Exception(f'Failed to recognize the job status based on {response}')
@@ -341,7 +491,7 @@ class Controller:
                               exc_info=e)
                 raise
             else:
-                logging.info(f'Job {job_guid} has status {status}')
+                logging.info('Job %s has status %s', job_guid, status)
                 return status
 
     #
@@ -367,8 +517,8 @@ class Controller:
                     # The request to stop the application is submitted and accepted
                     if request_status == 201:
                         job_guid = operation_info.get('response_headers').get('job-id')
-                        logging.info((f'The request to stop application {app_guid} is accepted. '
-                                      f'Started monitoring job {job_guid}'))
+                        logging.info(('The request to stop application %s is accepted. '
+                                      'Started monitoring job %s'), app_guid, job_guid)
                         job_status = self.get_job_status(job_guid, wait_for_finish=True)
                     else:
                         raise Exception((f'The request to stop application {app_guid} '
@@ -382,11 +532,11 @@ class Controller:
                 else:
                     if job_status == 'FINISHED':
                         stopped = True
-                        logging.info(f'Stopped application {app_guid}')
+                        logging.info('Stopped application %s', app_guid)
                     else:
                         stopped = False
-                        logging.info((f'Failed to stop application {app_guid}. '
-                                      f'The operation status is {job_status}'))
+                        logging.info(('Failed to stop application %s. '
+                                      'The operation status is %s'), app_guid, job_status)
             return stopped
 
     def unbind_app_from_route(self, route_guid, app_guid):
@@ -399,8 +549,8 @@ class Controller:
 
             # The request to unbind the application from route is submitted and accepted
             if request_status == 201:
-                logging.info((f'The request to unbind application {app_guid} '
-                              f'from route {route_guid} performed succesfully'))
+                logging.info(('The request to unbind application %s '
+                              'from route %s performed succesfully'), app_guid, route_guid)
                 unbound = True
             else:
                 raise Exception((f'The request to unbind application {app_guid} '
@@ -422,8 +572,8 @@ class Controller:
             
             # The request to delete the application task is submitted and accepted
             if request_status == 204:
-                logging.info((f'The request to delete application task {task_guid} '
-                              'performed succesfully'))
+                logging.info(('The request to delete application task %s '
+                              'performed succesfully'), task_guid)
                 deleted = True
             else:
                 raise Exception((f'The request to delete application task {task_guid} '
@@ -448,16 +598,17 @@ class Controller:
                 for task_guid in tasks.keys():
                     deleted = self.delete_task(task_guid)
                     if deleted:
-                        logging.info((f'Deleted task {task_guid} of application {app_guid}'
-                                      f'in {org.name} / {space.name}'))
+                        logging.info(('Deleted task %s of application %s'
+                                      'in %s / %s'), task_guid, app_guid, org.name, space.name)
                     else:
                         raise Exception((f'Failed to delete task {task_guid} of '
                                          f'application {app.name} / {app_guid} '
                                          f'from in {org.name} / {space.name}'))
-                logging.info(f'Deleted all application tasks of application {app.name} / {app.guid}')
+                logging.info('Deleted all application tasks of application %s / %s',
+                             app.name, app.guid)
             else:
-                logging.info((f'No tasks are identified for application {app_guid} '
-                              f'in {org.name} / {space.name}'))
+                logging.info(('No tasks are identified for application %s '
+                              'in %s / %s'), app_guid, org.name, space.name)
                 deleted = True
         except Exception as e:  # pylint: disable=invalid-name
             logging.error((f'Failed to delete tasks of application {app.name} / {app_guid}  '
@@ -476,7 +627,7 @@ class Controller:
 
             # The request to delete the application is submitted and accepted
             if request_status == 204:
-                logging.info(f'The request to delete application {app_guid} performed succesfully')
+                logging.info('The request to delete application %s performed succesfully', app_guid)
                 deleted = True
             else:
                 raise Exception((f'The request to delete application {app_guid} '
@@ -499,8 +650,8 @@ class Controller:
 
             # The request to delete the application instance is submitted and accepted
             if request_status == 204:
-                logging.info((f'The request to delete application instance {instance_guid} '
-                              f'of application {app_guid} performed succesfully'))
+                logging.info(('The request to delete application instance %s '
+                              'of application %s performed succesfully'), instance_guid, app_guid)
                 deleted = True
             else:
                 raise Exception((f'The request to delete application instance {instance_guid} '
@@ -527,32 +678,34 @@ class Controller:
             stopped = self.stop_app(app_guid)
             if stopped:
                 # Unbind the application from routes
-                logging.info((f'Succesfully stopped application {app.name} / {app_guid} '
-                              f'in {org.name} / {space.name}'))
+                logging.info(('Succesfully stopped application %s / %s '
+                              'in %s / %s'), app.name, app_guid, org.name, space.name)
                 unbound_from_route = False
                 if routes:
                     for route_guid in routes:
                         unbound_from_route = self.unbind_app_from_route(route_guid, app_guid)
                 else:
-                    logging.info((f'No routes were associated '
-                                  f'with application {app.name} / {app_guid}'))
+                    logging.info(('No routes were associated '
+                                  'with application %s / %s'), app.name, app_guid)
                     unbound_from_route = True
                 if unbound_from_route:
-                    logging.info((f'Succesfully unbound application {app.name} / {app_guid} '
-                                  f'from routes in {org.name} / {space.name}'))
+                    logging.info(('Succesfully unbound application %s / %s '
+                                  'from routes in %s / %s'),
+                                 app.name, app_guid, org.name, space.name)
                     
                     # Delete tasks of the application
                     deleted_tasks = self.delete_app_tasks(org_guid, space_guid, app_guid)
                     if deleted_tasks:
-                        logging.info((f'Succesfully deleted tasks of '
-                                      f'application {app.name} / {app_guid} '
-                                      f'from routes in {org.name} / {space.name}'))
+                        logging.info(('Succesfully deleted tasks of '
+                                      'application %s / %s '
+                                      'from routes in %s / %s'),
+                                     app.name, app_guid, org.name, space.name)
 
                         # Delete the application
                         deleted = self.delete_app(app_guid)
                         if deleted:
-                            logging.info((f'Gracefully deleted application {app.name} / {app_guid} '
-                                          f'from {org.name} / {space.name}'))
+                            logging.info(('Gracefully deleted application %s / %s '
+                                          'from %s / %s'), app.name, app_guid, org.name, space.name)
                         else:
                             raise Exception((f'Failed to delete application {app.name} / {app_guid} '
                                              f'from in {org.name} / {space.name}'))
@@ -599,13 +752,13 @@ class Controller:
                 if request_status == 202:
                     job_guid = operation_info.get(
                         'response_headers').get('job-id')
-                    logging.info((f'The request to delete service instance {service_instances_guid}'
+                    logging.info(('The request to delete service instance %s'
                                   ' is accepted. '
-                                  f'Started monitoring job {job_guid}'))
+                                  'Started monitoring job %s'), service_instances_guid, job_guid)
                     while job_status not in ['FINISHED', 'FAILED', 'NOT FOUND', 'SERVER ERROR']:
                         job_status = self.get_job_status(job_guid)
-                        logging.info((f'Monitoring job {job_guid}. '
-                                      f'The current status is {job_status}'))
+                        logging.info(('Monitoring job %s. '
+                                      'The current status is %s'), job_guid, job_status)
                         # Wait for 10 seconds before updating the job status
                         time.sleep(5)
                 else:
@@ -620,11 +773,11 @@ class Controller:
             else:
                 if job_status == 'FINISHED':
                     deleted = True
-                    logging.info(f'Delete service instance {service_instances_guid}')
+                    logging.info('Delete service instance %s', service_instances_guid)
                 else:
                     deleted = False
-                    logging.info((f'Failed to delete service instance {service_instances_guid}. '
-                                  f'The operation status is {job_status}'))
+                    logging.info(('Failed to delete service instance %s. '
+                                  'The operation status is %s'), service_instances_guid, job_status)
         else:
             # Synchronous deletion is valid for operations not exceeding
             # the request processing timeout
@@ -637,7 +790,7 @@ class Controller:
                 # The request to delete the service instance is submitted and accepted
                 if request_status == 204:
                     logging.info(('The request to delete service instance '
-                                  f'{service_instances_guid} performed succesfully'))
+                                  '%s performed succesfully'), service_instances_guid)
                     deleted = True
                 else:
                     raise Exception((f'The request to delete service instance '
@@ -659,9 +812,12 @@ class Controller:
         params = {'async': 'True',
                   'accepts_incomplete': 'True'}
 
+        # Without a configured limit the deletion requests are submitted every 5 seconds
+        deletion_rate_limiter = (self.rate_limiters.get('service_instance_deletions')
+                                 or RateLimiter(rate=0.2))
+
         for service_instances_guid in service_instance_guids:
-            # Wait for 5 seconds before submitting a new service instance deletion request
-            time.sleep(5)
+            deletion_rate_limiter.acquire()
 
             try:
                 operation_info = self.controller_session.delete(
@@ -675,8 +831,8 @@ class Controller:
                     job_guid = operation_info.get('response_headers').get('job-id')
                     job_guids.append(job_guid)
                     logging.info(('The request to delete service instance '
-                                  f'{service_instances_guid} is accepted. '
-                                  f'Started monitoring job {job_guid}'))
+                                  '%s is accepted. '
+                                  'Started monitoring job %s'), service_instances_guid, job_guid)
                 else:
                     raise Exception(('The request to delete service instance '
                                      f'{service_instances_guid} '
@@ -697,15 +853,16 @@ class Controller:
                             time.sleep(3)
                             job_status = self.get_job_status(job_guid)
                             logging.info(
-                                f'Monitoring job {job_guid}. The current status is {job_status}')
+                                'Monitoring job %s. The current status is %s', job_guid, job_status)
                             if job_status in ['FINISHED', 'FAILED', 'NOT FOUND', 'SERVER ERROR']:
                                 job_guids.remove(job_guid)
                                 if job_status == 'FINISHED':
                                     logging.info(
-                                        f'Deletion job {job_guid} is succesfully finished')
+                                        'Deletion job %s is succesfully finished', job_guid)
                                 else:
-                                    logging.info((f'Deletion job {job_guid} is not finished. '
-                                                  f'The operation status is {job_status}'))
+                                    logging.info(('Deletion job %s is not finished. '
+                                                  'The operation status is %s'),
+                                                 job_guid, job_status)
                             else:
                                 pass
 
@@ -750,9 +907,18 @@ class Controller:
 
 class User:
     # pylint: disable=too-many-instance-attributes
+    __slots__ = ('controller', '_representation', '_spaces_representation',
+                 '_orgs_representation', '_role_collections_representation',
+                 '_audited_org_guids', '_managed_org_guids', '_managed_space_guids',
+                 '_audited_space_guids', '_developer_space_guids', '_role_collections',
+                 'guid', '_created_at', '_updated_at',
+                 'uaa_guid', 'name', 'origin', 'active', 'orphaned', '_load_locks')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, controller, raw_data):
-        logging.debug(f'Loading the user information based on {raw_data}')
+        logging.debug('Loading the user information based on %s', raw_data)
 
         self.controller = controller
         self._representation = None
@@ -761,34 +927,30 @@ class User:
         self._role_collections_representation = None
 
         # list of tuples (org_guid, space_guid) > easier to search
-        self._audited_org_guids = []
+        self._audited_org_guids = None
         # list of tuples (org_guid, space_guid) > easier to search
-        self._managed_org_guids = []
+        self._managed_org_guids = None
         # list of tuples (org_guid, space_guid) > easier to search
-        self._managed_space_guids = []
+        self._managed_space_guids = None
         # list of tuples (org_guid, space_guid) > easier to search
-        self._audited_space_guids = []
+        self._audited_space_guids = None
         # list of tuples (org_guid, space_guid) > easier to search
-        self._developer_space_guids = []
+        self._developer_space_guids = None
 
-        self._role_collections = []
+        self._role_collections = None
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
 
         user_entity = raw_data.get('userEntity')
         self.uaa_guid = user_entity.get('uaaGuid')
         self.name = user_entity.get('username')
-        self.origin = user_entity.get('origin')
+        self.origin = intern_string(user_entity.get('origin'))
         self.active = user_entity.get('active')
         self.orphaned = user_entity.get('orphaned')
-        logging.info(f'Loaded information about user {self.name} / {self.guid}')
+        logging.debug('Loaded information about user %s / %s', self.name, self.guid)
 
     #
     # Lazy load user's role collections
@@ -798,9 +960,10 @@ class User:
         return self._role_collections
 
     @role_collections.getter
+    @load_once('_role_collections')
     def role_collections(self):
         uaa_session = self.controller.uaa_session
-        if not self._role_collections:
+        if self._role_collections is None:
             try:
                 params = {'deactivatedUser': 'True'}
                 role_collections_info = uaa_session.get(
@@ -817,7 +980,7 @@ class User:
                 parsed_role_collections = role_collections if role_collections else []
                 self._role_collections = parsed_role_collections
                 logging.debug(('Loaded the information about role collections '
-                              f'of user {self.name} / {self.guid}'))
+                              'of user %s / %s'), self.name, self.guid)
         return self._role_collections
 
     @role_collections.setter
@@ -855,13 +1018,13 @@ class User:
         return self._audited_org_guids
 
     @audited_org_guids.getter
+    @load_once('_audited_org_guids')
     def audited_org_guids(self):
         controller_session = self.controller.controller_session
-        if not self._audited_org_guids:
+        if self._audited_org_guids is None:
             try:
-                audited_orgs_info = controller_session.get(
-                    f'/v2/users/{self.guid}/audited_organizations')
-                audited_orgs = audited_orgs_info.get('response_body').get('organizations')
+                audited_orgs = list(controller_session.iter_items(
+                    f'/v2/users/{self.guid}/audited_organizations', 'organizations'))
             except Exception as e:  # pylint: disable=invalid-name
                 logging.error(('Failed to fetch audited organizations '
                                f'of user {self.name} / {self.guid}'),
@@ -874,7 +1037,7 @@ class User:
                     parsed_audited_org_guids.append(org_guid)
                 self._audited_org_guids = parsed_audited_org_guids
                 logging.debug(('Loaded the information about audited organizations '
-                               f'of user {self.name} / {self.guid}'))
+                               'of user %s / %s'), self.name, self.guid)
         return self._audited_org_guids
 
     @audited_org_guids.setter
@@ -889,13 +1052,13 @@ class User:
         return self._managed_org_guids
 
     @managed_org_guids.getter
+    @load_once('_managed_org_guids')
     def managed_org_guids(self):
         controller_session = self.controller.controller_session
-        if not self._managed_org_guids:
+        if self._managed_org_guids is None:
             try:
-                managed_orgs_info = controller_session.get(
-                    f'/v2/users/{self.guid}/managed_organizations')
-                managed_orgs = managed_orgs_info.get('response_body').get('organizations')
+                managed_orgs = list(controller_session.iter_items(
+                    f'/v2/users/{self.guid}/managed_organizations', 'organizations'))
             except Exception as e:  # pylint: disable=invalid-name
                 logging.error(('Failed to fetch managed organizations '
                                f'of user {self.name} / {self.guid}'),
@@ -908,7 +1071,7 @@ class User:
                     parsed_managed_org_guids.append(org_guid)
                 self._managed_org_guids = parsed_managed_org_guids
                 logging.debug(('Loaded the information about managed organizations '
-                               f'of user {self.name} / {self.guid}'))
+                               'of user %s / %s'), self.name, self.guid)
         return self._managed_org_guids
 
     @managed_org_guids.setter
@@ -923,13 +1086,13 @@ class User:
         return self._managed_space_guids
 
     @managed_space_guids.getter
+    @load_once('_managed_space_guids')
     def managed_space_guids(self):
         controller_session = self.controller.controller_session
-        if not self._managed_space_guids:
+        if self._managed_space_guids is None:
             try:
-                managed_spaces_info = controller_session.get(
-                    f'/v2/users/{self.guid}/managed_spaces')
-                managed_spaces = managed_spaces_info.get('response_body').get('spaces')
+                managed_spaces = list(controller_session.iter_items(
+                    f'/v2/users/{self.guid}/managed_spaces', 'spaces'))
             except Exception as e:  # pylint: disable=invalid-name
                 logging.error(f'Failed to fetch managed spaces of user {self.name} / {self.guid}',
                               exc_info=e)
@@ -942,7 +1105,7 @@ class User:
                     parsed_managed_space_guids.append((org_guid, space_guid))
                 self._managed_space_guids = parsed_managed_space_guids
                 logging.debug(('Loaded the information about managed spaces '
-                               f'of user {self.name} / {self.guid}'))
+                               'of user %s / %s'), self.name, self.guid)
         return self._managed_space_guids
 
     @managed_space_guids.setter
@@ -957,13 +1120,13 @@ class User:
         return self._audited_space_guids
 
     @audited_space_guids.getter
+    @load_once('_audited_space_guids')
     def audited_space_guids(self):
         controller_session = self.controller.controller_session
-        if not self._audited_space_guids:
+        if self._audited_space_guids is None:
             try:
-                audited_spaces_info = controller_session.get(
-                    f'/v2/users/{self.guid}/audited_spaces')
-                audited_spaces = audited_spaces_info.get('response_body').get('spaces')
+                audited_spaces = list(controller_session.iter_items(
+                    f'/v2/users/{self.guid}/audited_spaces', 'spaces'))
             except Exception as e:  # pylint: disable=invalid-name
                 logging.error(f'Failed to fetch audited spaces of user {self.name} / {self.guid}',
                               exc_info=e)
@@ -976,7 +1139,7 @@ class User:
                     parsed_audited_space_guids.append((org_guid, space_guid))
                 self._audited_space_guids = parsed_audited_space_guids
                 logging.debug(('Loaded the information about audited spaces '
-                               f'of user {self.name} / {self.guid}'))
+                               'of user %s / %s'), self.name, self.guid)
         return self._audited_space_guids
 
     @audited_space_guids.setter
@@ -991,13 +1154,13 @@ class User:
         return self._developer_space_guids
 
     @developer_space_guids.getter
+    @load_once('_developer_space_guids')
     def developer_space_guids(self):
         controller_session = self.controller.controller_session
-        if not self._developer_space_guids:
+        if self._developer_space_guids is None:
             try:
-                developer_spaces_info = controller_session.get(
-                    f'/v2/users/{self.guid}/developer_spaces')
-                developer_spaces = developer_spaces_info.get('response_body').get('spaces')
+                developer_spaces = list(controller_session.iter_items(
+                    f'/v2/users/{self.guid}/developer_spaces', 'spaces'))
             except Exception as e:  # pylint: disable=invalid-name
                 logging.error(
                     f'Failed to fetch developer spaces of user {self.name} / {self.guid}',
@@ -1011,7 +1174,7 @@ class User:
                     parsed_developer_space_guids.append((org_guid, space_guid))
                 self._developer_space_guids = parsed_developer_space_guids
                 logging.debug(('Loaded the information about developer spaces '
-                               f'of user {self.name} / {self.guid}'))
+                               'of user %s / %s'), self.name, self.guid)
         return self._developer_space_guids
 
     @developer_space_guids.setter
@@ -1,10 +1,16 @@
 import logging
+from components.tools.utils import load_once # pylint: disable=import-error
 
 class Database:
     # pylint: disable=too-many-instance-attributes
+    __slots__ = ('controller', 'hana_broker_session', 'guid', 'tenant_name', 'encryption',
+                 'hana_broker_user', 'xsa_hana_broker_schema', 'usergroups', 'jdbc_endpoint',
+                 'mapped_orgs_space_guids', 'mapped_org_space_names',
+                 '_invalid_instances', '_representation', '_invalid_instances_representation',
+                 '_load_locks')
 
     def __init__(self, controller, raw_data):
-        logging.debug(f'Loading the database information based on {raw_data}')
+        logging.debug('Loading the database information based on %s', raw_data)
 
         self.controller = controller
         self.hana_broker_session = self.controller.hana_broker_session
@@ -27,12 +33,12 @@ class Database:
             mapping_name = f'{org_name}/{space_name}'
             self.mapped_org_space_names.append(mapping_name)
 
-        self._invalid_instances = {}
+        self._invalid_instances = None
         self._representation = None
         self._invalid_instances_representation = None
 
-        logging.info((f'Loaded information about the database {self.tenant_name} / {self.guid} '
-                      'from Controller'))
+        logging.debug(('Loaded information about the database %s / %s '
+                       'from Controller'), self.tenant_name, self.guid)
 
     #
     # Represent the database for Collector
@@ -71,9 +77,10 @@ class Database:
         return self._invalid_instances
 
     @invalid_instances.getter
+    @load_once('_invalid_instances')
     def invalid_instances(self):
         hana_broker_session = self.hana_broker_session
-        if not self._invalid_instances:
+        if self._invalid_instances is None:
             try:
                 invalid_instances_info = hana_broker_session.get(
                     f'/admin/invalid_instances/{self.guid}')
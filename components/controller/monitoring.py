@@ -0,0 +1,103 @@
+import logging
+import threading
+from components.tools.utils import map_concurrently # pylint: disable=import-error
+from components.tools.deadline import deadline_bound # pylint: disable=import-error
+
+
+class MonitoringLoader:
+    # Loads the monitoring status of many applications at once and keeps it
+    # in the shared per-app cache of the Controller (Controller.app_monitoring_data).
+    # The collection endpoint is used if the Controller provides one, otherwise
+    # the status is requested per application with a bounded number of parallel requests
+
+    def __init__(self, controller, **kwargs):
+        kwargs.setdefault('max_workers', 8)
+
+        self.controller = controller
+        self.controller_session = self.controller.controller_session
+        self.max_workers = kwargs.get('max_workers')
+
+        # None - not probed yet, True / False - the result of probing
+        self._collection_supported = None
+        # Parallel callers wait for the running load instead of requesting the same data again
+        self._lock = threading.RLock()
+
+    def load_collection(self):
+        # The collection endpoint is requested once per run. The answer covers
+        # all applications known by the Controller
+        with self._lock:
+            if self._collection_supported is None:
+                try:
+                    monitoring_data_info = self.controller_session.get(
+                                                '/v2/monitoring/status/apps')
+                    request_status = monitoring_data_info.get('http_status')
+                    response = monitoring_data_info.get('response_body')
+                except Exception as e: # pylint: disable=invalid-name
+                    logging.error(('Failed to fetch the monitoring data of applications '
+                                   'from Controller'), exc_info=e)
+                    raise
+                else:
+                    monitoring_data = (self.parse_collection(response)
+                                       if request_status == 200
+                                       else None)
+                    if monitoring_data is not None:
+                        self.controller.app_monitoring_data.update(monitoring_data)
+                        self._collection_supported = True
+                        logging.info(('Loaded the monitoring data of '
+                                      '%s applications from Controller'), len(monitoring_data))
+                    else:
+                        self._collection_supported = False
+                        logging.debug(('The Controller does not provide the collection of the '
+                                       'application monitoring data. '
+                                       'Received HTTP %s'), request_status)
+        return self._collection_supported
+
+    @staticmethod
+    def parse_collection(response):
+        # The expected response is a list of the application monitoring statuses,
+        # each of them referencing the application guid
+        statuses = response.get('apps') if isinstance(response, dict) else None
+        if not isinstance(statuses, list):
+            return None
+        parsed_monitoring_data = {}
+        for status in statuses:
+            app_guid = status.get('app_guid') or status.get('guid')
+            if not app_guid:
+                return None
+            parsed_monitoring_data[app_guid] = status
+        return parsed_monitoring_data
+
+    def load_app(self, app_guid):
+        try:
+            monitoring_data_info = self.controller_session.get(
+                                        f'/v2/monitoring/status/apps/{app_guid}')
+            monitoring_data = monitoring_data_info.get('response_body')
+        except Exception as e: # pylint: disable=invalid-name
+            logging.error(f'Failed to fetch the monitoring data of application {app_guid}',
+                          exc_info=e)
+            raise
+        else:
+            self.controller.app_monitoring_data[app_guid] = monitoring_data
+            logging.debug('Loaded the monitoring data of application %s', app_guid)
+        return monitoring_data
+
+    def load(self, app_guids):
+        app_monitoring_data = self.controller.app_monitoring_data
+        with self._lock:
+            missing_guids = [guid for guid in app_guids if guid not in app_monitoring_data]
+            if missing_guids and self.load_collection():
+                missing_guids = [guid for guid in missing_guids if guid not in app_monitoring_data]
+            if missing_guids:
+                map_concurrently(self.load_app, missing_guids, self.max_workers)
+                logging.debug('Loaded the monitoring data of %s applications', len(missing_guids))
+        return {guid: app_monitoring_data.get(guid) for guid in app_guids}
+
+    def load_space(self, space):
+        return self.load(space.app_guids)
+
+    @deadline_bound()
+    def load_org(self, org):
+        app_guids = []
+        for space in org.spaces.values():
+            app_guids.extend(space.app_guids)
+        return self.load(app_guids)
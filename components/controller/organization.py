@@ -1,29 +1,34 @@
 import logging
 import json
-from components.tools.utils import epoch_to_datetime # pylint: disable=import-error
+from components.tools.utils import intern_string, EpochDatetime, load_once # pylint: disable=import-error
 from components.controller.space import Space # pylint: disable=import-error
 
 
 class Organization:
     # pylint: disable=too-many-instance-attributes
+    __slots__ = ('controller', 'controller_session',
+                 'guid', 'name', 'state', '_created_at', '_updated_at', '_spaces', '_load_locks')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, controller, raw_data):
         try:
-            logging.debug(f'Loading the organization information based on {raw_data}')
+            logging.debug('Loading the organization information based on %s', raw_data)
 
             self.controller = controller
             self.controller_session = self.controller.controller_session
             self.guid = raw_data.get('metadata').get('guid')
-            self.name = raw_data.get('organizationEntity').get('name')
-            self.state = raw_data.get('organizationEntity').get('state')
-            self.created_at = epoch_to_datetime(raw_data.get('metadata').get('created_at'))
-            self.updated_at = epoch_to_datetime(raw_data.get('metadata').get('updated_at'))
+            self.name = intern_string(raw_data.get('organizationEntity').get('name'))
+            self.state = intern_string(raw_data.get('organizationEntity').get('state'))
+            self.created_at = raw_data.get('metadata').get('created_at')
+            self.updated_at = raw_data.get('metadata').get('updated_at')
 
             # Lazy load the organization content
-            self._spaces = {}
+            self._spaces = None
 
-            logging.info((f'Loaded information about the organization {self.name} / {self.guid} '
-                          'from Controller'))
+            logging.debug(('Loaded information about the organization %s / %s '
+                           'from Controller'), self.name, self.guid)
 
         except Exception as e: # pylint: disable=invalid-name
             logging.error(
@@ -39,13 +44,13 @@ class Organization:
         return self._spaces
 
     @spaces.getter
+    @load_once('_spaces')
     def spaces(self):
         controller_session = self.controller_session
-        if not self._spaces:
+        if self._spaces is None:
             try:
                 params = {'q': f'organization_guid:{self.guid}'}
-                spaces_info = controller_session.get('/v2/spaces', params=params)
-                spaces = spaces_info.get('response_body').get('spaces')
+                spaces = list(controller_session.iter_items('/v2/spaces', 'spaces', params=params))
             except Exception as e: # pylint: disable=invalid-name
                 logging.error(
                     f'Failed to fetch spaces for organization {self.name} / {self.guid}',
@@ -57,8 +62,8 @@ class Organization:
                     space_guid = space.get('metadata').get('guid')
                     parsed_spaces[space_guid] = Space(self, space)
                 self._spaces = parsed_spaces
-                logging.debug(
-                    f'Loaded information about spaces of organization {self.name} / {self.guid}')
+                logging.info('Loaded %s spaces of organization %s / %s',
+                             len(parsed_spaces), self.name, self.guid)
         return self._spaces
 
     @spaces.setter
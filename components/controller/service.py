@@ -1,46 +1,56 @@
 import logging
-from components.tools.utils import epoch_to_datetime # pylint: disable=import-error
+from components.tools.utils import intern_string, map_concurrently, EpochDatetime, load_once # pylint: disable=import-error
+from components.tools.deadline import DeadlineExceeded # pylint: disable=import-error
 
 
 class ServiceInstance:
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-few-public-methods
+    __slots__ = ('space', 'controller', 'controller_session',
+                 '_service_keys', '_hana_configuration', '_app_relations',
+                 '_representation', '_app_relations_representation',
+                 'guid', '_created_at', '_updated_at', 'name', 'parameters',
+                 'last_operation_type', 'last_operation_state', '_last_operation_updated_at',
+                 'service_plan', 'belongs_to_hana_broker', 'service',
+                 'service_bindings', 'count_bindings', '_load_locks')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
+    last_operation_updated_at = EpochDatetime('_last_operation_updated_at')
 
     def __init__(self, space, raw_data):
-        logging.debug(f'Loading the service instance information based on {raw_data}')
+        logging.debug('Loading the service instance information based on %s', raw_data)
 
         self.space = space
         self.controller = self.space.controller
         self.controller_session = self.controller.controller_session
 
-        self._service_keys = {}
-        self._hana_configuration = {}
+        # None marks the service keys as not loaded yet
+        self._service_keys = None
+        # None marks the HANA configuration as not loaded yet
+        self._hana_configuration = None
         self._app_relations = {}
         self._representation = None
         self._app_relations_representation = None
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
 
         service_instance_entity = raw_data.get('serviceInstanceEntity')
         self.name = service_instance_entity.get('name')
         self.parameters = service_instance_entity.get('parameters')
 
         last_operation = service_instance_entity.get('last_operation')
-        self.last_operation_type = last_operation.get('type') if last_operation else None
-        self.last_operation_state = last_operation.get('state') if last_operation else None
-
-        last_operation_updated_at = (last_operation.get('updated_at')
+        self.last_operation_type = (intern_string(last_operation.get('type'))
+                                    if last_operation
+                                    else None)
+        self.last_operation_state = (intern_string(last_operation.get('state'))
                                      if last_operation
                                      else None)
-        self.last_operation_updated_at = (epoch_to_datetime(last_operation_updated_at)
-                                          if last_operation_updated_at
+        self.last_operation_updated_at = (last_operation.get('updated_at')
+                                          if last_operation
                                           else None)
 
         service_plan_guid = service_instance_entity.get('service_plan_guid')
@@ -61,8 +71,8 @@ class ServiceInstance:
              if service_bindings[guid].bound_service_instance_guid == self.guid))
         self.count_bindings = len(self.service_bindings)
 
-        logging.info((f'Loaded information about service instance {self.name} / {self.guid} '
-                      'from Controller'))
+        logging.debug(('Loaded information about service instance %s / %s '
+                       'from Controller'), self.name, self.guid)
 
     #
     # Lazy load the service keys
@@ -72,14 +82,15 @@ class ServiceInstance:
         return self._service_keys
 
     @service_keys.getter
+    @load_once('_service_keys')
     def service_keys(self):
         controller_session = self.controller_session
-        if not self._service_keys:
+        if self._service_keys is None:
             try:
                 params = {'noServiceCredentials': 'true',
                           'q': f'service_instance_guid:{self.guid}'}
-                service_keys_info = controller_session.get('/v2/service_keys', params=params)
-                service_keys = service_keys_info.get('response_body').get('serviceKeys')
+                service_keys = list(controller_session.iter_items(
+                    '/v2/service_keys', 'serviceKeys', params=params))
             except Exception as e: # pylint: disable=invalid-name
                 logging.error(('Failed to load the service_keys of '
                                f'service instance {self.name} / {self.guid}'), exc_info=e)
@@ -91,13 +102,75 @@ class ServiceInstance:
                     parsed_service_keys[service_key_guid] = ServiceKey(self, service_key)
                 self._service_keys = parsed_service_keys
                 logging.debug(('Loaded the information about service keys '
-                               f'of service instance {self.name} / {self.guid}'))
+                               'of service instance %s / %s'), self.name, self.guid)
         return self._service_keys
 
     @service_keys.setter
     def service_keys(self, service_keys):
         self._service_keys = service_keys
 
+    @staticmethod
+    def load_service_keys_in_bulk(controller, service_instances, **kwargs):
+        # Load the service keys of many service instances with a few requests
+        # filtering by a list of service instance guids instead of one request per instance.
+        # The filter is used only if the Controller applies it, see Controller.service_key_filter,
+        # and the keys of a chunk are kept only if the request succeeded and every returned key
+        # belongs to the chunk. Otherwise the service instances load their keys
+        # with the individual requests
+        kwargs.setdefault('chunk_size', 50)
+        target_instances = {service_instance.guid: service_instance
+                            for service_instance in service_instances
+                            if service_instance._service_keys is None} # pylint: disable=protected-access
+        target_guids = list(target_instances.keys())
+        chunk_size = kwargs.get('chunk_size')
+        chunks = [target_guids[i:i + chunk_size] for i in range(0, len(target_guids), chunk_size)]
+
+        def get_service_keys(guids):
+            try:
+                params = {'noServiceCredentials': 'true',
+                          'q': f'service_instance_guid IN {",".join(guids)}'}
+                service_keys = list(controller.controller_session.iter_items(
+                    '/v2/service_keys', 'serviceKeys', params=params))
+            except DeadlineExceeded:
+                raise
+            except Exception as e: # pylint: disable=invalid-name
+                # E.g., the Controller rejects the filter
+                logging.warning(('Failed to load the service keys of %s service instances at once, '
+                                 'the service instances will load their keys one by one'),
+                                len(guids), exc_info=e)
+                return guids, None
+            return guids, service_keys
+
+        if not target_guids:
+            return
+        if not controller.service_key_filter.get('supports_guid_list'):
+            logging.debug(('The service keys cannot be filtered by a list of service instances, '
+                           '%s service instances will load their keys one by one'),
+                          len(target_guids))
+            return
+        results = list(map_concurrently(get_service_keys, chunks, controller.max_workers))
+        for guids, service_keys in results:
+            if service_keys is None:
+                continue
+            partitioned_service_keys = {guid: {} for guid in guids}
+            for service_key in service_keys:
+                instance_guid = (service_key.get('serviceKeyEntity') or {}).get(
+                    'service_instance_guid')
+                if instance_guid not in partitioned_service_keys:
+                    # Unable to attribute the key, the service instances will load their keys
+                    # with the individual requests
+                    logging.warning(('Failed to attribute the service key '
+                                     f'{service_key.get("metadata").get("guid")} '
+                                     'to a service instance'))
+                    partitioned_service_keys = {}
+                    break
+                service_key_guid = service_key.get('metadata').get('guid')
+                partitioned_service_keys[instance_guid][service_key_guid] = ServiceKey(
+                    target_instances[instance_guid], service_key)
+            for instance_guid in partitioned_service_keys:
+                target_instances[instance_guid].service_keys = partitioned_service_keys[instance_guid]
+        logging.debug('Loaded the service keys of %s service instances', len(target_guids))
+
     #
     # Lazy load the information about the respective HDI container / schema
     #
@@ -106,35 +179,12 @@ class ServiceInstance:
         return self._hana_configuration
 
     @hana_configuration.getter
+    @load_once('_hana_configuration')
     def hana_configuration(self):
-        controller = self.controller
-        hana_broker_session = controller.hana_broker_session
-
         if self.belongs_to_hana_broker:
-            if not self._hana_configuration:
-                try:
-                    hana_configuration_info = hana_broker_session.get(
-                        f'/admin/service_instances/{self.guid}/instance_data')
-                    operation_status = hana_configuration_info.get('http_status')
-                    hana_configuration = hana_configuration_info.get('response_body')
-                except Exception as e: # pylint: disable=invalid-name
-                    logging.error(('Failed to load the HANA configuration '
-                                   f'of service instance {self.name} / {self.guid}'), exc_info=e)
-                    raise
-                else:
-                    # In case of failed creation of the service instance such a request to
-                    # HANA Broker will produce a server error HTTP 500
-                    if operation_status != 500:
-                        database_id = hana_configuration.get('databaseId')
-                        database = controller.get_database_by_guid(database_id)
-                        container_schema = hana_configuration.get('containerName')
-                        parsed_hana_configuration = {'database': database,
-                                                     'container_schema': container_schema}
-                    else:
-                        parsed_hana_configuration = {}
-                    self._hana_configuration = parsed_hana_configuration
-                    logging.debug(('Loaded the HANA configuration (if any) '
-                                   f'of service instance {self.name} / {self.guid}'))
+            if self._hana_configuration is None:
+                hana_configuration_info = self.get_hana_configuration_info()
+                self._hana_configuration = self.parse_hana_configuration(hana_configuration_info)
         else:
             self._hana_configuration = {}
         return self._hana_configuration
@@ -143,6 +193,92 @@ class ServiceInstance:
     def hana_configuration(self, hana_configuration):
         self._hana_configuration = hana_configuration
 
+    def get_cached_hana_configuration_info(self):
+        hana_metadata_cache = self.controller.hana_metadata_cache
+        cached_hana_configuration = (hana_metadata_cache.get(self.guid)
+                                     if hana_metadata_cache
+                                     else None)
+        if cached_hana_configuration:
+            logging.debug(('Found the HANA configuration of service instance '
+                           '%s / %s in the HANA metadata cache'), self.name, self.guid)
+            return {'response_body': cached_hana_configuration,
+                    'http_status': 200}
+        return None
+
+    def get_hana_configuration_info(self):
+        hana_configuration_info = self.get_cached_hana_configuration_info()
+        if hana_configuration_info:
+            return hana_configuration_info
+
+        hana_broker_session = self.controller.hana_broker_session
+        try:
+            hana_configuration_info = hana_broker_session.get(
+                f'/admin/service_instances/{self.guid}/instance_data')
+        except Exception as e: # pylint: disable=invalid-name
+            logging.error(('Failed to load the HANA configuration '
+                           f'of service instance {self.name} / {self.guid}'), exc_info=e)
+            raise
+        else:
+            hana_metadata_cache = self.controller.hana_metadata_cache
+            if hana_metadata_cache and hana_configuration_info.get('http_status') == 200:
+                hana_configuration = hana_configuration_info.get('response_body')
+                database_id = hana_configuration.get('databaseId')
+                container_schema = hana_configuration.get('containerName')
+                if database_id and container_schema:
+                    hana_metadata_cache.put(self.guid, self.space.guid,
+                                            database_id, container_schema)
+        return hana_configuration_info
+
+    def parse_hana_configuration(self, hana_configuration_info):
+        operation_status = hana_configuration_info.get('http_status')
+        hana_configuration = hana_configuration_info.get('response_body')
+
+        # In case of failed creation of the service instance such a request to
+        # HANA Broker will produce a server error HTTP 500
+        if operation_status != 500:
+            database_id = hana_configuration.get('databaseId')
+            database = self.controller.get_database_by_guid(database_id)
+            container_schema = hana_configuration.get('containerName')
+            parsed_hana_configuration = {'database': database,
+                                         'container_schema': container_schema}
+        else:
+            parsed_hana_configuration = {}
+        logging.debug(('Loaded the HANA configuration (if any) '
+                       'of service instance %s / %s'), self.name, self.guid)
+        return parsed_hana_configuration
+
+    @staticmethod
+    def prefetch_hana_configurations(controller, service_instances):
+        # Request the HANA configurations of all given service instances in parallel
+        # over the HANA Broker session. The responses are parsed sequentially
+        # since parsing may lazy load the databases of the Controller
+        target_instances = [service_instance for service_instance in service_instances
+                            if service_instance.belongs_to_hana_broker
+                            and service_instance._hana_configuration is None] # pylint: disable=protected-access
+
+        # Only the service instances missing in the HANA metadata cache are requested
+        cached_instances = []
+        for service_instance in target_instances:
+            hana_configuration_info = service_instance.get_cached_hana_configuration_info()
+            if hana_configuration_info:
+                service_instance.hana_configuration = service_instance.parse_hana_configuration(
+                    hana_configuration_info)
+                cached_instances.append(service_instance)
+        target_instances = [service_instance for service_instance in target_instances
+                            if service_instance not in cached_instances]
+
+        hana_configuration_infos = map_concurrently(
+            lambda service_instance: service_instance.get_hana_configuration_info(),
+            target_instances,
+            controller.max_workers)
+        for service_instance, hana_configuration_info in zip(target_instances,
+                                                             hana_configuration_infos):
+            service_instance.hana_configuration = service_instance.parse_hana_configuration(
+                hana_configuration_info)
+        if target_instances:
+            logging.debug('Loaded the HANA configuration of %s service instances',
+                          len(target_instances))
+
     #
     # Lazy load the information about the service instance usage by apps
     #
@@ -151,6 +287,7 @@ class ServiceInstance:
         return self._app_relations
 
     @app_relations.getter
+    @load_once('_app_relations')
     def app_relations(self):
         if not self._app_relations:
             service_bindings = self.service_bindings
@@ -181,7 +318,8 @@ class ServiceInstance:
                                    'count_standalone_bindings':  count_standalone_bindings
             }
             logging.debug(
-                f'Loaded the application relations of service instance {self.name} / {self.guid}')
+                'Loaded the application relations of service instance %s / %s',
+                          self.name, self.guid)
         return self._app_relations
 
     @app_relations.setter
@@ -273,28 +411,31 @@ class ServiceInstance:
 
 
 class ServiceKey:
+    __slots__ = ('service_instance', '_representation',
+                 'guid', '_created_at', '_updated_at', 'name')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, service_instance, raw_data):
-        logging.debug((f'Loading the service key information based on {raw_data} '
-                       f'for service instance {service_instance.name} / {service_instance.guid}'))
+        logging.debug(('Loading the service key information based on %s '
+                       'for service instance %s / %s'),
+                      raw_data, service_instance.name, service_instance.guid)
 
         self.service_instance = service_instance
         self._representation = None
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
         service_key_entity = raw_data.get('serviceKeyEntity')
         self.name = service_key_entity.get('name')
 
-        logging.info((f'Loaded information about service key {self.name} / {self.guid} '
-                      'of service instance '
-                      f'{self.service_instance.name} / {self.service_instance.guid}'))
+        logging.debug(('Loaded information about service key %s / %s '
+                       'of service instance '
+                       '%s / %s'),
+                      self.name, self.guid, self.service_instance.name, self.service_instance.guid)
 
     #
     # Represent the service key to the Collector
@@ -327,72 +468,77 @@ class ServiceKey:
 
 class ServiceBroker:
     # pylint: disable=too-few-public-methods
+    __slots__ = ('guid', 'name', 'broker_endpoint')
 
     def __init__(self, raw_data):
-        logging.debug(f'Loading the service broker information based on {raw_data}')
+        logging.debug('Loading the service broker information based on %s', raw_data)
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
         service_broker_entity = raw_data.get('serviceBrokerEntity')
-        self.name = service_broker_entity.get('name')
+        self.name = intern_string(service_broker_entity.get('name'))
         self.broker_endpoint = service_broker_entity.get('broker_url')
 
-        logging.info(f'Loaded information about service broker {self.name} / {self.guid}')
+        logging.debug('Loaded information about service broker %s / %s', self.name, self.guid)
 
 
 class Service:
     # pylint: disable=too-few-public-methods
+    __slots__ = ('guid', 'description', 'label', 'tags', 'service_broker')
 
     def __init__(self, space, raw_data):
-        logging.debug(f'Loading the service information based on {raw_data}')
+        logging.debug('Loading the service information based on %s', raw_data)
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
         service_entity = raw_data.get('serviceEntity')
         # Unique ID => GUID ?
         # self.guid = service_entity.get('unique_id')
-        self.description = service_entity.get('description')
-        self.label = service_entity.get('label')
+        self.description = intern_string(service_entity.get('description'))
+        self.label = intern_string(service_entity.get('label'))
         self.tags = service_entity.get('tags')
         service_broker_guid = service_entity.get('service_broker_guid')
         self.service_broker = space.get_service_broker_by_guid(service_broker_guid)
 
-        logging.info(f'Loaded information about service {self.label} / {self.guid}')
+        logging.debug('Loaded information about service %s / %s', self.label, self.guid)
 
 
 class ServicePlan:
     # pylint: disable=too-few-public-methods
+    __slots__ = ('guid', 'name', 'description', 'service')
 
     def __init__(self, space, raw_data):
-        logging.debug(f'Loading the service plan information based on {raw_data}')
+        logging.debug('Loading the service plan information based on %s', raw_data)
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
         service_plan_entity = raw_data.get('servicePlanEntity')
         # Unique ID => GUID ?
         # self.guid = service_plan_entity.get('unique_id')
-        self.name = service_plan_entity.get('name')
-        self.description = service_plan_entity.get('description')
+        self.name = intern_string(service_plan_entity.get('name'))
+        self.description = intern_string(service_plan_entity.get('description'))
         service_guid = service_plan_entity.get('service_guid')
         self.service = space.get_service_by_guid(service_guid)
 
-        logging.info(f'Loaded information about service plan {self.name} / {self.guid}')
+        logging.debug('Loaded information about service plan %s / %s', self.name, self.guid)
 
 
 class ServiceBinding:
     # pylint: disable=too-few-public-methods
+    __slots__ = ('guid', '_created_at', '_updated_at',
+                 'bound_service_instance_guid', 'bound_app_guid',
+                 'credentials_schema', 'credentials_tenant')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, space, raw_data):
-        logging.debug(f'Loading the service binding information based on {raw_data}')
+        logging.debug('Loading the service binding information based on %s', raw_data)
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
 
         service_binding_entity = raw_data.get('serviceBindingEntity')
 
@@ -424,16 +570,24 @@ class ServiceBinding:
 
         credentials = service_binding_entity.get('credentials')
         self.credentials_schema = credentials.get('schema') if credentials else None
-        self.credentials_tenant = credentials.get('tenant_name') if credentials else None
+        self.credentials_tenant = (intern_string(credentials.get('tenant_name'))
+                                   if credentials
+                                   else None)
 
-        logging.info(f'Loaded information about service binding {self.guid}')
+        logging.debug('Loaded information about service binding %s', self.guid)
 
 class UserProvidedServiceInstance:
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-few-public-methods
+    __slots__ = ('space', 'controller', 'controller_session', '_representation',
+                 'guid', '_created_at', '_updated_at', 'name', 'credentials')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, space, raw_data):
-        logging.debug(f'Loading the user-provided service instance information based on {raw_data}')
+        logging.debug('Loading the user-provided service instance information based on %s',
+                      raw_data)
 
         self.space = space
         self.controller = self.space.controller
@@ -443,19 +597,15 @@ class UserProvidedServiceInstance:
 
         metadata = raw_data.get('metadata')
         self.guid = metadata.get('guid')
-        self.created_at = (epoch_to_datetime(metadata.get('created_at'))
-                           if metadata.get('created_at')
-                           else None)
-        self.updated_at = (epoch_to_datetime(metadata.get('updated_at'))
-                           if metadata.get('updated_at')
-                           else None)
+        self.created_at = metadata.get('created_at')
+        self.updated_at = metadata.get('updated_at')
 
         service_instance_entity = raw_data.get('userProvidedServiceInstanceEntity')
         self.name = service_instance_entity.get('name')
         self.credentials = service_instance_entity.get('credentials')
 
-        logging.info((f'Loaded information about user-provided service instance {self.name} / {self.guid} '
-                      'from Controller'))
+        logging.debug(('Loaded information about user-provided service instance %s / %s '
+                       'from Controller'), self.name, self.guid)
     
     #
     # Represent the user-provided service instance to the Collector
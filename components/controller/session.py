@@ -1,9 +1,16 @@
 import logging
 import functools
+import threading
+import time
+import copy
 import base64
 import json
-from json import JSONDecodeError
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from components.tools.tracing import tracer # pylint: disable=import-error
+from components.tools.deadline import deadline # pylint: disable=import-error
+from components.tools.decoders import get_json_decoder, JsonArrayStream # pylint: disable=import-error
 from requests.packages.urllib3.exceptions import InsecureRequestWarning # pylint: disable=import-error
 
 
@@ -11,16 +18,77 @@ from requests.packages.urllib3.exceptions import InsecureRequestWarning # pylint
 # Suppress HTTPS / SSL-related error messages
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning) # pylint: disable=no-member
 
+# Bytes read at once from a streamed response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class ControllerSession:
     def __init__(self, endpoint, **kwargs):
         self.endpoint = endpoint
         kwargs.setdefault('trust_env', False)
         kwargs.setdefault('verify', False)
+        kwargs.setdefault('pool_connections', 10)
+        kwargs.setdefault('pool_maxsize', 10)
+        kwargs.setdefault('keep_alive', True)
+        kwargs.setdefault('connect_timeout', None)
+        kwargs.setdefault('read_timeout', None)
+        kwargs.setdefault('json_decoder', 'auto')
+        kwargs.setdefault('json_streaming', False)
+        kwargs.setdefault('pagination', {})
         self.session = requests.Session()
         self.session.trust_env = kwargs.get('trust_env')
         self.session.verify = kwargs.get('verify')
 
+        # Parallel requests reuse the pooled connections instead of opening new ones
+        adapter = HTTPAdapter(pool_connections=kwargs.get('pool_connections'),
+                              pool_maxsize=kwargs.get('pool_maxsize'))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.adapter = adapter
+        if not kwargs.get('keep_alive'):
+            self.session.headers['Connection'] = 'close'
+        self.timeout = (kwargs.get('connect_timeout'), kwargs.get('read_timeout'))
+
+        # Decoder of the JSON response bodies, see get_json_decoder
+        self.json_decoder = get_json_decoder(kwargs.get('json_decoder'))
+        # Large lists are decoded while they are received, see get_members
+        self.json_streaming = kwargs.get('json_streaming')
+
+        # Paging of the lists, see iter_items. The next pages are prefetched by a dedicated pool,
+        # created on first use
+        self.pagination = {'page_size': None,
+                           'offset_param': 'offset',
+                           'limit_param': 'limit',
+                           'prefetch': True,
+                           'max_pages': 10000}
+        self.pagination.update(kwargs.get('pagination'))
+        self.pagination_stats = {'pages': 0, 'prefetched': 0}
+        self._prefetch_workers = kwargs.get('pool_maxsize')
+        self._prefetch_executor = None
+        self._prefetch_lock = threading.Lock()
+
+        # Identical GET requests running at the same time are sent once and share the response
+        self._in_flight_requests = {}
+        self._in_flight_lock = threading.Lock()
+        self.single_flight_stats = {'sent': 0, 'coalesced': 0}
+
+        # Optional persistent cache of GET responses, see ResponseCache.
+        # The scope separates the responses visible to different users
+        self.response_cache = None
+        self.response_cache_scope = ''
+
+        # Optional collector of the request metrics per endpoint, see RequestMetrics
+        self.request_metrics = None
+
+        # Optional retries and hedging of the requests, see TransportPolicy
+        self.transport_policy = None
+
+        # Optional limit of the request rate to the endpoint shared by all threads, see RateLimiter
+        self.rate_limiter = None
+
+        # Optional adaptive limit of the in-flight requests, see ConcurrencyLimiter
+        self.concurrency_limiter = None
+
     @property
     def basic_auth(self):
         return None
@@ -29,6 +97,19 @@ class ControllerSession:
     def bearer_auth(self):
         return None
 
+    @property
+    def pool_stats(self):
+        # Number of requests and opened connections per pooled host
+        pool_stats = {}
+        pools = self.adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is not None:
+                pool_stats[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                    'requests': pool.num_requests,
+                    'connections': pool.num_connections}
+        return pool_stats
+
     @basic_auth.setter
     def basic_auth(self, credentials):
         try:
@@ -53,6 +134,8 @@ class ControllerSession:
     def handle_request(request_func):
         @functools.wraps(request_func)
         def send_request(*args, **kwargs):
+            controller_session = args[0]
+            kwargs.setdefault('timeout', controller_session.timeout)
             kwargs.setdefault('data', {})
             kwargs.setdefault('params', {})
             kwargs.setdefault('json', {})
@@ -64,12 +147,21 @@ class ControllerSession:
         @functools.wraps(handler_func)
         def parse_response(*args, **kwargs):
             raw_response = handler_func(*args, **kwargs)
+            json_decoder = args[0].json_decoder
+            if kwargs.get('stream') and raw_response.status_code == 200:
+                # The body is decoded by the caller while iterating over it
+                return {'response_body': JsonArrayStream(
+                            raw_response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                            close=raw_response.close),
+                        'response_headers': raw_response.headers,
+                        'http_status': raw_response.status_code}
             parsed_response = {}
-            if raw_response.text:
+            # The body is decoded from the received bytes without building a str first
+            if raw_response.content:
                 try:
                     # Try to interpret the response as a normal JSON response body
-                    parsed_response = json.loads(raw_response.text)
-                except JSONDecodeError:
+                    parsed_response = json_decoder.loads(raw_response.content)
+                except ValueError:
                     try:
                         # Try to interpret the response as an unconvensional multiline list
                         # of JSON strings
@@ -77,11 +169,11 @@ class ControllerSession:
                         parsed_response = {
                             'responses': []
                         }
-                        responses = raw_response.text.splitlines()
+                        responses = raw_response.content.splitlines()
                         for response in responses:
-                            response = json.loads(response)
+                            response = json_decoder.loads(response)
                             parsed_response['responses'].append(response)
-                    except JSONDecodeError:
+                    except ValueError:
                         try:
                             # Try to interpret the response as a list of plain text strings,
                             # e.g., as an application log
@@ -98,65 +190,365 @@ class ControllerSession:
                             raise
             else:
                 logging.debug(('Empty response body received '
-                               f'from {raw_response.url} with HTTP {raw_response.status_code}'))
+                               'from %s with HTTP %s'), raw_response.url, raw_response.status_code)
 
             return {'response_body': parsed_response,
                     'response_headers': raw_response.headers,
                     'http_status': raw_response.status_code}
         return parse_response
 
+    def measured(request_func):
+        @functools.wraps(request_func)
+        def send_measured(self, path, **kwargs):
+            method = request_func.__name__.upper()
+            with tracer.span(f'{method} {path}', category='http', endpoint=self.endpoint):
+                request_metrics = self.request_metrics
+                if request_metrics is None:
+                    return request_func(self, path, **kwargs)
+                http_status = 'error'
+                received_bytes = 0
+                started_at = time.perf_counter()
+                try:
+                    raw_response = request_func(self, path, **kwargs)
+                    http_status = raw_response.status_code
+                    # The streamed body is not received yet
+                    received_bytes = (int(raw_response.headers.get('Content-Length') or 0)
+                                      if kwargs.get('stream')
+                                      else len(raw_response.content))
+                    return raw_response
+                finally:
+                    request_metrics.record(self.endpoint, method, path,
+                                           http_status, received_bytes,
+                                           time.perf_counter() - started_at)
+        return send_measured
+
+    def transported(request_func):
+        @functools.wraps(request_func)
+        def send_transported(self, path, **kwargs):
+            transport_policy = self.transport_policy
+            if transport_policy is None:
+                return request_func(self, path, **kwargs)
+            # Every attempt and every hedged request is measured on its own
+            return transport_policy.send(request_func.__name__.upper(), path,
+                                         lambda: request_func(self, path, **kwargs))
+        return send_transported
+
+    def rate_limited(request_func):
+        @functools.wraps(request_func)
+        def send_rate_limited(self, path, **kwargs):
+            # The wait for a token is not accounted to the latency of the request
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            return request_func(self, path, **kwargs)
+        return send_rate_limited
+
+    def concurrency_limited(request_func):
+        @functools.wraps(request_func)
+        def send_concurrency_limited(self, path, **kwargs):
+            concurrency_limiter = self.concurrency_limiter
+            if concurrency_limiter is None:
+                return request_func(self, path, **kwargs)
+            started_at = concurrency_limiter.acquire()
+            try:
+                raw_response = request_func(self, path, **kwargs)
+            except Exception as e: # pylint: disable=invalid-name
+                concurrency_limiter.release(started_at, path,
+                                            failed=concurrency_limiter.is_failure(e))
+                raise
+            else:
+                concurrency_limiter.release(started_at, path, http_status=raw_response.status_code)
+                return raw_response
+        return send_concurrency_limited
+
+    def within_deadline(request_func):
+        @functools.wraps(request_func)
+        def send_within_deadline(self, path, **kwargs):
+            # Every attempt gets at most the remaining time of the run
+            deadline.check(f'HTTP {request_func.__name__.upper()} {self.endpoint + path}')
+            kwargs['timeout'] = deadline.cap_timeout(kwargs.get('timeout'))
+            return request_func(self, path, **kwargs)
+        return send_within_deadline
+
+    def single_flight(request_func):
+        @functools.wraps(request_func)
+        def send_single_flight(self, path, **kwargs):
+            # A streamed body can be read only once
+            if kwargs.get('stream'):
+                return request_func(self, path, **kwargs)
+            request_key = (path, json.dumps(kwargs, sort_keys=True, default=str))
+            with self._in_flight_lock:
+                in_flight_request = self._in_flight_requests.get(request_key)
+                is_leader = in_flight_request is None
+                if is_leader:
+                    in_flight_request = {'response': Future(), 'followers': 0}
+                    self._in_flight_requests[request_key] = in_flight_request
+                    self.single_flight_stats['sent'] += 1
+                else:
+                    in_flight_request['followers'] += 1
+                    self.single_flight_stats['coalesced'] += 1
+
+            if not is_leader:
+                logging.debug(('Waits for the identical in-flight HTTP GET request '
+                               'to %s'), self.endpoint + path)
+                # The callers may modify the parsed response, hence each of them gets a copy
+                return copy.deepcopy(in_flight_request['response'].result())
+
+            try:
+                response = request_func(self, path, **kwargs)
+            except Exception as e: # pylint: disable=invalid-name
+                in_flight_request['response'].set_exception(e)
+                raise
+            else:
+                with self._in_flight_lock:
+                    # No follower joins once the request is removed
+                    del self._in_flight_requests[request_key]
+                    has_followers = in_flight_request['followers'] > 0
+                # The followers copy a snapshot, taken only if any of them waits, while the
+                # caller of the leader may already modify its own response
+                in_flight_request['response'].set_result(
+                    copy.deepcopy(response) if has_followers else None)
+                return response
+            finally:
+                with self._in_flight_lock:
+                    self._in_flight_requests.pop(request_key, None)
+        return send_single_flight
+
+    def cached(request_func):
+        @functools.wraps(request_func)
+        def send_cached(self, path, **kwargs):
+            response_cache = self.response_cache
+            if response_cache is None or kwargs.get('stream'):
+                return request_func(self, path, **kwargs)
+            request_key = json.dumps([self.response_cache_scope, self.endpoint, path, kwargs],
+                                     sort_keys=True, default=str)
+            response = response_cache.get(request_key)
+            if response is not None:
+                logging.debug('Reuses the cached response of HTTP GET %s', self.endpoint + path)
+                return response
+            response = request_func(self, path, **kwargs)
+            response_cache.put(request_key, self.endpoint, path, response)
+            return response
+        return send_cached
+
+    def invalidates_cache(request_func):
+        @functools.wraps(request_func)
+        def send_invalidating(self, path, **kwargs):
+            response = request_func(self, path, **kwargs)
+            if self.response_cache is not None:
+                self.response_cache.invalidate(self.endpoint)
+            return response
+        return send_invalidating
+
+    @single_flight
+    @cached
     @handle_request
     @parse_response
+    @transported
+    @rate_limited
+    @concurrency_limited
+    @within_deadline
+    @measured
     def get(self, path, **kwargs):
         try:
-            logging.debug(f'Executes the HTTP GET request to {self.endpoint + path}')
+            logging.debug('Executes the HTTP GET request to %s', self.endpoint + path)
             raw_response = self.session.get(self.endpoint + path, **kwargs)
         except Exception as e: # pylint: disable=invalid-name
             logging.error(f'Failed to send the HTTP GET to {self.endpoint + path}', exc_info=e)
             raise
         else:
-            logging.debug((f'The HTTP GET request to {self.endpoint + path} '
-                           f'received the response {raw_response}'))
+            logging.debug(('The HTTP GET request to %s '
+                           'received the response %s'), self.endpoint + path, raw_response)
             return raw_response
 
+    def get_members(self, path, **kwargs):
+        # Yields (key, items) per list in the JSON object returned by GET path. With json_streaming
+        # the items are decoded while the body is received instead of decoding the complete body
+        # at once. Cached responses are reused as they are
+        if self.json_streaming and self.response_cache is None:
+            response = self.get(path, stream=True, **kwargs)
+        else:
+            response = self.get(path, **kwargs)
+        self.check_list_response(path, response)
+        response_body = response.get('response_body')
+        if isinstance(response_body, JsonArrayStream):
+            yield from response_body.members()
+        else:
+            for key, value in (response_body or {}).items():
+                if isinstance(value, list):
+                    yield key, iter(value)
+
+    def check_list_response(self, path, response):
+        # The error body of a failed request would pass for an empty list
+        http_status = response.get('http_status')
+        if http_status != 200:
+            raise Exception((f'HTTP GET {self.endpoint + path} failed with HTTP {http_status}: '
+                             f'{response.get("response_body")}'))
+
+    def get_next_page(self, path, params, response_body, response_headers, item_count):
+        # The next page is given by a link, i.e., next_url of the Controller API v2,
+        # pagination.next.href of the API v3 or the Link header, otherwise by the offset
+        # if page_size is set and the page is full. A page above page_size shows the limit is not
+        # supported. Returns (path, params) or None
+        links = requests.utils.parse_header_links((response_headers or {}).get('Link') or '')
+        next_url = (response_body.get('next_url')
+                    or ((response_body.get('pagination') or {}).get('next') or {}).get('href')
+                    or next((link.get('url') for link in links if link.get('rel') == 'next'), None))
+        if next_url:
+            # The link holds the query parameters of the next page
+            if next_url.startswith(self.endpoint):
+                next_url = next_url[len(self.endpoint):]
+            return next_url, {}
+        page_size = self.pagination.get('page_size')
+        if page_size and item_count == int(page_size):
+            offset_param = self.pagination.get('offset_param')
+            next_params = dict(params)
+            next_params[offset_param] = int(next_params.get(offset_param) or 0) + item_count
+            return path, next_params
+        return None
+
+    def get_page(self, path, key, streamed, **kwargs):
+        # Returns the items of the list key on the page returned by GET path and a function
+        # returning the next page by the number of the items. The next page of a streamed page
+        # is known once its items are consumed
+        response = self.get(path, stream=True, **kwargs) if streamed else self.get(path, **kwargs)
+        self.check_list_response(path, response)
+        response_body = response.get('response_body')
+        with self._prefetch_lock:
+            self.pagination_stats['pages'] += 1
+        if isinstance(response_body, JsonArrayStream):
+            items = (item
+                     for member_key, member_items in response_body.members()
+                     if member_key == key
+                     for item in member_items)
+            members = response_body.values
+        else:
+            members = response_body or {}
+            items = members.get(key) or []
+        return items, lambda item_count: self.get_next_page(path, kwargs.get('params') or {},
+                                                            members,
+                                                            response.get('response_headers'),
+                                                            item_count)
+
+    def prefetch_page(self, path, key, **kwargs):
+        with self._prefetch_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(max_workers=self._prefetch_workers,
+                                                             thread_name_prefix='prefetch')
+            self.pagination_stats['prefetched'] += 1
+        return self._prefetch_executor.submit(tracer.bind_parent(self.get_page),
+                                              path, key, False, **kwargs)
+
+    def iter_items(self, path, key, streamed=False, **kwargs):
+        # Yields the items of the list key in the JSON objects returned by GET path, following
+        # the pages of the list. With streamed and json_streaming the items are decoded while
+        # the pages are received, otherwise the next page is requested in the background
+        # while the items of the current page are processed
+        streamed = streamed and self.json_streaming and self.response_cache is None
+        prefetch = self.pagination.get('prefetch') and not streamed
+        params = dict(kwargs.pop('params', None) or {})
+        if self.pagination.get('page_size'):
+            params.setdefault(self.pagination.get('limit_param'), self.pagination.get('page_size'))
+        # A next page pointing to the current one or repeating the first item of the previous one,
+        # e.g., if the server ignores the offset, ends the list as well as reaching max_pages
+        max_pages = self.pagination.get('max_pages')
+        request = (path, params)
+        page = self.get_page(path, key, streamed, params=params, **kwargs)
+        page_count = 1
+        previous_first_item = None
+        while page is not None:
+            items, get_next_page = page
+            page_items = iter(items)
+            first_item = next(page_items, None)
+            if first_item is not None and first_item == previous_first_item:
+                logging.warning('HTTP GET %s repeats the previous page, the list ends here',
+                                self.endpoint + request[0])
+                return
+            previous_first_item = first_item
+            has_next_page = page_count < max_pages
+            next_page = None
+            if prefetch:
+                next_request = get_next_page(len(items))
+                if has_next_page and next_request not in (None, request):
+                    next_page = self.prefetch_page(next_request[0], key,
+                                                   params=next_request[1], **kwargs)
+            item_count = 0
+            if first_item is not None:
+                item_count += 1
+                yield first_item
+            for item in page_items:
+                item_count += 1
+                yield item
+            if not prefetch:
+                next_request = get_next_page(item_count)
+            if not has_next_page and next_request not in (None, request):
+                logging.warning('HTTP GET %s reached %s pages, the list ends here',
+                                self.endpoint + path, max_pages)
+            if prefetch:
+                page = next_page.result() if next_page is not None else None
+            else:
+                page = (self.get_page(next_request[0], key, streamed,
+                                      params=next_request[1], **kwargs)
+                        if has_next_page and next_request not in (None, request)
+                        else None)
+            page_count += 1
+            request = next_request
+
+    @invalidates_cache
     @handle_request
     @parse_response
+    @transported
+    @rate_limited
+    @concurrency_limited
+    @within_deadline
+    @measured
     def post(self, path, **kwargs):
         try:
-            logging.debug(f'Executes the HTTP POST request to {self.endpoint + path}')
+            logging.debug('Executes the HTTP POST request to %s', self.endpoint + path)
             raw_response = self.session.post(self.endpoint + path, **kwargs)
         except Exception as e: # pylint: disable=invalid-name
             logging.error(f'Failed to send the HTTP POST to {self.endpoint + path}', exc_info=e)
             raise
         else:
-            logging.debug((f'The HTTP POST request to {self.endpoint + path} '
-                           f'received the response {raw_response}'))
+            logging.debug(('The HTTP POST request to %s '
+                           'received the response %s'), self.endpoint + path, raw_response)
             return raw_response
 
+    @invalidates_cache
     @handle_request
     @parse_response
+    @transported
+    @rate_limited
+    @concurrency_limited
+    @within_deadline
+    @measured
     def put(self, path, **kwargs):
         try:
-            logging.debug(f'Executes the HTTP PUT request to {self.endpoint + path}')
+            logging.debug('Executes the HTTP PUT request to %s', self.endpoint + path)
             raw_response = self.session.put(self.endpoint + path, **kwargs)
         except Exception as e: # pylint: disable=invalid-name
             logging.error(f'Failed to send the HTTP PUT to {self.endpoint + path}', exc_info=e)
             raise
         else:
-            logging.debug((f'The HTTP PUT request to {self.endpoint + path} '
-                           f'received the response {raw_response}'))
+            logging.debug(('The HTTP PUT request to %s '
+                           'received the response %s'), self.endpoint + path, raw_response)
             return raw_response
 
+    @invalidates_cache
     @handle_request
     @parse_response
+    @transported
+    @rate_limited
+    @concurrency_limited
+    @within_deadline
+    @measured
     def delete(self, path, **kwargs):
         try:
-            logging.debug(f'Executes the HTTP DELETE request to {self.endpoint + path}')
+            logging.debug('Executes the HTTP DELETE request to %s', self.endpoint + path)
             raw_response = self.session.delete(self.endpoint + path, **kwargs)
         except Exception as e: # pylint: disable=invalid-name
             logging.error(f'Failed to send the HTTP DELETE to {self.endpoint + path}', exc_info=e)
             raise
         else:
-            logging.debug((f'The HTTP DELETE request to {self.endpoint + path} '
-                           f'received the response {raw_response}'))
+            logging.debug(('The HTTP DELETE request to %s '
+                           'received the response %s'), self.endpoint + path, raw_response)
             return raw_response
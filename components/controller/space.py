@@ -1,46 +1,63 @@
 import logging
 import json
-from components.tools.utils import epoch_to_datetime # pylint: disable=import-error
-from components.controller.application import Application # pylint: disable=import-error
+from components.tools.utils import intern_string, EpochDatetime, load_once, get_load_lock # pylint: disable=import-error
+from components.controller.application import Application, ApplicationSummary # pylint: disable=import-error
 # pylint: disable=import-error
 from components.controller.service import (ServiceInstance,
-                                           Service,
-                                           ServicePlan,
-                                           ServiceBroker,
                                            ServiceBinding,
                                            UserProvidedServiceInstance)
 
 
+# Lists of the space content parsed into the collections of the space
+CONTENT_LISTS = ('applications', 'services', 'servicePlans', 'serviceBrokers',
+                 'serviceBindings', 'serviceInstances', 'userProvidedServiceInstances')
+
+
 class Space:
     # pylint: disable=too-many-instance-attributes
+    __slots__ = ('org', 'controller', 'controller_session',
+                 'guid', 'name', 'execution_user', '_created_at', '_updated_at',
+                 '_content', '_released_content', '_apps', '_selected_apps', '_app_summaries',
+                 '_service_brokers', '_services', '_service_plans', '_service_bindings',
+                 '_service_instances', '_ups_service_instances', '_load_locks')
+
+    created_at = EpochDatetime('_created_at')
+    updated_at = EpochDatetime('_updated_at')
 
     def __init__(self, org, raw_data):
         try:
-            logging.debug((f'Loading the space information based on {raw_data} '
-                           f'from organization {org.name} / {org.guid}'))
+            logging.debug(('Loading the space information based on %s '
+                           'from organization %s / %s'), raw_data, org.name, org.guid)
 
             self.org = org
             self.controller = self.org.controller
             self.controller_session = self.controller.controller_session
 
             self.guid = raw_data.get('metadata').get('guid')
-            self.name = raw_data.get('spaceEntity').get('name')
-            self.execution_user = raw_data.get('spaceEntity').get('execution_user')
-            self.created_at = epoch_to_datetime(raw_data.get('metadata').get('created_at'))
-            self.updated_at = epoch_to_datetime(raw_data.get('metadata').get('updated_at'))
+            self.name = intern_string(raw_data.get('spaceEntity').get('name'))
+            self.execution_user = intern_string(raw_data.get('spaceEntity').get('execution_user'))
+            self.created_at = raw_data.get('metadata').get('created_at')
+            self.updated_at = raw_data.get('metadata').get('updated_at')
 
             # Lazy load the space content
             self._content = {}
-            self._apps = {}
-            self._service_brokers = {}
-            self._services = {}
-            self._service_plans = {}
-            self._service_bindings = {}
-            self._service_instances = {}
-            self._ups_service_instances = {}
-
-            logging.info((f'Loaded the information about space {self.name} / {self.guid} '
-                          f'from organization {self.org.name} / {self.org.guid}'))
+            # Lists of the content released in the memory-lean mode, see release_content_list
+            self._released_content = set()
+            self._selected_apps = {}
+            self._app_summaries = {}
+
+            # None marks the collections parsed from the space content as not loaded yet
+            self._apps = None
+            self._service_brokers = None
+            self._services = None
+            self._service_plans = None
+            self._service_bindings = None
+            self._service_instances = None
+            self._ups_service_instances = None
+
+            logging.debug(('Loaded the information about space %s / %s '
+                           'from organization %s / %s'),
+                          self.name, self.guid, self.org.name, self.org.guid)
             
         except Exception as e: # pylint: disable=invalid-name
             logging.error(f'Failed to instantiate space by metadata {json.dumps(raw_data)}',
@@ -55,18 +72,24 @@ class Space:
         return self._content
 
     @content.getter
+    @load_once('_content')
     def content(self):
         controller_session = self.controller_session
         if not self._content:
             try:
-                content_info = controller_session.get(f'/v2/spaces/{self.guid}/content')
-                content = content_info.get('response_body')
+                # The lists of the content are decoded while the body is received
+                content = {key: list(items) for key, items
+                           in controller_session.get_members(f'/v2/spaces/{self.guid}/content')}
             except Exception as e: # pylint: disable=invalid-name
                 logging.error(f'Failed to load the content of space {self.name}', exc_info=e)
                 raise
             else:
+                if self.controller.memory_lean:
+                    # The lists not parsed into any collection and the released ones are not kept
+                    content = {key: items for key, items in content.items()
+                               if key in CONTENT_LISTS and key not in self._released_content}
                 self._content = content
-                logging.debug(f'Loaded the content of space {self.name} / {self.guid}')
+                logging.debug('Loaded the content of space %s / %s', self.name, self.guid)
         return self._content
 
     @content.setter
@@ -81,21 +104,113 @@ class Space:
         return self._apps
 
     @apps.getter
+    @load_once('_apps')
     def apps(self):
-        if not self._apps:
+        if self._apps is None:
             parsed_apps = {}
-            apps = self.content.get('applications')
+            apps = self.get_content_list('applications')
+            # Load the monitoring data of all applications at once instead of one request per app
+            self.controller.monitoring_loader.load_space(self)
             for app in apps:
                 app_guid = app.get('metadata').get('guid')
-                parsed_apps[app_guid] = Application(self, app)
+                parsed_apps[app_guid] = (self._selected_apps.get(app_guid)
+                                         or Application(self, app))
             self._apps = parsed_apps
-            logging.debug(f'Loaded the applications of space {self.name} / {self.guid}')
+            self.release_content_list('applications')
+            logging.info('Loaded %s applications of space %s / %s',
+                         len(parsed_apps), self.name, self.guid)
         return self._apps
 
     @apps.setter
     def apps(self, apps):
         self._apps = apps
 
+    def release_content_list(self, key):
+        # In the memory-lean mode every list of the raw space content is dropped once
+        # its collection is parsed, e.g., the applications once store_applications loaded the apps
+        if self.controller.memory_lean:
+            with get_load_lock(self, '_content'):
+                if key in self._content:
+                    del self._content[key]
+                    self._released_content.add(key)
+                    if key == 'applications':
+                        self._selected_apps = {}
+                    logging.debug('Released %s of the content of space %s / %s',
+                                  key, self.name, self.guid)
+
+    def get_content_list(self, key):
+        # A released list required later, e.g., by a report run after the collection was reset,
+        # is requested again with the space content
+        if key in self._released_content:
+            with get_load_lock(self, '_content'):
+                if key in self._released_content:
+                    logging.debug('Requests the released %s of the content of space %s / %s',
+                                  key, self.name, self.guid)
+                    self._released_content.discard(key)
+                    self._content = {}
+                    return self.content.get(key)
+        return self.content.get(key)
+
+    @property
+    def app_guids(self):
+        # Application guids known without loading the space content if possible
+        if self._apps is not None:
+            return list(self._apps.keys())
+        if self._app_summaries and self._content.get('applications') is None:
+            return list(self._app_summaries.keys())
+        return [app.get('metadata').get('guid') for app in self.get_content_list('applications')]
+
+    #
+    # Lazy load the lightweight application summaries
+    #
+    @property
+    def app_summaries(self):
+        return self._app_summaries
+
+    @app_summaries.getter
+    @load_once('_app_summaries')
+    def app_summaries(self):
+        if not self._app_summaries:
+            if self._content.get('applications') is not None:
+                apps = self._content.get('applications')
+            else:
+                # Avoid loading the complete space content if only the summaries are required
+                try:
+                    params = {'q': f'space_guid:{self.guid}'}
+                    apps = list(self.controller_session.iter_items(
+                        '/v2/apps', 'applications', params=params))
+                except Exception as e: # pylint: disable=invalid-name
+                    logging.error(f'Failed to fetch applications of space {self.name} / {self.guid}',
+                                  exc_info=e)
+                    raise
+            parsed_app_summaries = {}
+            for app in apps:
+                app_guid = app.get('metadata').get('guid')
+                parsed_app_summaries[app_guid] = ApplicationSummary(self, app)
+            self._app_summaries = parsed_app_summaries
+            logging.debug('Loaded the application summaries of space %s / %s', self.name, self.guid)
+        return self._app_summaries
+
+    @app_summaries.setter
+    def app_summaries(self, app_summaries):
+        self._app_summaries = app_summaries
+
+    def get_apps_by_guids(self, guids):
+        # Load only the given applications if all applications of the space are not loaded yet
+        if self._apps is not None:
+            return {guid: self._apps[guid] for guid in guids if guid in self._apps}
+        with get_load_lock(self, '_selected_apps'):
+            missing_guids = [guid for guid in guids if guid not in self._selected_apps]
+            if missing_guids:
+                apps = [app for app in self.get_content_list('applications')
+                        if app.get('metadata').get('guid') in missing_guids]
+                self.controller.monitoring_loader.load(
+                    [app.get('metadata').get('guid') for app in apps])
+                for app in apps:
+                    app_guid = app.get('metadata').get('guid')
+                    self._selected_apps[app_guid] = Application(self, app)
+        return {guid: self._selected_apps[guid] for guid in guids if guid in self._selected_apps}
+
     #
     # Lazy load services from the space content
     #
@@ -104,15 +219,13 @@ class Space:
         return self._services
 
     @services.getter
+    @load_once('_services')
     def services(self):
-        if not self._services:
-            parsed_services = {}
-            services = self.content.get('services')
-            for service in services:
-                service_guid = service.get('metadata').get('guid')
-                parsed_services[service_guid] = Service(self, service)
-            self._services = parsed_services
-            logging.debug(f'Loaded the services of space {self.name} / {self.guid}')
+        if self._services is None:
+            # The entries are shared with other spaces through the service catalog of the Controller
+            self._services = self.controller.service_catalog.get_services(
+                self, self.get_content_list('services'))
+            self.release_content_list('services')
         return self._services
 
     @services.setter
@@ -127,15 +240,13 @@ class Space:
         return self._service_plans
 
     @service_plans.getter
+    @load_once('_service_plans')
     def service_plans(self):
-        if not self._service_plans:
-            parsed_service_plans = {}
-            service_plans = self.content.get('servicePlans')
-            for plan in service_plans:
-                service_plan_guid = plan.get('metadata').get('guid')
-                parsed_service_plans[service_plan_guid] = ServicePlan(self, plan)
-            self._service_plans = parsed_service_plans
-            logging.debug(f'Loaded the services plans of space {self.name} / {self.guid}')
+        if self._service_plans is None:
+            # The entries are shared with other spaces through the service catalog of the Controller
+            self._service_plans = self.controller.service_catalog.get_service_plans(
+                self, self.get_content_list('servicePlans'))
+            self.release_content_list('servicePlans')
         return self._service_plans
 
     @service_plans.setter
@@ -150,15 +261,13 @@ class Space:
         return self._service_brokers
 
     @service_brokers.getter
+    @load_once('_service_brokers')
     def service_brokers(self):
-        if not self._service_brokers:
-            parsed_service_brokers = {}
-            service_brokers = self.content.get('serviceBrokers')
-            for broker in service_brokers:
-                service_broker_guid = broker.get('metadata').get('guid')
-                parsed_service_brokers[service_broker_guid] = ServiceBroker(broker)
-            self._service_brokers = parsed_service_brokers
-            logging.debug(f'Loaded the services brokers of space {self.name} / {self.guid}')
+        if self._service_brokers is None:
+            # The entries are shared with other spaces through the service catalog of the Controller
+            self._service_brokers = self.controller.service_catalog.get_service_brokers(
+                self, self.get_content_list('serviceBrokers'))
+            self.release_content_list('serviceBrokers')
         return self._service_brokers
 
     @service_brokers.setter
@@ -173,15 +282,18 @@ class Space:
         return self._service_bindings
 
     @service_bindings.getter
+    @load_once('_service_bindings')
     def service_bindings(self):
-        if not self._service_bindings:
+        if self._service_bindings is None:
             parsed_service_bindings = {}
-            service_bindings = self.content.get('serviceBindings')
+            service_bindings = self.get_content_list('serviceBindings')
             for binding in service_bindings:
                 binding_guid = binding.get('metadata').get('guid')
                 parsed_service_bindings[binding_guid] = ServiceBinding(self, binding)
             self._service_bindings = parsed_service_bindings
-            logging.debug(f'Loaded the service bindings of space {self.name} / {self.guid}')
+            self.release_content_list('serviceBindings')
+            logging.info('Loaded %s service bindings of space %s / %s',
+                         len(parsed_service_bindings), self.name, self.guid)
         return self._service_bindings
 
     @service_bindings.setter
@@ -196,15 +308,23 @@ class Space:
         return self._service_instances
 
     @service_instances.getter
+    @load_once('_service_instances')
     def service_instances(self):
-        if not self._service_instances:
+        if self._service_instances is None:
             parsed_service_instances = {}
-            service_instances = self.content.get('serviceInstances')
+            service_instances = self.get_content_list('serviceInstances')
             for instance in service_instances:
                 instance_guid = instance.get('metadata').get('guid')
                 parsed_service_instances[instance_guid] = ServiceInstance(self, instance)
             self._service_instances = parsed_service_instances
-            logging.debug(f'Loaded the service instances of space {self.name} / {self.guid}')
+
+            # Forget the HANA metadata of the service instances deleted from the space
+            hana_metadata_cache = self.controller.hana_metadata_cache
+            if hana_metadata_cache:
+                hana_metadata_cache.prune(self.guid, parsed_service_instances.keys())
+            self.release_content_list('serviceInstances')
+            logging.info('Loaded %s service instances of space %s / %s',
+                         len(parsed_service_instances), self.name, self.guid)
         return self._service_instances
 
     @service_instances.setter
@@ -219,21 +339,32 @@ class Space:
         return self._ups_service_instances
 
     @ups_service_instances.getter
+    @load_once('_ups_service_instances')
     def ups_service_instances(self):
-        if not self._ups_service_instances:
+        if self._ups_service_instances is None:
             parsed_ups_service_instances = {}
-            ups_service_instances = self.content.get('userProvidedServiceInstances')
+            ups_service_instances = self.get_content_list('userProvidedServiceInstances')
             for instance in ups_service_instances:
                 instance_guid = instance.get('metadata').get('guid')
                 parsed_ups_service_instances[instance_guid] = UserProvidedServiceInstance(self, instance)
             self._ups_service_instances = parsed_ups_service_instances
-            logging.debug(f'Loaded the service instances of space {self.name} / {self.guid}')
+            self.release_content_list('userProvidedServiceInstances')
+            logging.info('Loaded %s user-provided service instances of space %s / %s',
+                         len(parsed_ups_service_instances), self.name, self.guid)
         return self._ups_service_instances
 
     @ups_service_instances.setter
     def ups_service_instances(self, ups_service_instances):
         self._ups_service_instances = ups_service_instances
 
+    def prefetch_hana_configurations(self):
+        ServiceInstance.prefetch_hana_configurations(self.controller,
+                                                     list(self.service_instances.values()))
+
+    def load_service_keys(self):
+        ServiceInstance.load_service_keys_in_bulk(self.controller,
+                                                  list(self.service_instances.values()))
+
     #
     # Space methods and helpers
     #
@@ -252,6 +383,13 @@ class Space:
                 f'The app information is not found for name {name}')
         return found_app
 
+    def get_app_summary_by_name(self, name):
+        found_app = self.get_item_by_name(self.app_summaries, name)
+        if not found_app:
+            logging.warning(
+                f'The app information is not found for name {name}')
+        return found_app
+
     def get_service_instance_by_name(self, name):
         found_service_instance = self.get_item_by_name(self.service_instances, name)
         if not found_service_instance:
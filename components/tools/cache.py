@@ -0,0 +1,193 @@
+import logging
+import sqlite3
+import threading
+import time
+import json
+import re
+from requests.structures import CaseInsensitiveDict
+
+
+class HanaMetadataCache:
+    # Persistent cache of the HANA container metadata of service instances.
+    # The database id and the container schema never change after the creation
+    # of a service instance, hence they are kept across runs in a SQLite file
+
+    def __init__(self, file):
+        self.file = file
+        self._lock = threading.Lock()
+        try:
+            # The connection is shared by the worker threads and guarded by the lock
+            self._connection = sqlite3.connect(str(file), timeout=30, check_same_thread=False)
+            with self._connection:
+                self._connection.execute(('CREATE TABLE IF NOT EXISTS hana_metadata ('
+                                          'service_instance_guid TEXT PRIMARY KEY, '
+                                          'space_guid TEXT, '
+                                          'database_id TEXT, '
+                                          'container_name TEXT, '
+                                          'stored_at INTEGER)'))
+        except sqlite3.Error as e: # pylint: disable=invalid-name
+            logging.error(f'Failed to open the HANA metadata cache {file}', exc_info=e)
+            raise
+        else:
+            logging.debug('Opened the HANA metadata cache %s', file)
+
+    def get(self, service_instance_guid):
+        with self._lock:
+            row = self._connection.execute(('SELECT database_id, container_name '
+                                            'FROM hana_metadata '
+                                            'WHERE service_instance_guid = ?'),
+                                           (service_instance_guid,)).fetchone()
+        if row:
+            database_id, container_name = row
+            return {'databaseId': database_id,
+                    'containerName': container_name}
+        return None
+
+    def put(self, service_instance_guid, space_guid, database_id, container_name):
+        with self._lock, self._connection:
+            self._connection.execute(('INSERT OR REPLACE INTO hana_metadata '
+                                      '(service_instance_guid, space_guid, database_id, '
+                                      'container_name, stored_at) '
+                                      'VALUES (?, ?, ?, ?, ?)'),
+                                     (service_instance_guid, space_guid, database_id,
+                                      container_name, int(time.time())))
+
+    def prune(self, space_guid, existing_service_instance_guids):
+        # Delete the entries of the service instances no longer listed in the space
+        existing_service_instance_guids = set(existing_service_instance_guids)
+        with self._lock, self._connection:
+            rows = self._connection.execute(('SELECT service_instance_guid FROM hana_metadata '
+                                             'WHERE space_guid = ?'), (space_guid,)).fetchall()
+            deleted_guids = [(guid,) for (guid,) in rows
+                             if guid not in existing_service_instance_guids]
+            self._connection.executemany(('DELETE FROM hana_metadata '
+                                          'WHERE service_instance_guid = ?'), deleted_guids)
+        if deleted_guids:
+            logging.debug(('Pruned %s deleted service instances '
+                           'of space %s from the HANA metadata cache'),
+                          len(deleted_guids), space_guid)
+        return len(deleted_guids)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    # Persistent cache of the parsed responses of HTTP GET requests shared by the runs.
+    # The time to live of a response is defined by the first matching path pattern,
+    # responses of paths without a matching pattern or with the time to live 0 are not kept.
+    # The number of entries is bounded, the least recently used entries are deleted first.
+    # SQLite in the WAL mode lets several processes read and write the same file.
+    # Secrets are never written to the file: the responses of the credential endpoints and of the
+    # paths listing credentials, e.g., the space content, are not kept, nor any other response
+    # with credentials. The kept responses are stored unchanged, hence reused ones equal live ones
+
+    # Paths never kept regardless of the time to live
+    uncached_paths = re.compile((r'/credentials/|^/oauth/|^/v2/spaces/[^/]+/content$'
+                                 r'|/service_keys|/service_bindings|/user_provided_service_instances'))
+
+    def __init__(self, file, ttl_policies, max_entries=10000):
+        self.file = file
+        self.ttl_policies = [(re.compile(pattern), int(ttl_seconds))
+                             for pattern, ttl_seconds in ttl_policies.items()]
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        try:
+            self._connection = sqlite3.connect(str(file), timeout=30, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            with self._connection:
+                self._connection.execute(('CREATE TABLE IF NOT EXISTS http_responses ('
+                                          'request_key TEXT PRIMARY KEY, '
+                                          'endpoint TEXT, '
+                                          'path TEXT, '
+                                          'http_status INTEGER, '
+                                          'response_headers TEXT, '
+                                          'response_body TEXT, '
+                                          'expires_at REAL, '
+                                          'accessed_at REAL)'))
+                self._connection.execute(('CREATE INDEX IF NOT EXISTS http_responses_accessed_at '
+                                          'ON http_responses (accessed_at)'))
+        except sqlite3.Error as e: # pylint: disable=invalid-name
+            logging.error(f'Failed to open the response cache {file}', exc_info=e)
+            raise
+        else:
+            logging.debug('Opened the response cache %s', file)
+
+    def get_ttl(self, path):
+        if self.uncached_paths.search(path):
+            return 0
+        return next((ttl_seconds for pattern, ttl_seconds in self.ttl_policies
+                     if pattern.search(path)), 0)
+
+    @classmethod
+    def has_credentials(cls, value):
+        if isinstance(value, dict):
+            return any((key == 'credentials' and bool(member)) or cls.has_credentials(member)
+                       for key, member in value.items())
+        if isinstance(value, list):
+            return any(cls.has_credentials(item) for item in value)
+        return False
+
+    def get(self, request_key):
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(('SELECT http_status, response_headers, response_body '
+                                            'FROM http_responses '
+                                            'WHERE request_key = ? AND expires_at > ?'),
+                                           (request_key, now)).fetchone()
+            if row:
+                self._connection.execute(('UPDATE http_responses SET accessed_at = ? '
+                                          'WHERE request_key = ?'), (now, request_key))
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+        if row:
+            http_status, response_headers, response_body = row
+            return {'response_body': json.loads(response_body),
+                    'response_headers': CaseInsensitiveDict(json.loads(response_headers)),
+                    'http_status': http_status}
+        return None
+
+    def put(self, request_key, endpoint, path, response):
+        ttl_seconds = self.get_ttl(path)
+        if ttl_seconds <= 0 or response.get('http_status') != 200:
+            return False
+        if self.has_credentials(response.get('response_body')):
+            logging.debug('Does not cache the response of %s with credentials', endpoint + path)
+            return False
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(('INSERT OR REPLACE INTO http_responses '
+                                      '(request_key, endpoint, path, http_status, '
+                                      'response_headers, response_body, expires_at, accessed_at) '
+                                      'VALUES (?, ?, ?, ?, ?, ?, ?, ?)'),
+                                     (request_key, endpoint, path, response.get('http_status'),
+                                      json.dumps(dict(response.get('response_headers') or {})),
+                                      json.dumps(response.get('response_body')),
+                                      now + ttl_seconds, now))
+            self.stats['stored'] += 1
+            self.evict(now)
+        return True
+
+    def evict(self, now):
+        # Delete the expired entries and the least recently used ones above the bound
+        self._connection.execute('DELETE FROM http_responses WHERE expires_at <= ?', (now,))
+        self._connection.execute(('DELETE FROM http_responses WHERE request_key IN ('
+                                  'SELECT request_key FROM http_responses '
+                                  'ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)'),
+                                 (self.max_entries,))
+
+    def invalidate(self, endpoint):
+        # Modifying requests make the cached responses of the endpoint outdated
+        with self._lock, self._connection:
+            deleted_count = self._connection.execute(
+                'DELETE FROM http_responses WHERE endpoint = ?', (endpoint,)).rowcount
+        if deleted_count:
+            logging.debug('Invalidated %s cached responses of %s', deleted_count, endpoint)
+        return deleted_count
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,5 +1,7 @@
 import logging
 import functools
+from components.tools.metrics import request_phase # pylint: disable=import-error
+from components.tools.deadline import deadline_bound # pylint: disable=import-error
 
 
 class Cleaner:
@@ -26,6 +28,8 @@ class Cleaner:
         return run_operation
 
     @check_experimental_features
+    @deadline_bound()
+    @request_phase
     def stop_continuously_crashing_apps(self, org_guid, space_guid, **kwargs):
         excluded_app_guids = self.collector.get_excluded_app_guids(**kwargs)
         stopped = False
@@ -39,15 +43,17 @@ class Cleaner:
             for app_guid in target_app_guids:
                 stopped = self.controller.stop_app(app_guid)
                 if stopped:
-                    logging.info(f'Stopped application {app_guid}')
+                    logging.info('Stopped application %s', app_guid)
                 else:
-                    logging.info(f'Failed to stop application {app_guid}')
+                    logging.info('Failed to stop application %s', app_guid)
             logging.info('Stopped all application matching the given criteria')
         else:
             logging.info(
                 'No continously crashing applications are identified matching the given criteria')
 
     @check_experimental_features
+    @deadline_bound()
+    @request_phase
     def delete_app_instances_by_state(self, org_guid, space_guid, **kwargs):
         excluded_app_guids = self.collector.get_excluded_app_guids(**kwargs)
         deleted = False
@@ -63,16 +69,18 @@ class Cleaner:
                 app_guid, instance_guid = app_instance_guids
                 deleted = self.controller.delete_app_instance(app_guid, instance_guid)
                 if deleted:
-                    logging.info(f'Deleted instance {instance_guid} of application {app_guid}')
+                    logging.info('Deleted instance %s of application %s', instance_guid, app_guid)
                 else:
                     logging.info(
-                        f'Failed to delete instance {instance_guid} of application {app_guid}')
+                        'Failed to delete instance %s of application %s', instance_guid, app_guid)
             logging.info('Deleted all application instances matching the given criteria')
         else:
             logging.info(
                 'No application instances are identified for deletion matching the given criteria')
 
     @check_experimental_features
+    @deadline_bound()
+    @request_phase
     def delete_non_mta_app_service_instances(self, org_guid, space_guid, **kwargs):
         excluded_app_guids = self.collector.get_excluded_app_guids(**kwargs)
         excluded_service_instance_guids = self.collector.get_excluded_service_instance_guids(**kwargs) # pylint: disable=line-too-long
@@ -88,9 +96,9 @@ class Cleaner:
             for app_guid in target_app_guids:
                 deleted = self.controller.delete_app_gracefully(org_guid, space_guid, app_guid)
                 if deleted:
-                    logging.info(f'Gracefully deleted application {app_guid}')
+                    logging.info('Gracefully deleted application %s', app_guid)
                 else:
-                    logging.info(f'Failed to gracefully delete application {app_guid}')
+                    logging.info('Failed to gracefully delete application %s', app_guid)
             logging.info('Deleted all possible applications matching the given criteria')
         else:
             logging.info('No applications are identified for deletion matching the given criteria')
@@ -100,9 +108,9 @@ class Cleaner:
             for service_instance_guid in target_service_instance_guids:
                 deleted = self.controller.delete_service_instance(service_instance_guid)
                 if deleted:
-                    logging.info(f'Deleted service instance {service_instance_guid}')
+                    logging.info('Deleted service instance %s', service_instance_guid)
                 else:
-                    logging.info(f'Failed to delete service instance {service_instance_guid}')
+                    logging.info('Failed to delete service instance %s', service_instance_guid)
             logging.info('Deleted all possible applications matching the given criteria')
         else:
             logging.info(
@@ -35,10 +35,140 @@ class Client:
         file_path = re.sub(r'\/+', '/', file_path)
         return Path(file_path)
 
+    def resolve_persistent_file(self, file):
+        # Files shared by all runs are stored directly in the output directory
+        file_path = f'{self.output_dir}/{file}'
+        file_path = re.sub(r'\/+', '/', file_path)
+        return Path(file_path)
+
     def get_configured_logging_level(self):
         logging_level = self.config.get('client_config').get('logging_level')
         allowed_levels = ['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET']
         return logging_level if logging_level in allowed_levels else 'NOTSET'
 
+    def get_log_sample_rate(self):
+        # The share of repeated DEBUG records kept per message template
+        sample_rate = self.config.get('client_config').get('log_sample_rate', 1.0)
+        return (float(sample_rate)
+                if isinstance(sample_rate, (int, float)) and 0 <= sample_rate <= 1
+                else 1.0)
+
+    def get_log_writer_config(self):
+        # Background writing, batching and rotation of the logs
+        log_writer_config = self.config.get('client_config').get('log_writer') or {}
+        batch_size = log_writer_config.get('batch_size')
+        max_bytes = log_writer_config.get('max_bytes')
+        backup_count = log_writer_config.get('backup_count')
+        return {'asynchronous': log_writer_config.get('asynchronous', True) is not False,
+                'process_safe': log_writer_config.get('process_safe', False) is True,
+                'batch_size': batch_size if isinstance(batch_size, int) and batch_size > 0 else 100,
+                'max_bytes': max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else 0,
+                'backup_count': (backup_count
+                                 if isinstance(backup_count, int) and backup_count > 0
+                                 else 5),
+                'compress': log_writer_config.get('compress', True) is not False}
+
     def get_experimental_features_status(self):
         return self.config.get('controller_config').get('enable_experimental_features')
+
+    def get_max_workers(self):
+        max_workers = self.config.get('client_config').get('max_workers')
+        return max_workers if isinstance(max_workers, int) and max_workers > 0 else 8
+
+    def get_adaptive_concurrency_config(self):
+        # None if the number of in-flight requests is not adapted
+        adaptive_config = self.config.get('client_config').get('adaptive_concurrency') or {}
+        if adaptive_config.get('enabled') is not True:
+            return None
+        max_workers = self.get_max_workers()
+        adaptive_config = {'initial_limit': adaptive_config.get('initial_limit', max_workers),
+                           'min_limit': adaptive_config.get('min_limit', 1),
+                           'max_limit': adaptive_config.get('max_limit', max_workers * 4),
+                           'latency_tolerance': adaptive_config.get('latency_tolerance', 2.0),
+                           'backoff_ratio': adaptive_config.get('backoff_ratio', 0.5)}
+        adaptive_config['max_limit'] = max(adaptive_config.get('max_limit'),
+                                           adaptive_config.get('min_limit'))
+        return adaptive_config
+
+    def get_worker_count(self):
+        # With the adaptive concurrency the bulk loaders get enough threads to reach
+        # the maximum limit, the limiters decide how many of their requests are in flight
+        adaptive_config = self.get_adaptive_concurrency_config()
+        return adaptive_config.get('max_limit') if adaptive_config else self.get_max_workers()
+
+    def get_session_config(self):
+        # Connection pool, keep-alive and timeout settings of the HTTP sessions
+        http_config = self.config.get('client_config').get('http') or {}
+        session_config = {'pool_connections': http_config.get('pool_connections', 10),
+                          'pool_maxsize': http_config.get('pool_maxsize', self.get_worker_count()),
+                          'keep_alive': http_config.get('keep_alive', True) is not False,
+                          'connect_timeout': http_config.get('connect_timeout'),
+                          'read_timeout': http_config.get('read_timeout'),
+                          'json_decoder': http_config.get('json_decoder') or 'auto',
+                          'json_streaming': http_config.get('json_streaming', False) is True,
+                          # Paging of the lists, the omitted settings keep the defaults
+                          'pagination': {setting: value for setting, value
+                                         in (http_config.get('pagination') or {}).items()
+                                         if value is not None}}
+        # Timeouts per endpoint: controller, uaa and hana_broker
+        session_config['endpoints'] = {
+            name: {setting: value for setting, value in (endpoint_config or {}).items()
+                   if setting in ['connect_timeout', 'read_timeout']}
+            for name, endpoint_config in (http_config.get('endpoints') or {}).items()}
+        return session_config
+
+    def get_transport_config(self):
+        # Retries and hedging of the requests, the omitted settings keep the defaults
+        transport_config = self.config.get('client_config').get('transport') or {}
+        if transport_config.get('enabled', True) is False:
+            return None
+        transport_config = {setting: value for setting, value in transport_config.items()
+                            if setting != 'enabled' and value is not None}
+        transport_config['max_workers'] = self.get_worker_count()
+        return transport_config
+
+    def get_rate_limits(self):
+        # Requests per second and burst per session or operation, limits without a positive rate
+        # are ignored
+        rate_limits_config = self.config.get('client_config').get('rate_limits') or {}
+        rate_limits = {}
+        for name, rate_limit in rate_limits_config.items():
+            rate = (rate_limit or {}).get('rate')
+            burst = (rate_limit or {}).get('burst')
+            if isinstance(rate, (int, float)) and rate > 0:
+                rate_limits[name] = {'rate': rate,
+                                     'burst': burst if isinstance(burst, int) and burst > 0 else 1}
+        return rate_limits
+
+    def get_request_metrics_status(self):
+        return self.config.get('client_config').get('request_metrics', True) is not False
+
+    def get_n_plus_one_threshold(self):
+        threshold = self.config.get('client_config').get('n_plus_one_threshold', 20)
+        return threshold if isinstance(threshold, int) and threshold >= 0 else 20
+
+    def get_prometheus_textfile(self):
+        prometheus_textfile = self.config.get('client_config').get('prometheus_textfile')
+        return Path(prometheus_textfile) if prometheus_textfile else None
+
+    def get_tracing_status(self):
+        return self.config.get('client_config').get('tracing', False) is True
+
+    def get_memory_lean(self):
+        return self.config.get('client_config').get('memory_lean', False) is True
+
+    def get_response_cache_config(self):
+        # None if the response cache is disabled
+        response_cache_config = self.config.get('client_config').get('response_cache') or {}
+        if response_cache_config.get('enabled') is not True:
+            return None
+        max_entries = response_cache_config.get('max_entries')
+        return {'file': self.resolve_persistent_file('response_cache.sqlite'),
+                'ttl_policies': response_cache_config.get('ttl_seconds') or {},
+                'max_entries': (max_entries
+                                if isinstance(max_entries, int) and max_entries > 0
+                                else 10000)}
+
+    def get_hana_metadata_cache_file(self):
+        enabled = self.config.get('client_config').get('hana_metadata_cache', False) is True
+        return self.resolve_persistent_file('hana_metadata_cache.sqlite') if enabled else None
@@ -5,6 +5,9 @@ from components.controller.service import ServiceInstance, ServiceKey, UserProvi
 from components.controller.application import Application, ApplicationInstance, ApplicationLogs
 from components.controller.database import Database # pylint: disable=import-error
 from components.controller.controller import User # pylint: disable=import-error
+from components.tools.utils import map_concurrently # pylint: disable=import-error
+from components.tools.metrics import request_phase # pylint: disable=import-error
+from components.tools.deadline import deadline_bound # pylint: disable=import-error
 
 
 class Collector:
@@ -71,12 +74,12 @@ class Collector:
                                             'apps')
                                         if excluded_apps:
                                             for app_name in excluded_apps:
-                                                app = space.get_app_by_name(app_name)
+                                                app = space.get_app_summary_by_name(app_name)
                                                 if app:
                                                     excluded_app_guids.append(app.guid)
                                     else:
                                         excluded_app_guids = (excluded_app_guids
-                                                              + list(space.apps.keys()))
+                                                              + list(space.app_summaries.keys()))
         return excluded_app_guids
 
     def get_excluded_service_instance_guids(self, **kwargs):
@@ -115,12 +118,13 @@ class Collector:
         try:
             file = self.client.resolve_file(parent_folder, f'{file_name_wo_extension}.csv')
             data_frame.to_csv(file)
-            logging.info(f'Stored the collected content into file {file}')
+            logging.info('Stored the collected content into file %s', file)
         except Exception as e: # pylint: disable=invalid-name
             logging.error(f'Failed to store the collected content into csv file {file}',
                           exc_info=e)
             raise
 
+    @deadline_bound(skipped_result=list)
     def get_target_org_space_guids_by_name(self, org_name, **kwargs):
         kwargs.setdefault('space_name', None)
         org = self.controller.get_org_by_name(org_name)
@@ -134,6 +138,7 @@ class Collector:
                 found_entities.append((org.guid, space_guid))
         return found_entities
 
+    @deadline_bound(skipped_result=list)
     def get_target_org_space_app_guids_by_name(self, org_name, **kwargs):
         kwargs.setdefault('space_name', None)
         kwargs.setdefault('app_name', None)
@@ -156,6 +161,8 @@ class Collector:
 
     # Store the information about Organization roles assigned to users in a csv file
 
+    @deadline_bound()
+    @request_phase
     def store_org_roles_assignment(self):
         users = self.controller.users
         representations = []
@@ -169,6 +176,8 @@ class Collector:
 
     # Store the information about Space roles assigned to users in a csv file
 
+    @deadline_bound()
+    @request_phase
     def store_space_roles_assignment(self):
         users = self.controller.users
         representations = []
@@ -182,6 +191,8 @@ class Collector:
 
     # Store the information about Role Collections roles to users in a csv file
 
+    @deadline_bound()
+    @request_phase
     def store_role_collections_assignment(self):
         users = self.controller.users
         representations = []
@@ -194,6 +205,8 @@ class Collector:
 
     # Store the information about Databases known by XS Advanced in a csv file
 
+    @deadline_bound()
+    @request_phase
     def store_databases(self):
         databases = self.controller.databases
         representations = []
@@ -205,6 +218,8 @@ class Collector:
 
     # Store the information about invalid HANA service instances in a csv file
 
+    @deadline_bound()
+    @request_phase
     def store_invalid_instances(self):
         databases = self.controller.databases
         representations = []
@@ -238,11 +253,16 @@ class Collector:
 
         representations = []
 
-        for app_guid in space.apps:
+        # Load only the required applications if the list of applications is restricted
+        apps = (space.apps
+                if kwargs.get('restricted_app_guids') is None
+                else space.get_apps_by_guids(kwargs.get('restricted_app_guids')))
+
+        for app_guid in apps:
             if (app_guid in list(kwargs.get('restricted_app_guids') or [])
                 or kwargs.get('restricted_app_guids') is None):
 
-                app = space.get_app_by_guid(app_guid)
+                app = apps[app_guid]
                 app_representation = app.representation
                 if len(app.instances) == 0:
                     instance_representation = ApplicationInstance.get_blank_representation()
@@ -260,6 +280,8 @@ class Collector:
                                 app_representation + instance_representation)
         return representations
 
+    @deadline_bound()
+    @request_phase
     def store_applications(self, org_guid, space_guid, **kwargs):
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
@@ -277,6 +299,13 @@ class Collector:
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
 
+        # Load the HANA configurations of the required service instances at once
+        target_instances = [space.service_instances[guid] for guid in space.service_instances
+                            if (guid in list(kwargs.get('restricted_instance_guids') or [])
+                                or kwargs.get('restricted_instance_guids') is None)]
+        ServiceInstance.prefetch_hana_configurations(self.controller, target_instances)
+        ServiceInstance.load_service_keys_in_bulk(self.controller, target_instances)
+
         representations = []
         for guid in space.service_instances:
             if (guid in list(kwargs.get('restricted_instance_guids') or [])
@@ -287,6 +316,8 @@ class Collector:
                                         + service_instance.app_relations_representation))
         return representations
 
+    @deadline_bound()
+    @request_phase
     def store_service_instances(self, org_guid, space_guid, **kwargs):
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
@@ -312,6 +343,8 @@ class Collector:
                 representations.append(ups_service_instance.representation)
         return representations
 
+    @deadline_bound()
+    @request_phase
     def store_ups_service_instances(self, org_guid, space_guid, **kwargs):
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
@@ -328,6 +361,9 @@ class Collector:
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
 
+        space.prefetch_hana_configurations()
+        space.load_service_keys()
+
         representations = []
         for instance_guid in space.service_instances:
             service_instance = space.get_service_instance_by_guid(instance_guid)
@@ -340,6 +376,8 @@ class Collector:
                                             + service_key_representation))
         return representations
 
+    @deadline_bound()
+    @request_phase
     def store_service_instance_keys(self, org_guid, space_guid):
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
@@ -354,30 +392,79 @@ class Collector:
 
     # Operate with continously crashing apps
 
-    def get_continuously_crashing_app_guids(self, org_guid, space_guid):
-        org = self.controller.get_org_by_guid(org_guid)
-        space = org.get_space_by_guid(space_guid)
-        found_guids = []
-        for guid in space.apps:
-            if not space.apps[guid].state == 'STOPPED':
-                crashed_short_term_count = space.apps[guid].crashed_short_term_count
-                crashed_mid_term_count = space.apps[guid].crashed_mid_term_count
-                # Assumed 3 crashes is a short term as a critical threshold
-                # Assumed 1 crash in a short term and 10 crashes in a midterm
-                # as a critical threshold
-                if crashed_short_term_count >= 1:
-                    if crashed_mid_term_count >= 10:
-                        found_guids.append(guid)
-                    else:
-                        if crashed_short_term_count >= 3:
-                            found_guids.append(guid)
-        return found_guids
+    @staticmethod
+    def is_continuously_crashing(crashed_short_term_count, crashed_mid_term_count):
+        # Assumed 3 crashes is a short term as a critical threshold
+        # Assumed 1 crash in a short term and 10 crashes in a midterm
+        # as a critical threshold
+        crashed_short_term_count = crashed_short_term_count or 0
+        crashed_mid_term_count = crashed_mid_term_count or 0
+        if crashed_short_term_count >= 1:
+            if crashed_mid_term_count >= 10:
+                return True
+            if crashed_short_term_count >= 3:
+                return True
+        return False
+
+    def scan_continuously_crashing_apps(self, **kwargs):
+        # The fast scan reads only the application summaries and the monitoring data.
+        # Complete application information is loaded later only for the found applications
+        kwargs.setdefault('org_guid', None)
+        kwargs.setdefault('space_guid', None)
+
+        if kwargs.get('org_guid'):
+            orgs = [org for org in [self.controller.get_org_by_guid(kwargs.get('org_guid'))] if org]
+        else:
+            orgs = list(self.controller.orgs.values())
+
+        spaces = []
+        for org in orgs:
+            if kwargs.get('space_guid'):
+                # Without org_guid the organization of the space is looked up in all of them
+                spaces.extend(space for space in org.spaces.values()
+                              if space.guid == kwargs.get('space_guid'))
+            else:
+                spaces.extend(org.spaces.values())
+        if kwargs.get('space_guid') and not spaces:
+            logging.warning('The space information is not found for guid %s',
+                            kwargs.get('space_guid'))
+
+        # Load the application summaries of all spaces in parallel
+        map_concurrently(lambda space: space.app_summaries, spaces, self.controller.max_workers)
+
+        running_apps = [space.app_summaries[guid]
+                        for space in spaces
+                        for guid in space.app_summaries
+                        if not space.app_summaries[guid].state == 'STOPPED']
+        monitoring_data = self.controller.monitoring_loader.load(
+            [app.guid for app in running_apps])
+
+        found_apps = []
+        for app in running_apps:
+            app_monitoring_data = monitoring_data.get(app.guid) or {}
+            if self.is_continuously_crashing(app_monitoring_data.get('crashed_short_term'),
+                                             app_monitoring_data.get('crashed_mid_term')):
+                found_apps.append((app.space.org.guid, app.space.guid, app.guid))
+        logging.info(('Identified %s continuously crashing applications '
+                      'of %s not stopped applications in %s spaces'),
+                     len(found_apps), len(running_apps), len(spaces))
+        return found_apps
 
-    def store_continuously_crashing_apps(self, org_guid, space_guid):
+    def get_continuously_crashing_app_guids(self, org_guid, space_guid):
+        found_apps = self.scan_continuously_crashing_apps(org_guid=org_guid,
+                                                          space_guid=space_guid)
+        return [app_guid for _, _, app_guid in found_apps]
+
+    @deadline_bound()
+    @request_phase
+    def store_continuously_crashing_apps(self, org_guid, space_guid, **kwargs):
+        kwargs.setdefault('found_guids', None)
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
 
-        found_guids = self.get_continuously_crashing_app_guids(org_guid, space_guid)
+        found_guids = (kwargs.get('found_guids')
+                       if kwargs.get('found_guids') is not None
+                       else self.get_continuously_crashing_app_guids(org_guid, space_guid))
         if found_guids:
             representations = self.get_app_representations(org_guid,
                                                            space_guid,
@@ -388,6 +475,21 @@ class Collector:
             self.dump_df_to_csv(
                 df_apps, f'apps/{org.name}/{space.name}', 'continously_crashing_apps')
 
+    @deadline_bound()
+    @request_phase
+    def store_scanned_continuously_crashing_apps(self, **kwargs):
+        # Scan the given organization or the whole landscape if no organization is given
+        kwargs.setdefault('org_guid', None)
+        found_apps = self.scan_continuously_crashing_apps(org_guid=kwargs.get('org_guid'))
+
+        found_guids_by_space = {}
+        for org_guid, space_guid, app_guid in found_apps:
+            found_guids_by_space.setdefault((org_guid, space_guid), []).append(app_guid)
+
+        for org_guid, space_guid in found_guids_by_space:
+            self.store_continuously_crashing_apps(
+                org_guid, space_guid, found_guids=found_guids_by_space[(org_guid, space_guid)])
+
     # Operate with app and service instances
 
     def get_app_instance_guids_by_state(self, org_guid, space_guid, **kwargs):
@@ -453,6 +555,8 @@ class Collector:
             org_guid, space_guid, has_non_di_mta_bindings=False, has_non_di_mta_references=False)
         return found_app_guids, found_service_instance_guids
 
+    @deadline_bound()
+    @request_phase
     def store_non_mta_apps_service_instances(self, org_guid, space_guid):
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
@@ -484,6 +588,8 @@ class Collector:
                             f"services/{org.name}/{space.name}",
                             "non_mta_service_instances")
 
+    @deadline_bound()
+    @request_phase
     def store_app_router_log(self, org_guid, space_guid, app_guid):
         org = self.controller.get_org_by_guid(org_guid)
         space = org.get_space_by_guid(space_guid)
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+import csv
+import requests
+from components.tools.metrics import RequestMetrics # pylint: disable=import-error
+from components.tools.tracing import tracer # pylint: disable=import-error
+
+
+class ConcurrencyLimiter:
+    # Limits the number of in-flight requests of a session and adapts the limit
+    # to the observed latency and errors (additive increase, multiplicative decrease).
+    # The limit grows by one per window of limit requests answered in time and is cut on
+    # HTTP 429 / 5xx and connection errors or timeouts by backoff_ratio, on latencies above
+    # latency_tolerance times the usual latency of the path template by LATENCY_BACKOFF_RATIO.
+    # A limit is cut once per window, the requests sent before the cut do not cut it again
+
+    LATENCY_BACKOFF_RATIO = 0.9
+    # Weight of a new latency in the usual latency of the path template
+    BASELINE_WEIGHT = 0.05
+
+    def __init__(self, name, **kwargs):
+        kwargs.setdefault('initial_limit', 8)
+        kwargs.setdefault('min_limit', 1)
+        kwargs.setdefault('max_limit', 64)
+        kwargs.setdefault('latency_tolerance', 2.0)
+        kwargs.setdefault('backoff_ratio', 0.5)
+
+        self.name = name
+        self.min_limit = kwargs.get('min_limit')
+        self.max_limit = kwargs.get('max_limit')
+        self.latency_tolerance = kwargs.get('latency_tolerance')
+        self.backoff_ratio = kwargs.get('backoff_ratio')
+        self.limit = float(min(self.max_limit, max(self.min_limit, kwargs.get('initial_limit'))))
+
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._baselines = {}
+        self._decreased_at = 0
+        self._started_at = time.monotonic()
+        self.history = []
+        self.stats = {'initial_limit': int(self.limit), 'min_limit': int(self.limit),
+                      'max_limit': int(self.limit), 'increases': 0, 'decreases': 0, 'waited': 0}
+        tracer.counter(f'{self.name} concurrency limit', limit=int(self.limit))
+
+    def acquire(self):
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                self.stats['waited'] += 1
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started_at, path, http_status=None, failed=False):
+        latency = time.monotonic() - started_at
+        template = RequestMetrics.normalize_path(path)
+        with self._condition:
+            self.in_flight -= 1
+            failed = failed or http_status == 429 or (http_status or 0) >= 500
+            baseline = self._baselines.get(template)
+            if failed:
+                self.decrease(started_at, self.backoff_ratio, 'error')
+            elif baseline is not None and latency > self.latency_tolerance * baseline:
+                self.decrease(started_at, self.LATENCY_BACKOFF_RATIO, 'latency')
+            elif baseline is not None:
+                self.change(min(self.max_limit, self.limit + 1 / self.limit), 'increase')
+            if not failed:
+                self._baselines[template] = (
+                    latency
+                    if baseline is None
+                    else baseline + self.BASELINE_WEIGHT * (latency - baseline))
+            self._condition.notify_all()
+
+    def decrease(self, started_at, ratio, reason):
+        if started_at < self._decreased_at:
+            return
+        self._decreased_at = time.monotonic()
+        self.change(max(self.min_limit, self.limit * ratio), reason)
+
+    def change(self, limit, reason):
+        # Only the changes of the effective (integer) limit are recorded
+        changed = int(limit) != int(self.limit)
+        self.limit = limit
+        if not changed:
+            return
+        self.stats['increases' if reason == 'increase' else 'decreases'] += 1
+        self.stats['min_limit'] = min(self.stats['min_limit'], int(limit))
+        self.stats['max_limit'] = max(self.stats['max_limit'], int(limit))
+        self.history.append({'session': self.name,
+                             'seconds': round(time.monotonic() - self._started_at, 3),
+                             'limit': int(limit),
+                             'in_flight': self.in_flight,
+                             'reason': reason})
+        tracer.counter(f'{self.name} concurrency limit', limit=int(limit))
+        logging.debug('Changed the concurrency limit of session %s to %s due to %s',
+                      self.name, int(limit), reason)
+
+    @staticmethod
+    def is_failure(exception):
+        return isinstance(exception, (requests.ConnectionError, requests.Timeout))
+
+    @staticmethod
+    def write_csv(file, concurrency_limiters):
+        keys = ['session', 'seconds', 'limit', 'in_flight', 'reason']
+        with open(file, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=keys)
+            writer.writeheader()
+            for concurrency_limiter in concurrency_limiters:
+                writer.writerows(concurrency_limiter.history)
@@ -0,0 +1,104 @@
+import logging
+import threading
+import functools
+import time
+import json
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    # The time budget of the run given by --max-runtime. Once it runs out, the lazy loaders
+    # and the sessions raise DeadlineExceeded instead of loading or sending anything,
+    # and the timeouts of the requests are cut to the remaining time.
+    # The operations of the Collector and the Cleaner interrupted or not started
+    # due to the deadline are listed in the manifest of the run
+
+    def __init__(self):
+        self.max_runtime = None
+        self.expires_at = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.completed = []
+        self.skipped = []
+
+    def start(self, max_runtime):
+        self.max_runtime = max_runtime
+        self.expires_at = time.monotonic() + max_runtime if max_runtime else None
+
+    @property
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic()) if self.expires_at else None
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, activity):
+        if self.expired:
+            raise DeadlineExceeded(f'The run exceeded {self.max_runtime} s before {activity}')
+
+    def cap_timeout(self, timeout):
+        # The connect and read timeouts of a request do not exceed the remaining time
+        remaining = self.remaining
+        if remaining is None:
+            return timeout
+        connect_timeout, read_timeout = (timeout
+                                         if isinstance(timeout, tuple)
+                                         else (timeout, timeout))
+        return (min(connect_timeout, remaining) if connect_timeout else remaining,
+                min(read_timeout, remaining) if read_timeout else remaining)
+
+    def record(self, outcome, operation, arguments, reason=None):
+        entry = {'operation': operation, 'arguments': arguments}
+        if reason:
+            entry['reason'] = reason
+        with self._lock:
+            (self.skipped if outcome == 'skipped' else self.completed).append(entry)
+
+    def write_manifest(self, file):
+        with self._lock:
+            manifest = {'max_runtime_seconds': self.max_runtime,
+                        'expired': self.expired,
+                        'completed': list(self.completed),
+                        'skipped': list(self.skipped)}
+        with open(file, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, default=str)
+
+
+# The deadline shared by all components of the run
+deadline = Deadline()
+
+
+def deadline_bound(skipped_result=None):
+    # The outermost bound operation running out of time is skipped and listed in the manifest,
+    # the results of the operations finished before are kept. The skipped operation returns
+    # skipped_result(), if given. The nested bound operations pass DeadlineExceeded
+    # to the outermost one
+    def decorator(operation):
+        @functools.wraps(operation)
+        def run_operation(*args, **kwargs):
+            # pylint: disable=protected-access
+            depth = getattr(deadline._local, 'depth', 0)
+            # Entities are listed by guid
+            arguments = ([str(getattr(arg, 'guid', arg)) for arg in args[1:]]
+                         + [f'{key}={value}' for key, value in kwargs.items()])
+            deadline._local.depth = depth + 1
+            try:
+                deadline.check(operation.__name__)
+                result = operation(*args, **kwargs)
+            except DeadlineExceeded as e: # pylint: disable=invalid-name
+                if depth:
+                    raise
+                logging.warning('Skipped %s %s: %s', operation.__name__, arguments, e)
+                deadline.record('skipped', operation.__name__, arguments, reason=str(e))
+                return skipped_result() if skipped_result else None
+            finally:
+                deadline._local.depth = depth
+            if not depth:
+                deadline.record('completed', operation.__name__, arguments)
+            return result
+        return run_operation
+    return decorator
@@ -0,0 +1,163 @@
+import logging
+import codecs
+import json
+
+# The faster JSON backends are optional, the standard library is used without them
+try:
+    import orjson # pylint: disable=import-error
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson # pylint: disable=import-error
+except ImportError:
+    simdjson = None
+
+
+class StdlibJsonDecoder:
+    # pylint: disable=too-few-public-methods
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        # Bytes are decoded as UTF-8, UTF-16 or UTF-32 as detected by json
+        return json.loads(data)
+
+
+class OrjsonJsonDecoder:
+    # pylint: disable=too-few-public-methods
+    # orjson.JSONDecodeError is a subclass of ValueError as json.JSONDecodeError.
+    # Integers beyond 64 bits are not supported by orjson
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+class SimdjsonJsonDecoder:
+    # pylint: disable=too-few-public-methods
+    name = 'simdjson'
+
+    @staticmethod
+    def loads(data):
+        return simdjson.loads(data)
+
+
+# The backends in the order of preference of the automatic choice
+JSON_DECODERS = {'orjson': (OrjsonJsonDecoder, lambda: orjson is not None),
+                 'simdjson': (SimdjsonJsonDecoder, lambda: simdjson is not None),
+                 'json': (StdlibJsonDecoder, lambda: True)}
+
+
+def get_json_decoder(name='auto'):
+    # Decoders take the response body as bytes or str and raise ValueError on invalid JSON.
+    # With auto, or if the requested backend is not installed, the fastest installed one is used
+    decoder, available = JSON_DECODERS.get(name, (None, lambda: False))
+    if available():
+        return decoder
+    if name != 'auto':
+        logging.warning('JSON decoder %s is not available, the fastest installed one is used',
+                        name)
+    return next(decoder for decoder, available in JSON_DECODERS.values() if available())
+
+
+class JsonArrayStream:
+    # Incremental decoder of a JSON object with large arrays as members, e.g., {"users": [...]},
+    # reading the body chunk by chunk as it is received. The items of the arrays are decoded
+    # one by one by json.JSONDecoder.raw_decode, hence neither the complete body nor the complete
+    # decoded document is held in memory. The other members of the object, e.g., the link
+    # to the next page, are kept in values
+
+    def __init__(self, chunks, close=None):
+        self._chunks = iter(chunks)
+        self._close = close
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._exhausted = False
+        self.values = {}
+
+    def _read_chunk(self):
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            text = self._text_decoder.decode(b'', final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+        # The decoded part of the buffer is dropped
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return chunk is not None
+
+    def _peek(self):
+        # The next character after whitespace, None at the end of the body
+        while True:
+            buffer = self._buffer
+            while self._position < len(buffer) and buffer[self._position] in ' \t\n\r':
+                self._position += 1
+            if self._position < len(buffer):
+                return buffer[self._position]
+            if not self._read_chunk():
+                return None
+
+    def _expect(self, characters):
+        character = self._peek()
+        if character is None or character not in characters:
+            raise ValueError((f'Expected one of {characters!r} instead of {character!r} '
+                              'in the streamed JSON document'))
+        self._position += 1
+        return character
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except ValueError:
+                # The value continues in the next chunk
+                if not self._read_chunk():
+                    raise
+            else:
+                # A value not followed by a structural character or whitespace, e.g., a number
+                # split at the end of a chunk, continues in the next chunk
+                if ((end < len(self._buffer) and self._buffer[end] in ',]}: \t\n\r')
+                        or not self._read_chunk()):
+                    self._position = end
+                    return value
+
+    def _items(self):
+        if self._peek() == ']':
+            self._position += 1
+            return
+        while True:
+            yield self._decode_value()
+            if self._expect(',]') == ']':
+                return
+
+    def members(self):
+        # Yields (key, items) per array member of the object, the items are decoded while
+        # iterating over them. Items not consumed before the next member are skipped
+        try:
+            if self._peek() is None:
+                return
+            self._expect('{')
+            if self._peek() == '}':
+                return
+            while True:
+                key = self._decode_value()
+                self._expect(':')
+                if self._peek() == '[':
+                    self._position += 1
+                    items = self._items()
+                    yield key, items
+                    for _ in items:
+                        pass
+                else:
+                    self.values[key] = self._decode_value()
+                if self._expect(',}') == '}':
+                    return
+        finally:
+            if self._close is not None:
+                self._close()
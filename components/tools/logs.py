@@ -0,0 +1,148 @@
+import logging
+import logging.handlers
+import multiprocessing
+import threading
+import atexit
+import queue
+import gzip
+import shutil
+import os
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps one of every N DEBUG records logged with the same message template,
+    # e.g., one of 'Loaded information about application %s / %s ...' per 10 applications.
+    # The first record of every template and the records of other levels are always kept
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.keep_every = max(1, round(1 / sample_rate)) if sample_rate > 0 else None
+        self._lock = threading.Lock()
+        self._counts = {}
+        self.dropped_count = 0
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG or self.keep_every == 1:
+            return True
+        with self._lock:
+            count = self._counts.get(record.msg, 0)
+            self._counts[record.msg] = count + 1
+            keep = count == 0 or (self.keep_every is not None and count % self.keep_every == 0)
+            if not keep:
+                self.dropped_count += 1
+        return keep
+
+
+def compress_rotated_log(source, destination):
+    # Rotator of the log files, the rotated file is kept gzipped
+    with open(source, 'rb') as source_file, gzip.open(destination, 'wb') as destination_file:
+        shutil.copyfileobj(source_file, destination_file)
+    os.remove(source)
+
+
+def create_file_handler(file, **kwargs):
+    # The log file is rotated once it exceeds max_bytes, 0 - never
+    kwargs.setdefault('max_bytes', 0)
+    kwargs.setdefault('backup_count', 5)
+    kwargs.setdefault('compress', True)
+
+    if not kwargs.get('max_bytes'):
+        return logging.FileHandler(filename=file, encoding='utf-8')
+    file_handler = logging.handlers.RotatingFileHandler(filename=file, encoding='utf-8',
+                                                        maxBytes=kwargs.get('max_bytes'),
+                                                        backupCount=kwargs.get('backup_count'))
+    if kwargs.get('compress'):
+        file_handler.namer = lambda name: f'{name}.gz'
+        file_handler.rotator = compress_rotated_log
+    return file_handler
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    # Writes the queued records to every handler at once and flushes the handler once per batch
+    # instead of once per record
+
+    def __init__(self, log_queue, *handlers, batch_size=100):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        stopped = False
+        while not stopped:
+            batch = []
+            record = self.dequeue(True)
+            while True:
+                if record is self._sentinel:
+                    stopped = True
+                    break
+                batch.append(self.prepare(record))
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            for handler in self.handlers:
+                self.write_batch(handler, batch)
+
+    @staticmethod
+    def write_batch(handler, records):
+        records = [record for record in records if record.levelno >= handler.level]
+        if not isinstance(handler, logging.StreamHandler):
+            for record in records:
+                handler.handle(record)
+            return
+        records = [record for record in records if handler.filter(record)]
+        if not records:
+            return
+        handler.acquire()
+        try:
+            # The size limit of a rotated file is checked once per batch
+            if (isinstance(handler, logging.handlers.RotatingFileHandler)
+                    and handler.shouldRollover(records[0])):
+                handler.doRollover()
+            handler.stream.write(''.join(handler.format(record) + handler.terminator
+                                         for record in records))
+            handler.flush()
+        except Exception: # pylint: disable=broad-except
+            handler.handleError(records[0])
+        finally:
+            handler.release()
+
+
+class QueueLogging:
+    # Takes writing the logs off the threads doing the collection. The threads only put
+    # the records into a queue, a background listener writes them to the target handlers.
+    # The records queued meanwhile are written at once, up to batch_size records per write.
+    # With process_safe the queue is shared with child processes, which log through
+    # a queue handler installed by configure_worker, e.g., as the initializer of a process pool
+
+    def __init__(self, handlers, **kwargs):
+        kwargs.setdefault('batch_size', 100)
+        kwargs.setdefault('process_safe', False)
+
+        self.queue = (multiprocessing.Queue(-1)
+                      if kwargs.get('process_safe')
+                      else queue.SimpleQueue())
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        # The queued record carries the bare message, the target handlers apply their own format
+        self.queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        self.listener = BatchingQueueListener(self.queue, *handlers,
+                                              batch_size=kwargs.get('batch_size'))
+        self.started = False
+
+    def start(self):
+        self.listener.start()
+        self.started = True
+        # The queued records are written even if the run exits unexpectedly
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.started:
+            self.started = False
+            self.listener.stop()
+
+    @staticmethod
+    def configure_worker(log_queue, level):
+        root_logger = logging.getLogger()
+        root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+        root_logger.setLevel(level)
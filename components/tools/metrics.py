@@ -0,0 +1,265 @@
+import logging
+import threading
+import functools
+import contextlib
+import os
+import json
+import csv
+import re
+import math
+import bisect
+import random
+from components.tools.tracing import tracer # pylint: disable=import-error
+from components.tools.profiler import profiler # pylint: disable=import-error
+
+
+class RequestMetrics:
+    # Collects the count, the HTTP statuses, the received bytes and the latency of the requests
+    # per endpoint and normalized path template, e.g., GET /v2/apps/{guid}/instances.
+    # The total, the maximum and the histogram of the latency are exact, the percentiles
+    # are computed from a uniform sample of at most latency_reservoir_size latencies per template
+
+    # Path segments replaced by placeholders to group the requests of the same API
+    PATH_TEMPLATES = [
+        (re.compile(r'/sap/rest/user/name/[^/]+'), '/sap/rest/user/name/{name}'),
+        (re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'),
+         '{guid}'),
+        (re.compile(r'/\d+(?=/|$)'), '/{id}')
+    ]
+
+    # Upper bounds of the latency histogram buckets in seconds
+    LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('n_plus_one_threshold', 20)
+        kwargs.setdefault('latency_reservoir_size', 1024)
+        self.n_plus_one_threshold = kwargs.get('n_plus_one_threshold')
+        self.latency_reservoir_size = kwargs.get('latency_reservoir_size')
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+        # The report phases run one after another, the requests of worker threads
+        # are accounted to the innermost active phase of the main thread
+        self._phases = []
+        self._phase_requests = {}
+        self._phase_runs = {}
+        self.n_plus_one_findings = []
+
+    @classmethod
+    def normalize_path(cls, path):
+        for pattern, placeholder in cls.PATH_TEMPLATES:
+            path = pattern.sub(placeholder, path)
+        return path
+
+    def record(self, endpoint, method, path, http_status, received_bytes, latency):
+        key = (endpoint, method, self.normalize_path(path))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = {'count': 0, 'statuses': {}, 'bytes': 0,
+                          'latency_sum': 0.0, 'latency_max': None,
+                          'buckets': [0] * (len(self.LATENCY_BUCKETS) + 1), 'latencies': []}
+                self._metrics[key] = metric
+            metric['count'] += 1
+            metric['statuses'][str(http_status)] = metric['statuses'].get(str(http_status), 0) + 1
+            metric['bytes'] += received_bytes
+            metric['latency_sum'] += latency
+            metric['latency_max'] = (latency if metric['latency_max'] is None
+                                     else max(metric['latency_max'], latency))
+            metric['buckets'][bisect.bisect_left(self.LATENCY_BUCKETS, latency)] += 1
+            # Reservoir sampling: every latency is kept with the same probability
+            if len(metric['latencies']) < self.latency_reservoir_size:
+                metric['latencies'].append(latency)
+            else:
+                index = random.randrange(metric['count'])
+                if index < self.latency_reservoir_size:
+                    metric['latencies'][index] = latency
+            # Requests sent outside of the reports, e.g., while resolving the target spaces,
+            # are accounted to phase main
+            if self._phases:
+                phase_requests = self._phases[-1][1]
+            else:
+                phase_requests = self._phase_requests.setdefault('main', {})
+                self._phase_runs['main'] = 1
+            phase_key = (method, key[2])
+            phase_requests[phase_key] = phase_requests.get(phase_key, 0) + 1
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        phase_requests = {}
+        with self._lock:
+            self._phases.append((name, phase_requests))
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases.pop()
+                self._phase_runs[name] = self._phase_runs.get(name, 0) + 1
+                totals = self._phase_requests.setdefault(name, {})
+                for phase_key, count in phase_requests.items():
+                    totals[phase_key] = totals.get(phase_key, 0) + count
+            self.check_n_plus_one(name, phase_requests)
+
+    def check_n_plus_one(self, name, phase_requests):
+        # Many requests to the same template within one phase usually mean one request
+        # per entity, where a single request for the whole collection would do
+        if not self.n_plus_one_threshold:
+            return
+        for (method, template), count in phase_requests.items():
+            if count > self.n_plus_one_threshold:
+                self.n_plus_one_findings.append((name, method, template, count))
+                logging.warning((f'Phase {name} sent {count} {method} requests to {template}, '
+                                 f'more than {self.n_plus_one_threshold}. '
+                                 'These are possibly N+1 requests'))
+
+    @property
+    def phase_summary(self):
+        with self._lock:
+            phase_requests = {name: dict(requests) for name, requests in self._phase_requests.items()}
+            phase_runs = dict(self._phase_runs)
+        summary = []
+        for name, requests in phase_requests.items():
+            for (method, template), count in sorted(requests.items(), key=lambda item: -item[1]):
+                summary.append({'phase': name,
+                                'runs': phase_runs.get(name),
+                                'method': method,
+                                'template': template,
+                                'count': count})
+        return summary
+
+    def log_phase_summary(self):
+        summary = self.phase_summary
+        if not summary:
+            return
+        lines = [f'{"Phase":<45} {"Runs":>5} {"Requests":>9}  Template']
+        for row in summary:
+            lines.append((f'{row["phase"]:<45} {row["runs"]:>5} {row["count"]:>9}  '
+                          f'{row["method"]} {row["template"]}'))
+        logging.info('Requests per report phase:\n' + '\n'.join(lines))
+
+    def write_phase_csv(self, file):
+        keys = ['phase', 'runs', 'method', 'template', 'count']
+        with open(file, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=keys)
+            writer.writeheader()
+            writer.writerows(self.phase_summary)
+
+    @staticmethod
+    def get_percentile(sorted_latencies, percentile):
+        # Nearest-rank percentile
+        if not sorted_latencies:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * len(sorted_latencies)))
+        return round(sorted_latencies[rank - 1], 6)
+
+    @property
+    def summary(self):
+        # Rows ordered by the total time spent in the requests, the slowest APIs first
+        with self._lock:
+            metrics = {key: dict(metric, latencies=sorted(metric['latencies']),
+                                 statuses=dict(metric['statuses']),
+                                 buckets=list(metric['buckets']))
+                       for key, metric in self._metrics.items()}
+        summary = []
+        for (endpoint, method, template), metric in metrics.items():
+            latencies = metric['latencies']
+            summary.append({'endpoint': endpoint,
+                            'method': method,
+                            'template': template,
+                            'count': metric['count'],
+                            'statuses': metric['statuses'],
+                            'bytes': metric['bytes'],
+                            'total_seconds': round(metric['latency_sum'], 6),
+                            'p50_seconds': self.get_percentile(latencies, 50),
+                            'p95_seconds': self.get_percentile(latencies, 95),
+                            'p99_seconds': self.get_percentile(latencies, 99),
+                            'max_seconds': (round(metric['latency_max'], 6)
+                                            if metric['latency_max'] is not None
+                                            else None),
+                            'histogram': self.get_histogram(metric['buckets'])})
+        return sorted(summary, key=lambda row: row['total_seconds'], reverse=True)
+
+    @classmethod
+    def get_histogram(cls, buckets):
+        # Cumulative counts of the requests per bucket upper bound, as used by Prometheus
+        histogram = {}
+        count = 0
+        for bucket, bucket_count in zip(cls.LATENCY_BUCKETS, buckets):
+            count += bucket_count
+            histogram[str(bucket)] = count
+        histogram['+Inf'] = sum(buckets)
+        return histogram
+
+    def write_json(self, file):
+        with open(file, 'w', encoding='utf-8') as json_file:
+            json.dump(self.summary, json_file, indent=2)
+
+    def write_csv(self, file):
+        keys = ['endpoint', 'method', 'template', 'count', 'statuses', 'bytes', 'total_seconds',
+                'p50_seconds', 'p95_seconds', 'p99_seconds', 'max_seconds']
+        with open(file, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=keys, extrasaction='ignore')
+            writer.writeheader()
+            for row in self.summary:
+                writer.writerow(dict(row, statuses=json.dumps(row['statuses'])))
+
+    def write_prometheus(self, file):
+        # Text exposition format, e.g., for the textfile collector of the node exporter
+        lines = ['# HELP otter_http_requests_total Number of HTTP requests sent to XS Advanced.',
+                 '# TYPE otter_http_requests_total counter']
+        summary = self.summary
+        for row in summary:
+            for http_status, count in row['statuses'].items():
+                lines.append(('otter_http_requests_total{'
+                              f'{self.get_prometheus_labels(row)},status="{http_status}"'
+                              f'}} {count}'))
+        lines = lines + ['# HELP otter_http_response_bytes_total Bytes received from XS Advanced.',
+                         '# TYPE otter_http_response_bytes_total counter']
+        for row in summary:
+            lines.append((f'otter_http_response_bytes_total{{{self.get_prometheus_labels(row)}}} '
+                          f'{row["bytes"]}'))
+        lines = lines + ['# HELP otter_http_request_duration_seconds Latency of HTTP requests.',
+                         '# TYPE otter_http_request_duration_seconds histogram']
+        for row in summary:
+            labels = self.get_prometheus_labels(row)
+            for bucket, count in row['histogram'].items():
+                lines.append((f'otter_http_request_duration_seconds_bucket{{{labels},le="{bucket}"}} '
+                              f'{count}'))
+            lines.append(f'otter_http_request_duration_seconds_sum{{{labels}}} {row["total_seconds"]}')
+            lines.append(f'otter_http_request_duration_seconds_count{{{labels}}} {row["count"]}')
+        # The textfile collector may read the file at any time, hence it is replaced at once
+        temporary_file = f'{file}.tmp'
+        with open(temporary_file, 'w', encoding='utf-8') as prometheus_file:
+            prometheus_file.write('\n'.join(lines) + '\n')
+        os.replace(temporary_file, file)
+
+    @staticmethod
+    def get_prometheus_labels(row):
+        return (f'endpoint="{row["endpoint"]}",method="{row["method"]}",'
+                f'template="{row["template"]}"')
+
+    def log_slowest(self, count=5):
+        for row in self.summary[:count]:
+            logging.info(('%s %s%s: '
+                          '%s requests, %.3f s in total, '
+                          'p50 %.3f s, p95 %.3f s, '
+                          'p99 %.3f s, %s bytes received'),
+                         row['method'], row['endpoint'], row['template'], row['count'],
+                         row['total_seconds'], row['p50_seconds'], row['p95_seconds'],
+                         row['p99_seconds'], row['bytes'])
+
+
+def request_phase(operation):
+    # Accounts the requests, the spans and the profile of the operation of the Collector
+    # or the Cleaner to the report phase named after the operation
+    @functools.wraps(operation)
+    def run_operation(*args, **kwargs):
+        with tracer.span(operation.__name__, category='report',
+                         arguments=[str(arg) for arg in args[1:]]), \
+             profiler.phase(operation.__name__):
+            request_metrics = args[0].controller.request_metrics
+            if request_metrics is None:
+                return operation(*args, **kwargs)
+            with request_metrics.phase(operation.__name__):
+                return operation(*args, **kwargs)
+    return run_operation
@@ -0,0 +1,129 @@
+import logging
+import threading
+import contextlib
+import cProfile
+import pstats
+import sys
+import tracemalloc
+import time
+import csv
+
+
+class Profiler:
+    # Measures the wall time, the CPU time of the process and the peak of the traced memory
+    # per report phase and profiles the whole run with cProfile.
+    # The threads started during the run, e.g., the workers and the prefetching and hedging pools,
+    # are profiled each by its own profiler, merged with the one of the main thread at the end.
+    # The phases may be nested, the peak memory of a phase covers its nested phases
+
+    def __init__(self):
+        self.enabled = False
+        self._profile = None
+        self._thread_profiles = []
+        self._lock = threading.Lock()
+        self._phases = []
+        self._phase_stats = {}
+
+    def start(self):
+        self.enabled = True
+        tracemalloc.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        threading.setprofile(self.profile_thread)
+
+    def profile_thread(self, frame, event, arg): # pylint: disable=unused-argument
+        # Called once by every new thread, replaced by the profiler of the thread
+        sys.setprofile(None)
+        if not self.enabled:
+            return
+        thread_profile = cProfile.Profile()
+        try:
+            thread_profile.enable()
+        except ValueError:
+            # Python 3.12+ allows a single active profiler, which already covers all threads
+            return
+        with self._lock:
+            self._thread_profiles.append(thread_profile)
+
+    def stop(self):
+        if self.enabled:
+            threading.setprofile(None)
+            self._profile.disable()
+            tracemalloc.stop()
+            self.enabled = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            if self._phases:
+                # The peak reached so far belongs to the enclosing phase
+                self._phases[-1]['peak'] = max(self._phases[-1]['peak'],
+                                               tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            frame = {'peak': 0}
+            self._phases.append(frame)
+        started_at = time.perf_counter()
+        started_cpu_at = time.process_time()
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - started_at
+            cpu_seconds = time.process_time() - started_cpu_at
+            with self._lock:
+                self._phases.pop()
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if self._phases:
+                    self._phases[-1]['peak'] = max(self._phases[-1]['peak'], peak)
+                stats = self._phase_stats.setdefault(name, {'runs': 0,
+                                                            'wall_seconds': 0,
+                                                            'cpu_seconds': 0,
+                                                            'peak_memory_bytes': 0})
+                stats['runs'] += 1
+                stats['wall_seconds'] += wall_seconds
+                stats['cpu_seconds'] += cpu_seconds
+                stats['peak_memory_bytes'] = max(stats['peak_memory_bytes'], peak)
+
+    @property
+    def summary(self):
+        with self._lock:
+            phase_stats = {name: dict(stats) for name, stats in self._phase_stats.items()}
+        return [dict(stats, phase=name,
+                     wall_seconds=round(stats['wall_seconds'], 6),
+                     cpu_seconds=round(stats['cpu_seconds'], 6))
+                for name, stats in sorted(phase_stats.items(),
+                                          key=lambda item: -item[1]['wall_seconds'])]
+
+    def log_summary(self):
+        summary = self.summary
+        if not summary:
+            return
+        lines = [f'{"Phase":<45} {"Runs":>5} {"Wall, s":>9} {"CPU, s":>9} {"Peak, MiB":>10}']
+        for row in summary:
+            lines.append((f'{row["phase"]:<45} {row["runs"]:>5} {row["wall_seconds"]:>9.3f} '
+                          f'{row["cpu_seconds"]:>9.3f} '
+                          f'{row["peak_memory_bytes"] / 1024 / 1024:>10.2f}'))
+        logging.info('Profile per report phase:\n' + '\n'.join(lines))
+
+    def write_csv(self, file):
+        keys = ['phase', 'runs', 'wall_seconds', 'cpu_seconds', 'peak_memory_bytes']
+        with open(file, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=keys)
+            writer.writeheader()
+            writer.writerows(self.summary)
+
+    def write_pstats(self, file):
+        stats = pstats.Stats(self._profile)
+        with self._lock:
+            thread_profiles = list(self._thread_profiles)
+        for thread_profile in thread_profiles:
+            stats.add(thread_profile)
+        stats.dump_stats(str(file))
+        logging.debug('Merged the profiles of the main thread and %s other threads',
+                      len(thread_profiles))
+
+
+# The profiler shared by all components of the run
+profiler = Profiler()
@@ -0,0 +1,43 @@
+import threading
+import time
+from components.tools.deadline import deadline, DeadlineExceeded # pylint: disable=import-error
+
+
+class RateLimiter:
+    # Token bucket shared by all threads sending requests to the same endpoint.
+    # The bucket holds up to burst tokens and is refilled with rate tokens per second,
+    # every request takes one token. A request finding no token reserves the next one
+    # and waits outside of the lock, hence the waiting requests are served in order.
+    # A request that would wait past the deadline of the run gives its token back
+    # and raises DeadlineExceeded instead
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0}
+
+    def acquire(self):
+        deadline.check('acquiring a request token')
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            # A negative balance is the number of tokens reserved by the waiting requests
+            self._tokens = self._tokens - 1
+            wait_seconds = -self._tokens / self.rate if self._tokens < 0 else 0
+            self.stats['acquired'] += 1
+            if wait_seconds:
+                self.stats['waited'] += 1
+                self.stats['wait_seconds'] += wait_seconds
+        if wait_seconds:
+            remaining = deadline.remaining
+            if remaining is not None and wait_seconds >= remaining:
+                with self._lock:
+                    self._tokens = self._tokens + 1
+                raise DeadlineExceeded((f'The run exceeded {deadline.max_runtime} s before '
+                                        f'the request token due in {wait_seconds:.2f} s'))
+            time.sleep(wait_seconds)
+        return wait_seconds
@@ -0,0 +1,103 @@
+import threading
+import functools
+import contextlib
+import itertools
+import time
+import json
+import os
+
+
+class Tracer:
+    # Records nested spans of the lazy loads, HTTP requests and report phases.
+    # The spans are exported in the Chrome trace event format, which is opened
+    # by chrome://tracing and Perfetto. Without enabling the tracer the spans cost nothing
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events = []
+        self._thread_names = {}
+        self._local = threading.local()
+        self._span_ids = itertools.count(1)
+        self._started_at = time.perf_counter()
+
+    def enable(self):
+        self._started_at = time.perf_counter()
+        self.enabled = True
+
+    @property
+    def current_span_id(self):
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else getattr(self._local, 'parent_id', None)
+
+    @contextlib.contextmanager
+    def span(self, name, category='otter', **kwargs):
+        if not self.enabled:
+            yield
+            return
+        span_id = next(self._span_ids)
+        parent_id = self.current_span_id
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        self._local.stack.append(span_id)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished_at = time.perf_counter()
+            self._local.stack.pop()
+            thread = threading.current_thread()
+            event = {'name': name,
+                     'cat': category,
+                     'ph': 'X',
+                     'ts': round((started_at - self._started_at) * 1000000, 1),
+                     'dur': round((finished_at - started_at) * 1000000, 1),
+                     'pid': os.getpid(),
+                     'tid': thread.ident,
+                     'args': dict(kwargs, span_id=span_id, parent_id=parent_id)}
+            with self._lock:
+                self._events.append(event)
+                self._thread_names[thread.ident] = thread.name
+
+    def counter(self, name, **values):
+        # Counter events are drawn as a graph of the values over the run
+        if not self.enabled:
+            return
+        event = {'name': name,
+                 'ph': 'C',
+                 'ts': round((time.perf_counter() - self._started_at) * 1000000, 1),
+                 'pid': os.getpid(),
+                 'args': values}
+        with self._lock:
+            self._events.append(event)
+
+    def bind_parent(self, function):
+        # The spans of worker threads become children of the span submitting the work
+        if not self.enabled:
+            return function
+        parent_id = self.current_span_id
+
+        @functools.wraps(function)
+        def run_with_parent(*args, **kwargs):
+            self._local.parent_id = parent_id
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._local.parent_id = None
+        return run_with_parent
+
+    def write(self, file):
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                     'args': {'name': thread_name}}
+                    for tid, thread_name in thread_names.items()]
+        with open(file, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, trace_file,
+                      default=str)
+        return len(events)
+
+
+# The tracer shared by all components of the run
+tracer = Tracer()
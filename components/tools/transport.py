@@ -0,0 +1,150 @@
+import logging
+import threading
+import random
+import time
+import re
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+from components.tools.tracing import tracer # pylint: disable=import-error
+from components.tools.deadline import deadline, DeadlineExceeded # pylint: disable=import-error
+
+
+class TransportPolicy:
+    # Retries and hedging of the requests sent by the sessions.
+    # Only the requests of the idempotent methods listed in retry_methods are retried,
+    # after a connection error, a timeout or a response with one of retry_statuses.
+    # The retries wait with the exponential backoff and the full jitter, a Retry-After header
+    # of the response has priority. Each wait is bounded by max_backoff_seconds, a retry
+    # not possible before the deadline of the run raises DeadlineExceeded at once.
+    # A GET request not answered within hedge_after_seconds is sent once more,
+    # the first successful response is used.
+    # The settings of the first path pattern of endpoints matching the path override the defaults
+
+    SETTINGS = ['max_attempts', 'backoff_seconds', 'max_backoff_seconds',
+                'retry_statuses', 'retry_methods', 'hedge_after_seconds']
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_attempts', 3)
+        kwargs.setdefault('backoff_seconds', 0.5)
+        kwargs.setdefault('max_backoff_seconds', 30)
+        kwargs.setdefault('retry_statuses', [429, 502, 503, 504])
+        kwargs.setdefault('retry_methods', ['GET'])
+        kwargs.setdefault('hedge_after_seconds', None)
+        kwargs.setdefault('endpoints', {})
+        kwargs.setdefault('max_workers', 8)
+
+        self.defaults = {setting: kwargs.get(setting) for setting in self.SETTINGS}
+        self.endpoint_policies = [(re.compile(pattern), dict(self.defaults, **(settings or {})))
+                                  for pattern, settings in kwargs.get('endpoints').items()]
+        self.stats = {'retried': 0, 'hedged': 0, 'hedges_won': 0}
+        self._lock = threading.Lock()
+        # The hedged requests are sent by a dedicated pool, created on first use
+        self.max_workers = kwargs.get('max_workers')
+        self._executor = None
+
+    def get_policy(self, path):
+        return next((policy for pattern, policy in self.endpoint_policies
+                     if pattern.search(path)), self.defaults)
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def get_retry_after(raw_response):
+        # Retry-After holds either the number of seconds or an HTTP date
+        retry_after = raw_response.headers.get('Retry-After') if raw_response is not None else None
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    @staticmethod
+    def get_backoff(policy, attempt):
+        # Full jitter: a random wait up to the exponentially growing limit
+        limit = min(policy.get('max_backoff_seconds'),
+                    policy.get('backoff_seconds') * 2 ** (attempt - 1))
+        return random.uniform(0, limit)
+
+    def send(self, method, path, send_request):
+        # Sends the request by send_request(), retrying and hedging it as defined for the path
+        policy = self.get_policy(path)
+        retried = method in policy.get('retry_methods')
+        max_attempts = max(1, policy.get('max_attempts')) if retried else 1
+        attempt = 1
+        while True:
+            raw_response = None
+            try:
+                if method == 'GET' and policy.get('hedge_after_seconds') is not None:
+                    raw_response = self.send_hedged(policy, send_request)
+                else:
+                    raw_response = send_request()
+            except (requests.ConnectionError, requests.Timeout) as e: # pylint: disable=invalid-name
+                if attempt >= max_attempts:
+                    raise
+                reason = type(e).__name__
+            else:
+                if (attempt >= max_attempts
+                        or raw_response.status_code not in policy.get('retry_statuses')):
+                    return raw_response
+                reason = f'HTTP {raw_response.status_code}'
+            retry_after = self.get_retry_after(raw_response)
+            if raw_response is not None:
+                # Releases the connection of a streamed response
+                raw_response.close()
+            wait_seconds = (min(retry_after, policy.get('max_backoff_seconds'))
+                            if retry_after is not None
+                            else self.get_backoff(policy, attempt))
+            remaining = deadline.remaining
+            if remaining is not None and wait_seconds >= remaining:
+                raise DeadlineExceeded((f'The run exceeded {deadline.max_runtime} s before '
+                                        f'the retry of HTTP {method} {path} '
+                                        f'in {wait_seconds:.2f} s'))
+            logging.warning(('HTTP %s %s failed with %s, attempt %s '
+                             'of %s. Retrying in %.2f s'),
+                            method, path, reason, attempt, max_attempts, wait_seconds)
+            self.count('retried')
+            time.sleep(wait_seconds)
+            attempt = attempt + 1
+
+    def send_hedged(self, policy, send_request):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='hedge')
+        send_request = tracer.bind_parent(send_request)
+        primary = self._executor.submit(send_request)
+        done, _ = wait([primary], timeout=policy.get('hedge_after_seconds'))
+        if done:
+            return primary.result()
+        self.count('hedged')
+        hedge = self._executor.submit(send_request)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # A failed request is ignored as long as the other one may still succeed
+            succeeded = [request for request in done if request.exception() is None]
+            if succeeded or not pending:
+                result = succeeded[0] if succeeded else next(iter(done))
+                if result is hedge and succeeded:
+                    self.count('hedges_won')
+                # The slower request is not cancelled, its response is dropped once received
+                for request in (done | pending) - {result}:
+                    request.add_done_callback(self.close_response)
+                return result.result()
+
+    @staticmethod
+    def close_response(request):
+        # Releases the connection of a dropped, e.g., streamed response
+        if request.exception() is None:
+            request.result().close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
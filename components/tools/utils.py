@@ -1,4 +1,10 @@
+import sys
+import functools
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from components.tools.tracing import tracer # pylint: disable=import-error
+from components.tools.deadline import deadline, DeadlineExceeded # pylint: disable=import-error
 
 def epoch_to_datetime(epoch_ms_time):
     timestamp = float(epoch_ms_time) / 1000.0
@@ -6,3 +12,75 @@ def epoch_to_datetime(epoch_ms_time):
 
 def format_datetime_ms(ms_datetime):
     return ms_datetime.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def intern_string(value):
+    # Low-cardinality values, e.g., states, buildpacks or plan names,
+    # are shared between all entities instead of being stored per entity
+    return sys.intern(value) if isinstance(value, str) else value
+
+class EpochDatetime:
+    # Keeps a timestamp as int epoch milliseconds in the given slot
+    # and renders it as datetime only when it is accessed
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        epoch_ms_time = getattr(instance, self.slot)
+        return epoch_to_datetime(epoch_ms_time) if epoch_ms_time is not None else None
+
+    def __set__(self, instance, value):
+        if isinstance(value, datetime):
+            value = int(value.timestamp() * 1000)
+        setattr(instance, self.slot, int(float(value)) if value else None)
+
+def map_concurrently(function, items, max_workers):
+    # The results are returned in the order of the given items.
+    # The first exception raised by the function is propagated to the caller
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        try:
+            return list(executor.map(tracer.bind_parent(function), items))
+        except DeadlineExceeded:
+            # The items not started yet are dropped once the run is out of time
+            executor.shutdown(cancel_futures=True)
+            raise
+
+# Guards the creation of the lazy load locks of all instances
+_load_locks_guard = threading.Lock()
+
+def get_load_lock(instance, attribute):
+    # The reentrant lock guarding the lazy load of the given attribute of the instance.
+    # The locks are created on first use and kept in attribute _load_locks of the instance
+    load_locks = getattr(instance, '_load_locks', None)
+    lock = load_locks.get(attribute) if load_locks is not None else None
+    if lock is None:
+        with _load_locks_guard:
+            load_locks = getattr(instance, '_load_locks', None)
+            if load_locks is None:
+                load_locks = {}
+                instance._load_locks = load_locks # pylint: disable=protected-access
+            lock = load_locks.setdefault(attribute, threading.RLock())
+    return lock
+
+def load_once(attribute):
+    # Makes the lazy getter of the given attribute safe for parallel callers.
+    # A loaded value is returned without locking. Otherwise the first caller loads it
+    # while the other callers of the same attribute wait for it and reuse the result
+    def decorator(getter):
+        @functools.wraps(getter)
+        def wrapper(instance):
+            if getattr(instance, attribute):
+                return getter(instance)
+            deadline.check(f'loading {type(instance).__name__}.{getter.__name__}')
+            with tracer.span(f'{type(instance).__name__}.{getter.__name__}', category='load',
+                             guid=getattr(instance, 'guid', None)):
+                with get_load_lock(instance, attribute):
+                    return getter(instance)
+        return wrapper
+    return decorator
@@ -6,6 +6,15 @@ from components.tools.cleaner import Cleaner
 from components.tools.client import Client
 from components.controller.controller import Controller
 from components.tools.collector import Collector
+from components.tools.cache import HanaMetadataCache, ResponseCache
+from components.tools.metrics import RequestMetrics
+from components.tools.tracing import tracer
+from components.tools.profiler import profiler
+from components.tools.transport import TransportPolicy
+from components.tools.ratelimit import RateLimiter
+from components.tools.concurrency import ConcurrencyLimiter
+from components.tools.deadline import deadline, DeadlineExceeded
+from components.tools.logs import SamplingFilter, QueueLogging, create_file_handler
 
 with open("./config.yaml", 'r', encoding='utf-8') as config_stream:
     try:
@@ -16,15 +25,32 @@ with open("./config.yaml", 'r', encoding='utf-8') as config_stream:
         sys.exit(1)
 
 log_file = client.resolve_file('logs', 'run.log')
-file_handler = logging.FileHandler(filename=log_file)
+log_writer_config = client.get_log_writer_config()
+file_handler = create_file_handler(log_file, **log_writer_config)
 stdout_handler = logging.StreamHandler(sys.stdout)
 handlers = [file_handler, stdout_handler]
+log_formatter = logging.Formatter(
+    fmt='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+    datefmt='%m/%d/%Y %I:%M:%S %p')
+for handler in handlers:
+    handler.setFormatter(log_formatter)
+
+# The collecting threads only queue the log records, a background thread writes them
+if log_writer_config.get('asynchronous'):
+    queue_logging = QueueLogging(handlers, **log_writer_config)
+    queue_logging.start()
+    handlers = [queue_logging.queue_handler]
+
+log_sample_rate = client.get_log_sample_rate()
+if log_sample_rate < 1:
+    # Sampled records are dropped before they are queued or written.
+    # Every handler counts the records on its own, hence all handlers keep the same records
+    for handler in handlers:
+        handler.addFilter(SamplingFilter(log_sample_rate))
 target_level = client.get_configured_logging_level()
 
 logging.basicConfig(
     level=target_level,
-    format='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
-    datefmt='%m/%d/%Y %I:%M:%S %p',
     handlers=handlers
 )
 
@@ -56,6 +82,15 @@ argparser.add_argument('-app', '--application', action='store',
 argparser.add_argument('-exclist', '--exclusion-list-name', action='store',
                        dest='exclist', help='List of the excluded objects from config.yaml')
 
+#
+# Diagnostics of the run
+#
+argparser.add_argument('-prof', '--profile', action='store_true',
+                       help='Store the wall time, CPU time and peak memory per report and a cProfile file of the run')
+
+argparser.add_argument('-maxrt', '--max-runtime', action='store', type=int, dest='max_runtime',
+                       help='Stop the run after the given number of seconds, keeping the finished reports')
+
 #
 # System-wide reports, not dependent on the provided organization and space
 #
@@ -74,6 +109,9 @@ argparser.add_argument('-rsra', '--report-space-roles-assignment', action='store
 argparser.add_argument('-rrca', '--report-role-collections-assignment', action='store_true',
                        help='[REPORT] Store information about Role Collections assigned to users in a CSV file')
 
+argparser.add_argument('-rlca', '--report-landscape-crashing-apps', action='store_true',
+                       help='[REPORT] Store information about continuously crashing applications in all organizations in CSV files')
+
 #
 # Selective reports, dependent on the provided organization and space
 #
@@ -119,114 +157,231 @@ args = argparser.parse_args()
 logging.info(
     f'Working with XS Advanced Controller Endpoint: {args.api} and user {args.username}')
 
-controller = Controller(args.api, args.username, args.password)
-collector = Collector(controller, client)
-cleaner = Cleaner(controller, collector, client)
-
-#
-# System-wide commands, not dependent on the provided organization and space
-#
-
-if args.report_databases:
-    logging.info(
-        'Storing general information about database tenants in a CSV file')
-    collector.store_databases()
-
-if args.report_invalid_instances:
-    logging.info(
-        'Storing information about inconsistent HANA service instances known by HANA Broker in a CSV file')
-    collector.store_invalid_instances()
-
-if args.report_org_roles_assignment:
-    logging.info(
-        'Storing information about Organization roles (OrgManager, OrgAuditor) assigned to users in a CSV file')
-    collector.store_org_roles_assignment()
-
-if args.report_space_roles_assignment:
-    logging.info(
-        'Storing information about Space roles (SpaceManager, SpaceAuditor, SpaceDeveloper) assigned to users in a CSV file')
-    collector.store_space_roles_assignment()
-
-if args.report_role_collections_assignment:
-    logging.info(
-        'Storing information about Role Collections assigned to users in a CSV file')
-    collector.store_role_collections_assignment()
+# The deadline covers the whole run, including the authentication
+if args.max_runtime:
+    deadline.start(args.max_runtime)
+
+if client.get_tracing_status():
+    tracer.enable()
+
+if args.profile:
+    profiler.start()
+
+hana_metadata_cache_file = client.get_hana_metadata_cache_file()
+hana_metadata_cache = HanaMetadataCache(hana_metadata_cache_file) if hana_metadata_cache_file else None
+
+response_cache_config = client.get_response_cache_config()
+response_cache = ResponseCache(**response_cache_config) if response_cache_config else None
+
+request_metrics = (RequestMetrics(n_plus_one_threshold=client.get_n_plus_one_threshold())
+                   if client.get_request_metrics_status()
+                   else None)
+
+transport_config = client.get_transport_config()
+transport_policy = TransportPolicy(**transport_config) if transport_config is not None else None
+
+# The limiters are shared by all threads sending requests to the same endpoint
+rate_limiters = {name: RateLimiter(**rate_limit)
+                 for name, rate_limit in client.get_rate_limits().items()}
+
+adaptive_concurrency_config = client.get_adaptive_concurrency_config()
+concurrency_limiters = ({name: ConcurrencyLimiter(name, **adaptive_concurrency_config)
+                         for name in ['controller', 'uaa', 'hana_broker']}
+                        if adaptive_concurrency_config
+                        else {})
+
+# Once the deadline interrupts the commands outside of the bound operations, e.g., while looking up
+# the organization, the remaining commands are skipped. The manifest is stored in any case
+controller = None
+try:
+    controller = Controller(args.api, args.username, args.password,
+                            max_workers=client.get_worker_count(),
+                            hana_metadata_cache=hana_metadata_cache,
+                            memory_lean=client.get_memory_lean(),
+                            response_cache=response_cache,
+                            session_config=client.get_session_config(),
+                            request_metrics=request_metrics,
+                            transport_policy=transport_policy,
+                            rate_limiters=rate_limiters,
+                            concurrency_limiters=concurrency_limiters)
+    collector = Collector(controller, client)
+    cleaner = Cleaner(controller, collector, client)
+
+    #
+    # System-wide commands, not dependent on the provided organization and space
+    #
+
+    if args.report_databases:
+        logging.info(
+            'Storing general information about database tenants in a CSV file')
+        collector.store_databases()
+
+    if args.report_invalid_instances:
+        logging.info(
+            'Storing information about inconsistent HANA service instances known by HANA Broker in a CSV file')
+        collector.store_invalid_instances()
+
+    if args.report_org_roles_assignment:
+        logging.info(
+            'Storing information about Organization roles (OrgManager, OrgAuditor) assigned to users in a CSV file')
+        collector.store_org_roles_assignment()
+
+    if args.report_space_roles_assignment:
+        logging.info(
+            'Storing information about Space roles (SpaceManager, SpaceAuditor, SpaceDeveloper) assigned to users in a CSV file')
+        collector.store_space_roles_assignment()
+
+    if args.report_role_collections_assignment:
+        logging.info(
+            'Storing information about Role Collections assigned to users in a CSV file')
+        collector.store_role_collections_assignment()
+
+    if args.report_landscape_crashing_apps:
+        logging.info(
+            'Storing information about continuously crashing applications in all organizations in CSV files')
+        collector.store_scanned_continuously_crashing_apps()
+
+    #
+    # Selective commands, dependent on the provided organization and space
+    #
+
+    if (args.report_application_instances or
+         args.report_service_instances or
+         args.report_user_provided_service_instances or
+         args.report_service_keys or
+         args.report_crashing_apps or
+         args.report_non_mta_objects):
+
+        org_space_guids = collector.get_target_org_space_guids_by_name(args.org, space_name=args.space)
+
+        # Load the monitoring data of all applications in the organization at once
+        if ((args.report_application_instances or
+             args.report_non_mta_objects) and not args.space):
+            controller.monitoring_loader.load_org(controller.get_org_by_name(args.org))
+
+        # Scan all spaces of the organization at once for continuously crashing applications
+        if args.report_crashing_apps and not args.space:
+            logging.info('Storing information about continuously crashing applications in CSV files')
+            collector.store_scanned_continuously_crashing_apps(
+                org_guid=controller.get_org_by_name(args.org).guid)
+
+        for couple in org_space_guids:
+            org_guid, space_guid = couple
+            org = controller.get_org_by_guid(org_guid)
+            space = org.get_space_by_guid(space_guid)
+            logging.info(f'Working with organization {org.name} / {org_guid} and space {space.name} / {space_guid}')
+
+            if args.report_application_instances:
+                logging.info('Storing detailed information about applications in a CSV file')
+                collector.store_applications(org_guid, space_guid)
+
+            if args.report_service_instances:
+                logging.info('Storing detailed information about service instances in a CSV file')
+                collector.store_service_instances(org_guid, space_guid)
+
+            if args.report_user_provided_service_instances:
+                logging.info('Storing detailed information about user-provided service instances in a CSV file')
+                collector.store_ups_service_instances(org_guid, space_guid)
+
+            if args.report_service_keys:
+                logging.info('Storing information about service instances and keys in a CSV file')
+                collector.store_service_instance_keys(org_guid, space_guid)
+
+            if args.report_crashing_apps and args.space:
+                logging.info('Storing information about continuously crashing applications in a CSV file')
+                collector.store_continuously_crashing_apps(org_guid, space_guid)
+
+            if args.report_non_mta_objects:
+                logging.info('Storing information about applications and service instances, having no MTA information, in a CSV file')
+                collector.store_non_mta_apps_service_instances(org_guid, space_guid)
+
+
+    if args.report_parsed_app_log:
+        org_space_app_guids = collector.get_target_org_space_app_guids_by_name(args.org, space_name=args.space, app_name=args.app)
+
+        for triple in org_space_app_guids:
+            org_guid, space_guid, app_guid = triple
+            org = controller.get_org_by_guid(org_guid)
+            space = org.get_space_by_guid(space_guid)
+            app = space.get_app_by_guid(app_guid)
+
+            logging.info(f'Storing the router log of application {app.name} / {app_guid} from org {org.name} / {org_guid} and space {space.name} / {space_guid}')
+            collector.store_app_router_log(org_guid, space_guid, app_guid)
+
+    #
+    # Selective operations, dependent on the provided organization and space
+    #
+
+    if (args.stop_crashing_apps or
+         args.delete_stopped_crashed_app_instances or
+         args.delete_non_mta_apps_and_service_instances):
+
+        org_space_guids = collector.get_target_org_space_guids_by_name(args.org, space_name=args.space)
+        for couple in org_space_guids:
+            org_guid, space_guid = couple
+            org = controller.get_org_by_guid(org_guid)
+            space = org.get_space_by_guid(space_guid)
+            logging.info(f'Working with organization {org.name} / {org_guid} and space {space.name} / {space_guid}')
+
+            if args.stop_crashing_apps:
+                cleaner.stop_continuously_crashing_apps(org_guid, space_guid, exclusion_list_name=args.exclist)
+
+            if args.delete_stopped_crashed_app_instances:
+                cleaner.delete_app_instances_by_state(org_guid, space_guid, exclusion_list_name=args.exclist, target_states=['STOPPED', 'CRASHED'])
+
+            if args.delete_non_mta_apps_and_service_instances:
+                cleaner.delete_non_mta_app_service_instances(org_guid, space_guid, exclusion_list_name=args.exclist)
+except DeadlineExceeded as e: # pylint: disable=invalid-name
+    logging.warning('Stopped the run: %s', e)
+    deadline.record('skipped', 'run', [], reason=str(e))
+finally:
+    # The persistent caches are closed once no command uses them anymore
+    if hana_metadata_cache is not None:
+        hana_metadata_cache.close()
+    if response_cache is not None:
+        response_cache.close()
+    if deadline.max_runtime:
+        manifest_file = client.resolve_file('', 'manifest.json')
+        deadline.write_manifest(manifest_file)
+        if deadline.skipped:
+            logging.warning(('The run exceeded the maximum runtime of %s s. '
+                             '%s operations are skipped, see %s'),
+                            deadline.max_runtime, len(deadline.skipped), manifest_file)
 
 #
-# Selective commands, dependent on the provided organization and space
+# Statistics of the requests sent during the run
 #
 
-if (args.report_application_instances or
-     args.report_service_instances or
-     args.report_user_provided_service_instances or
-     args.report_service_keys or
-     args.report_crashing_apps or
-     args.report_non_mta_objects):
-
-    org_space_guids = collector.get_target_org_space_guids_by_name(args.org, space_name=args.space)
-    for couple in org_space_guids:
-        org_guid, space_guid = couple
-        org = controller.get_org_by_guid(org_guid)
-        space = org.get_space_by_guid(space_guid)
-        logging.info(f'Working with organization {org.name} / {org_guid} and space {space.name} / {space_guid}')
-
-        if args.report_application_instances:
-            logging.info('Storing detailed information about applications in a CSV file')
-            collector.store_applications(org_guid, space_guid)
-
-        if args.report_service_instances:
-            logging.info('Storing detailed information about service instances in a CSV file')
-            collector.store_service_instances(org_guid, space_guid)
-        
-        if args.report_user_provided_service_instances:
-            logging.info('Storing detailed information about user-provided service instances in a CSV file')
-            collector.store_ups_service_instances(org_guid, space_guid)
-
-        if args.report_service_keys:
-            logging.info('Storing information about service instances and keys in a CSV file')
-            collector.store_service_instance_keys(org_guid, space_guid)
-
-        if args.report_crashing_apps:
-            logging.info('Storing information about continuously crashing applications in a CSV file')
-            collector.store_continuously_crashing_apps(org_guid, space_guid)
-
-        if args.report_non_mta_objects:
-            logging.info('Storing information about applications and service instances, having no MTA information, in a CSV file')
-            collector.store_non_mta_apps_service_instances(org_guid, space_guid)
-
-
-if args.report_parsed_app_log:
-    org_space_app_guids = collector.get_target_org_space_app_guids_by_name(args.org, space_name=args.space, app_name=args.app)
-
-    for triple in org_space_app_guids:
-        org_guid, space_guid, app_guid = triple
-        org = controller.get_org_by_guid(org_guid)
-        space = org.get_space_by_guid(space_guid)
-        app = space.get_app_by_guid(app_guid)
-
-        logging.info(f'Storing the router log of application {app.name} / {app_guid} from org {org.name} / {org_guid} and space {space.name} / {space_guid}')
-        collector.store_app_router_log(org_guid, space_guid, app_guid)
-
-#
-# Selective operations, dependent on the provided organization and space
-#
-
-if (args.stop_crashing_apps or
-     args.delete_stopped_crashed_app_instances or
-     args.delete_non_mta_apps_and_service_instances):
-
-    org_space_guids = collector.get_target_org_space_guids_by_name(args.org, space_name=args.space)
-    for couple in org_space_guids:
-        org_guid, space_guid = couple
-        org = controller.get_org_by_guid(org_guid)
-        space = org.get_space_by_guid(space_guid)
-        logging.info(f'Working with organization {org.name} / {org_guid} and space {space.name} / {space_guid}')
-
-        if args.stop_crashing_apps:
-            cleaner.stop_continuously_crashing_apps(org_guid, space_guid, exclusion_list_name=args.exclist)
-
-        if args.delete_stopped_crashed_app_instances:
-            cleaner.delete_app_instances_by_state(org_guid, space_guid, exclusion_list_name=args.exclist, target_states=['STOPPED', 'CRASHED'])
-
-        if args.delete_non_mta_apps_and_service_instances:
-            cleaner.delete_non_mta_app_service_instances(org_guid, space_guid, exclusion_list_name=args.exclist)
\ No newline at end of file
+if controller is not None:
+    controller.log_request_statistics()
+
+if request_metrics:
+    logging.info('Storing the request metrics per endpoint in JSON and CSV files')
+    request_metrics.write_json(client.resolve_file('metrics', 'request_metrics.json'))
+    request_metrics.write_csv(client.resolve_file('metrics', 'request_metrics.csv'))
+    request_metrics.write_phase_csv(client.resolve_file('metrics', 'request_phases.csv'))
+    prometheus_textfile = client.get_prometheus_textfile()
+    if prometheus_textfile:
+        request_metrics.write_prometheus(prometheus_textfile)
+    if concurrency_limiters:
+        ConcurrencyLimiter.write_csv(client.resolve_file('metrics', 'concurrency_limits.csv'),
+                                     concurrency_limiters.values())
+    logging.info('The slowest endpoints of the run:')
+    request_metrics.log_slowest()
+    request_metrics.log_phase_summary()
+
+if tracer.enabled:
+    trace_file = client.resolve_file('metrics', 'trace.json')
+    span_count = tracer.write(trace_file)
+    logging.info(f'Stored {span_count} tracing spans in {trace_file}, open it in chrome://tracing or Perfetto')
+
+if args.profile:
+    profiler.stop()
+    pstats_file = client.resolve_file('profile', 'run.pstats')
+    profiler.write_pstats(pstats_file)
+    profiler.write_csv(client.resolve_file('profile', 'phases.csv'))
+    profiler.log_summary()
+    logging.info(f'Stored the profile of the run in {pstats_file}')
+
+if log_sample_rate < 1:
+    logging.info(f'Dropped {handlers[0].filters[0].dropped_count} repeated DEBUG records by sampling')
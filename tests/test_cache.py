@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.cache import ResponseCache
+from components.controller.session import ControllerSession
+from components.controller.service import UserProvidedServiceInstance
+
+
+SPACE_CONTENT = {'userProvidedServiceInstances': [
+    {'metadata': {'guid': 'ups-1', 'created_at': 1600000000000, 'updated_at': None},
+     'userProvidedServiceInstanceEntity': {
+         'name': 'ups',
+         'credentials': {'user': 'admin', 'password': 'secret', 'schema': 'S'}}}]}
+ORGANIZATIONS = {'organizations': [{'metadata': {'guid': 'org-1'}, 'name': 'coe'}]}
+
+
+class FakeSession:
+    # The GET of ControllerSession without the transport, the responses are given by path
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, response_cache, responses):
+        self.endpoint = 'https://xsa'
+        self.response_cache = response_cache
+        self.response_cache_scope = 'user'
+        self.responses = responses
+        self.sent = []
+
+    @ControllerSession.cached
+    def get(self, path, **kwargs): # pylint: disable=unused-argument
+        self.sent.append(path)
+        return {'response_body': self.responses[path],
+                'response_headers': {},
+                'http_status': 200}
+
+
+def ups_rows(response):
+    org = SimpleNamespace(guid='org-1', name='coe')
+    controller = SimpleNamespace(controller_session=None, memory_lean=False)
+    space = SimpleNamespace(guid='space-1', name='dev', org=org, controller=controller)
+    return [UserProvidedServiceInstance(space, raw_data).representation
+            for raw_data in response['response_body']['userProvidedServiceInstances']]
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file = os.path.join(directory.name, 'responses.sqlite')
+        self.cache = ResponseCache(self.file, {'.*': 300})
+        self.addCleanup(self.cache.close)
+        self.session = FakeSession(self.cache, {'/v2/spaces/space-1/content': SPACE_CONTENT,
+                                                '/v2/organizations': ORGANIZATIONS})
+
+    def test_cache_hit_equals_cache_miss(self):
+        first = self.session.get('/v2/organizations')
+        second = self.session.get('/v2/organizations')
+        self.assertEqual(self.session.sent, ['/v2/organizations'])
+        self.assertEqual(second['response_body'], first['response_body'])
+
+    def test_reports_of_space_content_are_unchanged(self):
+        first = self.session.get('/v2/spaces/space-1/content')
+        second = self.session.get('/v2/spaces/space-1/content')
+        self.assertEqual(ups_rows(second), ups_rows(first))
+        self.assertEqual(ups_rows(second)[0][-1]['password'], 'secret')
+        # The content with credentials is requested each time
+        self.assertEqual(self.session.sent, ['/v2/spaces/space-1/content'] * 2)
+
+    def test_responses_with_credentials_are_not_stored(self):
+        self.session.responses['/v2/organizations'] = SPACE_CONTENT
+        self.session.get('/v2/organizations')
+        self.session.get('/v2/spaces/space-1/content')
+        self.assertEqual(self.cache.stats['stored'], 0)
+        with open(self.file, 'rb') as file:
+            self.assertNotIn(b'secret', file.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools import deadline as deadline_module
+from components.tools.deadline import Deadline, DeadlineExceeded, deadline_bound
+
+
+class FakeClock:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Entity:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, guid):
+        self.guid = guid
+
+
+class FakeCollector:
+    # Bound operations calling each other like the reports of the Collector
+
+    def __init__(self, clock, runtime_per_space):
+        self.clock = clock
+        self.runtime_per_space = runtime_per_space
+        self.stored_spaces = []
+
+    @deadline_bound()
+    def store_space(self, space):
+        self.clock.now += self.runtime_per_space
+        self.stored_spaces.append(space.guid)
+
+    @deadline_bound(skipped_result=list)
+    def store_org(self, org, spaces):
+        for space in spaces:
+            self.store_space(space)
+        return self.stored_spaces
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.deadline = Deadline()
+        patches = [mock.patch.object(deadline_module, 'time', self.clock),
+                   mock.patch.object(deadline_module, 'deadline', self.deadline)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_without_max_runtime(self):
+        self.deadline.start(None)
+        self.assertIsNone(self.deadline.remaining)
+        self.assertFalse(self.deadline.expired)
+        self.deadline.check('anything')
+        self.assertEqual(self.deadline.cap_timeout((5, 30)), (5, 30))
+
+    def test_check_and_timeouts(self):
+        self.deadline.start(10)
+        self.clock.now += 4
+        self.assertEqual(self.deadline.remaining, 6)
+        self.assertEqual(self.deadline.cap_timeout((5, 30)), (5, 6))
+        self.assertEqual(self.deadline.cap_timeout(None), (6, 6))
+        self.clock.now += 6
+        with self.assertRaises(DeadlineExceeded):
+            self.deadline.check('loading')
+
+    def test_completed_operations_are_recorded(self):
+        self.deadline.start(10)
+        collector = FakeCollector(self.clock, runtime_per_space=1)
+        self.assertEqual(collector.store_org(Entity('org'), [Entity('s1'), Entity('s2')]),
+                         ['s1', 's2'])
+        # Only the outermost operation is listed
+        self.assertEqual([(entry['operation'], entry['arguments'][0])
+                          for entry in self.deadline.completed], [('store_org', 'org')])
+        self.assertEqual(self.deadline.skipped, [])
+
+    def test_nested_operations_pass_to_outermost(self):
+        self.deadline.start(10)
+        collector = FakeCollector(self.clock, runtime_per_space=6)
+        with self.assertLogs(level='WARNING'):
+            result = collector.store_org(Entity('org'), [Entity('s1'), Entity('s2'), Entity('s3')])
+        self.assertEqual(result, [])
+        self.assertEqual(collector.stored_spaces, ['s1', 's2'])
+        self.assertEqual(self.deadline.completed, [])
+        skipped, = self.deadline.skipped
+        self.assertEqual(skipped['operation'], 'store_org')
+        self.assertIn('before store_space', skipped['reason'])
+
+    def test_operations_after_deadline_are_skipped(self):
+        self.deadline.start(10)
+        collector = FakeCollector(self.clock, runtime_per_space=1)
+        collector.store_space(Entity('s1'))
+        self.clock.now += 10
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(collector.store_space(Entity('s2')))
+        self.assertEqual([entry['arguments'] for entry in self.deadline.completed], [['s1']])
+        self.assertEqual([entry['arguments'] for entry in self.deadline.skipped], [['s2']])
+
+    def test_manifest(self):
+        self.deadline.start(10)
+        collector = FakeCollector(self.clock, runtime_per_space=6)
+        collector.store_space(Entity('s1'))
+        with self.assertLogs(level='WARNING'):
+            collector.store_space(Entity('s2'))
+            collector.store_space(Entity('s3'))
+        with tempfile.TemporaryDirectory() as directory:
+            manifest_file = os.path.join(directory, 'manifest.json')
+            self.deadline.write_manifest(manifest_file)
+            with open(manifest_file, encoding='utf-8') as file:
+                manifest = json.load(file)
+        self.assertEqual(manifest['max_runtime_seconds'], 10)
+        self.assertTrue(manifest['expired'])
+        self.assertEqual(manifest['completed'], [{'operation': 'store_space',
+                                                  'arguments': ['s1']},
+                                                 {'operation': 'store_space',
+                                                  'arguments': ['s2']}])
+        self.assertEqual([entry['arguments'] for entry in manifest['skipped']], [['s3']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.decoders import JsonArrayStream
+
+
+def decode(chunks):
+    return {key: list(items) for key, items in JsonArrayStream(chunks).members()}
+
+
+class JsonArrayStreamTest(unittest.TestCase):
+
+    def test_number_split_after_decimal_point(self):
+        self.assertEqual(decode([b'{"a": [1, 2.', b'5, 3]}']), {'a': [1, 2.5, 3]})
+
+    def test_number_split_in_exponent(self):
+        self.assertEqual(decode([b'{"a": [1e', b'-', b'2]}']), {'a': [0.01]})
+
+    def test_every_chunk_boundary(self):
+        document = {'meta': {'next_url': None},
+                    'users': [{'guid': f'user-{i}', 'name': 'ü€' * (i % 3),
+                               'size': 12.5 * i, 'ratio': -1.25e-3 * i,
+                               'count': 10 ** 20 + i, 'active': i % 2 == 0, 'origin': None}
+                              for i in range(20)],
+                    'empty': [],
+                    'total': 20}
+        for indent in (None, 1):
+            data = json.dumps(document, ensure_ascii=False, indent=indent).encode('utf-8')
+            for chunk_size in (1, 2, 3, 5, 7, 64):
+                chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+                stream = JsonArrayStream(chunks)
+                members = {key: list(items) for key, items in stream.members()}
+                self.assertEqual(members, {'users': document['users'], 'empty': []})
+                self.assertEqual(stream.values, {'meta': document['meta'], 'total': 20})
+
+    def test_empty_body(self):
+        self.assertEqual(decode([b'']), {})
+
+    def test_truncated_body(self):
+        with self.assertRaises(ValueError):
+            decode([b'{"a": [1, 2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
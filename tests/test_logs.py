@@ -0,0 +1,97 @@
+import os
+import sys
+import gzip
+import logging
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.logs import QueueLogging, create_file_handler
+
+
+class CountingHandler(logging.StreamHandler):
+    # Counts the flushes of the written records
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.flush_count = 0
+
+    def flush(self):
+        self.flush_count += 1
+        super().flush()
+
+
+class QueueLoggingTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.logger = logging.getLogger(f'test_logs.{self.id()}')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def start(self, *handlers, **kwargs):
+        queue_logging = QueueLogging(list(handlers), **kwargs)
+        self.logger.handlers = [queue_logging.queue_handler]
+        queue_logging.start()
+        self.addCleanup(queue_logging.stop)
+        return queue_logging
+
+    def test_records_are_written_in_order_once_stopped(self):
+        log_file = os.path.join(self.directory, 'otter.log')
+        file_handler = create_file_handler(log_file)
+        file_handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        queue_logging = self.start(file_handler)
+        for i in range(250):
+            self.logger.info('Loaded application %s', i)
+        queue_logging.stop()
+        file_handler.close()
+        with open(log_file, encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines, [f'INFO Loaded application {i}' for i in range(250)])
+
+    def test_records_are_flushed_per_batch(self):
+        log_file = os.path.join(self.directory, 'otter.log')
+        with open(log_file, 'w', encoding='utf-8') as stream:
+            handler = CountingHandler(stream)
+            queue_logging = QueueLogging([handler], batch_size=100)
+            self.logger.handlers = [queue_logging.queue_handler]
+            # The records are queued before the listener starts, hence they are written in batches
+            for i in range(300):
+                self.logger.info('Record %s', i)
+            queue_logging.start()
+            queue_logging.stop()
+        self.assertEqual(handler.flush_count, 3)
+        with open(log_file, encoding='utf-8') as file:
+            self.assertEqual(len(file.read().splitlines()), 300)
+
+    def test_handler_level_is_respected(self):
+        log_file = os.path.join(self.directory, 'otter.log')
+        file_handler = create_file_handler(log_file)
+        file_handler.setLevel(logging.WARNING)
+        queue_logging = self.start(file_handler)
+        self.logger.debug('Hidden')
+        self.logger.warning('Shown')
+        queue_logging.stop()
+        file_handler.close()
+        with open(log_file, encoding='utf-8') as file:
+            self.assertEqual(file.read().splitlines(), ['Shown'])
+
+    def test_rotated_logs_are_compressed(self):
+        log_file = os.path.join(self.directory, 'otter.log')
+        file_handler = create_file_handler(log_file, max_bytes=1000, backup_count=2)
+        queue_logging = self.start(file_handler, batch_size=10)
+        for i in range(100):
+            self.logger.info('Record %s %s', i, 'x' * 40)
+        queue_logging.stop()
+        file_handler.close()
+        with gzip.open(f'{log_file}.1.gz', 'rt', encoding='utf-8') as rotated_file:
+            self.assertTrue(rotated_file.read().startswith('Record'))
+        self.assertFalse(os.path.exists(f'{log_file}.3.gz'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.metrics import RequestMetrics
+
+
+def record(metrics, latencies):
+    for latency in latencies:
+        metrics.record('https://xsa', 'GET', '/v2/apps/2f1c3a4e-0d1b-4c2a-9e3f-5a6b7c8d9e0f',
+                       200, 10, latency)
+
+
+class RequestMetricsTest(unittest.TestCase):
+
+    def test_percentiles_are_exact_within_the_reservoir(self):
+        metrics = RequestMetrics(latency_reservoir_size=100)
+        record(metrics, [i / 100 for i in range(100, 0, -1)])
+        row, = metrics.summary
+        self.assertEqual(row['template'], '/v2/apps/{guid}')
+        self.assertEqual((row['p50_seconds'], row['p95_seconds'], row['p99_seconds']),
+                         (0.5, 0.95, 0.99))
+        self.assertEqual(row['max_seconds'], 1.0)
+
+    def test_latencies_are_bounded(self):
+        metrics = RequestMetrics(latency_reservoir_size=50)
+        record(metrics, [0.001] * 5000 + [100.0])
+        # pylint: disable=protected-access
+        metric, = metrics._metrics.values()
+        self.assertEqual(len(metric['latencies']), 50)
+        row, = metrics.summary
+        self.assertEqual(row['count'], 5001)
+        self.assertAlmostEqual(row['total_seconds'], 105.0)
+        self.assertEqual(row['max_seconds'], 100.0)
+        self.assertEqual(row['p50_seconds'], 0.001)
+
+    def test_histogram_is_cumulative(self):
+        metrics = RequestMetrics()
+        record(metrics, [0.005, 0.02, 0.02, 3, 120])
+        histogram = metrics.summary[0]['histogram']
+        self.assertEqual((histogram['0.005'], histogram['0.01'], histogram['0.025'],
+                          histogram['5'], histogram['60'], histogram['+Inf']),
+                         (1, 1, 3, 4, 4, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.controller.session import ControllerSession
+
+
+ITEMS = [{'metadata': {'guid': f'app-{i}'}} for i in range(7)]
+
+
+class FakeServer:
+    # Answers the GET requests of a session by the offset and limit parameters
+    # or by the next_url links
+
+    def __init__(self, honours_offset=True, next_urls=False, http_status=200):
+        self.honours_offset = honours_offset
+        self.next_urls = next_urls
+        self.http_status = http_status
+        self.requests = []
+
+    def get(self, path, **kwargs):
+        params = kwargs.get('params') or {}
+        self.requests.append((path, dict(params)))
+        if self.http_status != 200:
+            return {'http_status': self.http_status,
+                    'response_body': {'description': 'Failed'},
+                    'response_headers': {}}
+        if self.next_urls:
+            # The page number is part of the path, e.g., /v2/apps?page=2
+            page = int(path.partition('page=')[2] or 1)
+            body = {'applications': ITEMS[(page - 1) * 3:page * 3],
+                    'next_url': f'/v2/apps?page={page + 1}' if page * 3 < len(ITEMS) else None}
+        else:
+            offset = int(params.get('offset') or 0) if self.honours_offset else 0
+            limit = int(params.get('limit') or len(ITEMS))
+            body = {'applications': ITEMS[offset:offset + limit]}
+        return {'http_status': 200, 'response_body': body, 'response_headers': {}}
+
+
+def create_session(server, **pagination):
+    session = ControllerSession('https://xsa', pagination=pagination)
+    session.get = server.get
+    return session
+
+
+class IterItemsTest(unittest.TestCase):
+
+    def test_follows_next_url(self):
+        for prefetch in (True, False):
+            server = FakeServer(next_urls=True)
+            session = create_session(server, prefetch=prefetch)
+            self.assertEqual(list(session.iter_items('/v2/apps', 'applications')), ITEMS)
+            self.assertEqual([path for path, _ in server.requests],
+                             ['/v2/apps', '/v2/apps?page=2', '/v2/apps?page=3'])
+
+    def test_pages_by_offset(self):
+        for prefetch in (True, False):
+            server = FakeServer()
+            session = create_session(server, page_size=3, prefetch=prefetch)
+            self.assertEqual(list(session.iter_items('/v2/apps', 'applications')), ITEMS)
+            self.assertEqual([params for _, params in server.requests],
+                             [{'limit': 3}, {'limit': 3, 'offset': 3}, {'limit': 3, 'offset': 6}])
+
+    def test_full_last_page_ends_with_empty_page(self):
+        server = FakeServer()
+        session = create_session(server, page_size=7, prefetch=False)
+        self.assertEqual(list(session.iter_items('/v2/apps', 'applications')), ITEMS)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_repeated_page_ends_list(self):
+        # The server applies the limit but ignores the offset
+        for prefetch in (True, False):
+            server = FakeServer(honours_offset=False)
+            session = create_session(server, page_size=3, prefetch=prefetch)
+            with self.assertLogs(level='WARNING') as logs:
+                items = list(session.iter_items('/v2/apps', 'applications'))
+            self.assertEqual(items, ITEMS[:3])
+            self.assertEqual(len(server.requests), 2)
+            self.assertIn('repeats the previous page', logs.output[0])
+
+    def test_max_pages_ends_list(self):
+        for prefetch in (True, False):
+            server = FakeServer()
+            session = create_session(server, page_size=2, max_pages=2, prefetch=prefetch)
+            with self.assertLogs(level='WARNING') as logs:
+                items = list(session.iter_items('/v2/apps', 'applications'))
+            self.assertEqual(items, ITEMS[:4])
+            self.assertEqual(len(server.requests), 2)
+            self.assertIn('reached 2 pages', logs.output[0])
+
+    def test_failed_page_raises(self):
+        session = create_session(FakeServer(http_status=500))
+        with self.assertRaises(Exception) as context:
+            list(session.iter_items('/v2/apps', 'applications'))
+        self.assertIn('HTTP 500', str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.ratelimit import RateLimiter
+from components.tools.deadline import deadline, DeadlineExceeded
+
+
+class FakeClock:
+    # monotonic() and sleep() of the time module advancing only by the sleeps
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        clock = mock.patch('components.tools.ratelimit.time', self.clock)
+        clock.start()
+        self.addCleanup(clock.stop)
+        deadline.start(None)
+        self.addCleanup(deadline.start, None)
+
+    def test_burst_is_not_delayed(self):
+        limiter = RateLimiter(rate=2, burst=3)
+        self.assertEqual([limiter.acquire() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_requests_above_burst_wait_for_the_rate(self):
+        limiter = RateLimiter(rate=2, burst=1)
+        self.assertEqual([limiter.acquire() for _ in range(4)], [0, 0.5, 0.5, 0.5])
+        self.assertEqual(limiter.stats, {'acquired': 4, 'waited': 3, 'wait_seconds': 1.5})
+
+    def test_bucket_refills_up_to_burst(self):
+        limiter = RateLimiter(rate=2, burst=2)
+        limiter.acquire()
+        limiter.acquire()
+        self.clock.now += 10
+        self.assertEqual([limiter.acquire() for _ in range(3)], [0, 0, 0.5])
+
+    def test_waiting_requests_are_served_in_order(self):
+        limiter = RateLimiter(rate=4, burst=1)
+        limiter.acquire()
+        # The sleeps are left out, hence every waiting request reserves the next token
+        with mock.patch.object(self.clock, 'sleep'):
+            self.assertEqual([limiter.acquire() for _ in range(3)], [0.25, 0.5, 0.75])
+
+    def test_wait_past_deadline_raises(self):
+        limiter = RateLimiter(rate=2, burst=1)
+        limiter.acquire()
+        with mock.patch('components.tools.deadline.time', self.clock):
+            deadline.start(0.3)
+            with self.assertRaises(DeadlineExceeded):
+                limiter.acquire()
+            self.assertEqual(self.clock.sleeps, [])
+            # The token of the failed request is given back
+            deadline.start(None)
+            self.assertEqual(limiter.acquire(), 0.5)
+
+    def test_shared_by_threads(self):
+        limiter = RateLimiter(rate=1000, burst=5)
+        with mock.patch('components.tools.ratelimit.time', time):
+            threads = [threading.Thread(target=limiter.acquire) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(limiter.stats['acquired'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import csv
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.metrics import RequestMetrics, request_phase
+
+
+class FakeCollector:
+    # Reports sending requests like the operations of the Collector
+
+    def __init__(self, request_metrics):
+        self.controller = SimpleNamespace(request_metrics=request_metrics)
+
+    def get(self, path):
+        self.controller.request_metrics.record('https://xsa', 'GET', path, 200, 0, 0.01)
+
+    def get_app_instances(self, app_count):
+        for i in range(app_count):
+            self.get(f'/v2/apps/3f1c3a4e-0d1b-4c2a-9e3f-5a6b7c8d9e{i:02d}/instances')
+
+    @request_phase
+    def store_apps(self, app_count):
+        self.get_app_instances(app_count)
+
+    @request_phase
+    def store_space(self, app_count):
+        self.get('/v2/spaces/3f1c3a4e-0d1b-4c2a-9e3f-5a6b7c8d9e0f/content')
+        # Requests of worker threads are accounted to the active phase
+        worker = threading.Thread(target=self.get_app_instances, args=(app_count,))
+        worker.start()
+        worker.join()
+        self.store_apps(1)
+
+
+class RequestPhaseTest(unittest.TestCase):
+
+    def test_requests_are_accounted_to_the_innermost_phase(self):
+        request_metrics = RequestMetrics(n_plus_one_threshold=0)
+        collector = FakeCollector(request_metrics)
+        collector.get('/v2/info')
+        collector.store_space(3)
+        collector.store_space(2)
+        rows = {(row['phase'], row['template']): (row['runs'], row['count'])
+                for row in request_metrics.phase_summary}
+        self.assertEqual(rows, {('main', '/v2/info'): (1, 1),
+                                ('store_space', '/v2/spaces/{guid}/content'): (2, 2),
+                                ('store_space', '/v2/apps/{guid}/instances'): (2, 5),
+                                ('store_apps', '/v2/apps/{guid}/instances'): (2, 2)})
+
+    def test_n_plus_one_requests_are_reported(self):
+        request_metrics = RequestMetrics(n_plus_one_threshold=3)
+        collector = FakeCollector(request_metrics)
+        collector.store_apps(3)
+        self.assertEqual(request_metrics.n_plus_one_findings, [])
+        with self.assertLogs(level='WARNING') as logs:
+            collector.store_apps(4)
+        self.assertEqual(request_metrics.n_plus_one_findings,
+                         [('store_apps', 'GET', '/v2/apps/{guid}/instances', 4)])
+        self.assertIn('possibly N+1 requests', logs.output[0])
+
+    def test_phase_csv(self):
+        request_metrics = RequestMetrics(n_plus_one_threshold=0)
+        FakeCollector(request_metrics).store_apps(2)
+        with tempfile.TemporaryDirectory() as directory:
+            phase_file = os.path.join(directory, 'request_phases.csv')
+            request_metrics.write_phase_csv(phase_file)
+            with open(phase_file, encoding='utf-8', newline='') as csv_file:
+                rows = list(csv.DictReader(csv_file))
+        self.assertEqual(rows, [{'phase': 'store_apps', 'runs': '1', 'method': 'GET',
+                                 'template': '/v2/apps/{guid}/instances', 'count': '2'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.tracing import Tracer
+
+
+def spans_by_name(tracer):
+    # pylint: disable=protected-access
+    return {event['name']: event for event in tracer._events if event['ph'] == 'X'}
+
+
+class TracerTest(unittest.TestCase):
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer()
+        with tracer.span('report'):
+            tracer.counter('requests', in_flight=1)
+        function = len
+        self.assertIs(tracer.bind_parent(function), function)
+        self.assertEqual(tracer._events, []) # pylint: disable=protected-access
+
+    def test_spans_are_nested(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span('store_applications', category='report'):
+            with tracer.span('Space.content', category='load', guid='space-1'):
+                pass
+        spans = spans_by_name(tracer)
+        report, load = spans['store_applications'], spans['Space.content']
+        self.assertIsNone(report['args']['parent_id'])
+        self.assertEqual(load['args']['parent_id'], report['args']['span_id'])
+        self.assertEqual(load['args']['guid'], 'space-1')
+        self.assertEqual((report['cat'], load['cat']), ('report', 'load'))
+        self.assertLessEqual(report['ts'], load['ts'])
+
+    def test_worker_spans_are_children_of_the_submitting_span(self):
+        tracer = Tracer()
+        tracer.enable()
+
+        def load():
+            with tracer.span('load'):
+                pass
+        with tracer.span('report'):
+            worker = threading.Thread(target=tracer.bind_parent(load))
+        worker.start()
+        worker.join()
+        unbound_worker = threading.Thread(target=load)
+        unbound_worker.start()
+        unbound_worker.join()
+        # pylint: disable=protected-access
+        report, = [event for event in tracer._events if event['name'] == 'report']
+        bound, unbound = [event for event in tracer._events if event['name'] == 'load']
+        self.assertEqual(bound['args']['parent_id'], report['args']['span_id'])
+        self.assertNotEqual(bound['tid'], report['tid'])
+        self.assertIsNone(unbound['args']['parent_id'])
+
+    def test_write_chrome_trace(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span('report'):
+            tracer.counter('requests', in_flight=2)
+        with tempfile.TemporaryDirectory() as directory:
+            trace_file = os.path.join(directory, 'trace.json')
+            self.assertEqual(tracer.write(trace_file), 2)
+            with open(trace_file, encoding='utf-8') as file:
+                trace = json.load(file)
+        phases = [event['ph'] for event in trace['traceEvents']]
+        self.assertEqual(sorted(phases), ['C', 'M', 'X'])
+        thread_name, = [event for event in trace['traceEvents'] if event['ph'] == 'M']
+        self.assertEqual(thread_name['args']['name'], threading.current_thread().name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# pylint: disable=wrong-import-position,import-error
+from components.tools.transport import TransportPolicy
+from components.tools.deadline import deadline, DeadlineExceeded
+
+
+class FakeResponse:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def sender(*outcomes):
+    # Returns the given responses or raises the given exceptions, one per request
+    outcomes = list(outcomes)
+    sent = []
+
+    def send_request():
+        outcome = outcomes[min(len(sent), len(outcomes) - 1)]
+        sent.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return send_request, sent
+
+
+class TransportPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        deadline.start(None)
+        self.addCleanup(deadline.start, None)
+        sleep = mock.patch('components.tools.transport.time.sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_retries_retry_statuses_until_success(self):
+        policy = TransportPolicy(max_attempts=3)
+        failed = FakeResponse(503)
+        send_request, sent = sender(failed, FakeResponse(200))
+        self.assertEqual(policy.send('GET', '/v2/apps', send_request).status_code, 200)
+        self.assertEqual(len(sent), 2)
+        self.assertTrue(failed.closed)
+        self.assertEqual(policy.stats['retried'], 1)
+
+    def test_returns_last_response_after_max_attempts(self):
+        policy = TransportPolicy(max_attempts=2)
+        send_request, sent = sender(FakeResponse(503))
+        self.assertEqual(policy.send('GET', '/v2/apps', send_request).status_code, 503)
+        self.assertEqual(len(sent), 2)
+
+    def test_raises_connection_error_after_max_attempts(self):
+        policy = TransportPolicy(max_attempts=2)
+        send_request, sent = sender(requests.ConnectionError())
+        with self.assertRaises(requests.ConnectionError):
+            policy.send('GET', '/v2/apps', send_request)
+        self.assertEqual(len(sent), 2)
+
+    def test_does_not_retry_other_methods(self):
+        policy = TransportPolicy(max_attempts=3)
+        send_request, sent = sender(FakeResponse(503))
+        self.assertEqual(policy.send('DELETE', '/v2/apps/a', send_request).status_code, 503)
+        self.assertEqual(len(sent), 1)
+
+    def test_waits_retry_after(self):
+        policy = TransportPolicy(max_attempts=2)
+        send_request, _ = sender(FakeResponse(429, retry_after='7'), FakeResponse(200))
+        policy.send('GET', '/v2/apps', send_request)
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_caps_retry_after_by_max_backoff(self):
+        policy = TransportPolicy(max_attempts=2, max_backoff_seconds=30)
+        send_request, _ = sender(FakeResponse(429, retry_after='3600'), FakeResponse(200))
+        policy.send('GET', '/v2/apps', send_request)
+        self.sleep.assert_called_once_with(30)
+
+    def test_retry_past_deadline_raises(self):
+        deadline.start(10)
+        policy = TransportPolicy(max_attempts=2, max_backoff_seconds=30)
+        send_request, sent = sender(FakeResponse(429, retry_after='20'), FakeResponse(200))
+        with self.assertRaises(DeadlineExceeded):
+            policy.send('GET', '/v2/apps', send_request)
+        self.assertEqual(len(sent), 1)
+        self.sleep.assert_not_called()
+
+
+class HedgedRequestTest(unittest.TestCase):
+
+    def tearDown(self):
+        self.policy.close()
+
+    def test_failed_primary_is_ignored_for_successful_hedge(self):
+        self.policy = TransportPolicy(max_attempts=1, hedge_after_seconds=0.05)
+        responses = []
+
+        def send_request():
+            # The first request fails after the hedge is sent, the hedge succeeds
+            if not responses:
+                responses.append(None)
+                time.sleep(0.1)
+                raise requests.ConnectionError()
+            response = FakeResponse(200)
+            responses.append(response)
+            return response
+        self.assertIs(self.policy.send('GET', '/v2/apps', send_request), responses[1])
+        self.assertEqual(self.policy.stats['hedges_won'], 1)
+
+    def test_losing_response_is_closed(self):
+        self.policy = TransportPolicy(max_attempts=1, hedge_after_seconds=0.05)
+        responses = []
+
+        def send_request():
+            # The first request is slower than the hedge
+            response = FakeResponse(200)
+            responses.append(response)
+            time.sleep(0.3 if len(responses) == 1 else 0)
+            return response
+        self.assertIs(self.policy.send('GET', '/v2/apps', send_request), responses[1])
+        time.sleep(0.5)
+        self.assertTrue(responses[0].closed)
+        self.assertFalse(responses[1].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()